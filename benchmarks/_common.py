@@ -0,0 +1,39 @@
+"""Shared helpers for the offline benchmark scripts."""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = REPO_ROOT / "data"
+
+# The scripts run from a checkout without requiring `pip install -e .`.
+if str(REPO_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from bookshelf_scanner.loadgen import percentile  # noqa: E402,F401 - shared with the load generator
+
+
+def time_per_call(func: Callable[[], Any], min_seconds: float = 0.5, rounds: int = 5) -> float:
+    """Seconds per call of `func`: the fastest of `rounds` rounds sharing `min_seconds`, after one warm-up call.
+
+    The minimum is the least noisy estimate on a shared machine; slower rounds
+    are interference, not the code under test.
+    """
+    func()
+    best = float("inf")
+    round_seconds = min_seconds / max(1, rounds)
+    for _ in range(max(1, rounds)):
+        calls = 0
+        started = time.perf_counter()
+        while True:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= round_seconds:
+                break
+        best = min(best, elapsed / calls)
+    return best
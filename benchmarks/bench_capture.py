@@ -0,0 +1,134 @@
+"""End-to-end `/scan/capture` request handling with stub models and configurable fake latencies.
+
+Runs the real Flask app in-process (test client) with `bookshelf_scanner.stubs`
+backends, once with zero latency to isolate framework and pipeline overhead and
+once with the given per-stage latencies.
+
+    python benchmarks/bench_capture.py --requests 20 --detect-ms 40 --extract-ms 120 --lookup-ms 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from io import BytesIO
+from pathlib import Path
+from statistics import mean
+from typing import Any
+
+from _common import percentile
+from bench_images import load_photos
+
+from bookshelf_scanner.stubs import stub_factories
+from bookshelf_scanner.web_api import create_app
+
+METRIC = "p50Ms"
+
+# Every request must run the pipeline: no capture cache, no catalog, no debug artifacts.
+_ISOLATED_ENV = {
+    "BOOKSHELF_CAPTURE_CACHE_ENTRIES": "0",
+    "BOOKSHELF_CATALOG_PATHS": "",
+    "BOOKSHELF_CATALOG_LEARN": "false",
+    "BOOKSHELF_DEBUG_ARTIFACTS_DIR": "",
+    # Time every stub spine through extraction; dedupe is not what this benchmark measures.
+    "BOOKSHELF_DEDUPE_CROPS": "false",
+}
+
+
+def _build_client(latencies: dict[str, float], spines: int) -> Any:
+    previous = {name: os.environ.get(name) for name in _ISOLATED_ENV}
+    os.environ.update(_ISOLATED_ENV)
+    try:
+        app = create_app(**stub_factories(spines_per_row=max(1, spines // 2), rows=2, **latencies))
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    app.config.update(TESTING=True)
+    return app.test_client()
+
+
+def _post_capture(client: Any, photo: bytes, spines: int) -> Any:
+    return client.post(
+        "/scan/capture",
+        data={"image": (BytesIO(photo), "shelf.jpg"), "maxDetections": str(spines)},
+        content_type="multipart/form-data",
+    )
+
+
+def _run_case(case: str, latencies: dict[str, float], spines: int, requests: int, photo: bytes) -> dict[str, Any]:
+    client = _build_client(latencies, spines)
+    # The first request loads the stub pools and starts lookup threads; keep it out of the numbers.
+    _post_capture(client, photo, spines)
+    durations: list[float] = []
+    server_timings: dict[str, list[float]] = {}
+    errors = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = _post_capture(client, photo, spines)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            errors += 1
+            continue
+        durations.append(elapsed_ms)
+        for stage, value in (response.get_json().get("timingsMs") or {}).items():
+            server_timings.setdefault(stage, []).append(float(value))
+    return {
+        "case": case,
+        "spines": spines,
+        "requests": len(durations),
+        "errors": errors,
+        # detect_ms -> detectMs, like the other row fields.
+        **{f"{stage.removesuffix('_ms')}Ms": value for stage, value in latencies.items()},
+        "meanMs": round(mean(durations), 2) if durations else 0.0,
+        "p50Ms": round(percentile(durations, 0.50), 2),
+        "p95Ms": round(percentile(durations, 0.95), 2),
+        "serverTimingsMs": {stage: round(mean(values), 2) for stage, values in server_timings.items()},
+    }
+
+
+def run(
+    requests: int = 20,
+    spines: int = 24,
+    detect_ms: float = 40.0,
+    extract_ms: float = 20.0,
+    lookup_ms: float = 80.0,
+) -> list[dict[str, Any]]:
+    photo = min(load_photos().values(), key=len)
+    zero = {"detect_ms": 0.0, "extract_ms": 0.0, "lookup_ms": 0.0}
+    configured = {"detect_ms": detect_ms, "extract_ms": extract_ms, "lookup_ms": lookup_ms}
+    return [
+        _run_case("capture_overhead", zero, spines, requests, photo),
+        _run_case("capture_with_latency", configured, spines, requests, photo),
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20, help="Timed requests per case (after one warm-up).")
+    parser.add_argument("--spines", type=int, default=24, help="Spines the stub detector returns per photo.")
+    parser.add_argument("--detect-ms", type=float, default=40.0, help="Stub detector latency per frame.")
+    parser.add_argument("--extract-ms", type=float, default=20.0, help="Stub extractor latency per spine.")
+    parser.add_argument("--lookup-ms", type=float, default=80.0, help="Stub Google Books latency per lookup.")
+    parser.add_argument("--output", type=Path, default=None, help="Optional JSON results path.")
+    args = parser.parse_args()
+
+    results = run(args.requests, args.spines, args.detect_ms, args.extract_ms, args.lookup_ms)
+    for row in results:
+        print(
+            f"{row['case']:<22} spines={row['spines']:<3} mean={row['meanMs']:>8.2f} ms "
+            f"p50={row['p50Ms']:>8.2f} ms p95={row['p95Ms']:>8.2f} ms errors={row['errors']} "
+            f"server={row['serverTimingsMs']}"
+        )
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+"""Per-frame post-processing cost of per-box pydantic detections vs. columnar `SpineDetections`.
+
+Runs offline on CPU against synthetic ultralytics `Boxes`; no model weights needed.
+
+    python benchmarks/bench_detections.py --boxes 50 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Any
+
+import torch
+from PIL import Image
+from ultralytics.engine.results import Boxes
+
+from _common import time_per_call
+
+from bookshelf_scanner.detector import SpineDetector
+from bookshelf_scanner.schemas import DetectedSpine
+
+METRIC = "usPerFrame"
+
+
+class _Result:
+    def __init__(self, boxes: Boxes) -> None:
+        self.boxes = boxes
+
+
+def synthetic_result(count: int, seed: int = 0, width: int = 1920, height: int = 1080) -> _Result:
+    """YOLO-shaped result with `count` spine boxes spread over three shelves."""
+    rng = random.Random(seed)
+    rows = []
+    shelf_height = height // 3
+    for _ in range(count):
+        shelf = rng.randrange(3)
+        x1 = rng.uniform(0, width - 80)
+        y1 = shelf * shelf_height + rng.uniform(0, 30)
+        rows.append([x1, y1, x1 + rng.uniform(12, 80), y1 + rng.uniform(150, shelf_height - 30), rng.random(), 73.0])
+    return _Result(Boxes(torch.tensor(rows, dtype=torch.float32), orig_shape=(height, width)))
+
+
+def legacy_collect(result: _Result, min_area: int, max_detections: int) -> list[DetectedSpine]:
+    """The pre-columnar `_collect_spines` body, minus crops."""
+    detections: list[DetectedSpine] = []
+    for i, box in enumerate(result.boxes):
+        bbox = tuple(map(int, box.xyxy[0].tolist()))
+        spine = DetectedSpine(bbox=bbox, confidence=float(box.conf[0]), index=i)
+        if spine.area >= min_area:
+            detections.append(spine)
+    detections = _legacy_sort(detections)[:max_detections]
+    for i, det in enumerate(detections):
+        det.index = i
+    return detections
+
+
+def _legacy_sort(detections: list[DetectedSpine]) -> list[DetectedSpine]:
+    detections = sorted(detections, key=lambda d: d.bbox[0])
+    rows: list[list[DetectedSpine]] = []
+    for det in detections:
+        center = (det.bbox[1] + det.bbox[3]) / 2
+        for row in rows:
+            if min(d.bbox[1] for d in row) <= center <= max(d.bbox[3] for d in row):
+                row.append(det)
+                break
+        else:
+            rows.append([det])
+    rows.sort(key=lambda row: min(d.bbox[1] for d in row))
+    for row in rows:
+        row.sort(key=lambda d: d.bbox[0])
+    return [det for row in rows for det in row]
+
+
+def run(box_counts: list[int], min_seconds: float = 0.5) -> list[dict[str, Any]]:
+    image = Image.new("RGB", (1920, 1080))
+    results = []
+    for count in box_counts:
+        result = synthetic_result(count)
+        max_detections = count
+        legacy = legacy_collect(result, 1000, max_detections)
+        columnar = SpineDetector._select(result, 1000, max_detections).to_spines()
+        assert [spine.bbox for spine in legacy] == [spine.bbox for spine in columnar]
+
+        cases = {
+            "legacy_objects": lambda: legacy_collect(result, 1000, max_detections),
+            "columnar_arrays": lambda: SpineDetector._select(result, 1000, max_detections),
+            "columnar_objects": lambda: SpineDetector._select(result, 1000, max_detections).to_spines(),
+            "columnar_rows": lambda: SpineDetector._select(result, 1000, max_detections).rows(),
+            "crops": lambda: SpineDetector._select(result, 1000, max_detections).crops(image),
+            "sort_reading_order_legacy": lambda: _legacy_sort(legacy),
+            "sort_reading_order": lambda: SpineDetector._sort_reading_order(legacy),
+        }
+        for name, func in cases.items():
+            seconds = time_per_call(func, min_seconds)
+            results.append({"case": name, "boxes": count, "kept": len(legacy), "usPerFrame": round(seconds * 1e6, 1)})
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--boxes", type=int, nargs="+", default=[50, 500], help="Boxes per synthetic frame.")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="Minimum timing window per case.")
+    parser.add_argument("--output", type=Path, default=None, help="Optional JSON results path.")
+    args = parser.parse_args()
+
+    results = run(args.boxes, args.min_seconds)
+    for row in results:
+        print(f"{row['case']:<18} boxes={row['boxes']:<4} kept={row['kept']:<4} {row['usPerFrame']:>10.1f} us/frame")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""Image costs on the capture path: JPEG decode of the `data/` shelf photos, spine crops and crop re-encoding.
+
+Falls back to a synthetic 1024x768 photo when `data/` has no images.
+
+    python benchmarks/bench_images.py --spines 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+from _common import DATA_DIR, time_per_call
+
+from bookshelf_scanner.stubs import StubDetector
+
+METRIC = "msPerImage"
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+
+
+def load_photos(directory: Path = DATA_DIR) -> dict[str, bytes]:
+    """Raw bytes of every photo in `directory`, or one synthetic JPEG when there are none."""
+    photos = {
+        path.name: path.read_bytes()
+        for path in sorted(directory.glob("*"))
+        if path.suffix.lower() in IMAGE_SUFFIXES
+    } if directory.is_dir() else {}
+    if not photos:
+        noise = np.random.default_rng(0).integers(0, 255, size=(768, 1024, 3), dtype=np.uint8)
+        buffer = BytesIO()
+        Image.fromarray(noise).save(buffer, format="JPEG", quality=90)
+        photos["synthetic_1024x768.jpg"] = buffer.getvalue()
+    return photos
+
+
+def _decode(data: bytes) -> Image.Image:
+    # Same call as the API's upload decode.
+    return Image.open(BytesIO(data)).convert("RGB")
+
+
+def _encode_crops(crops: list[Image.Image]) -> int:
+    total = 0
+    for crop in crops:
+        buffer = BytesIO()
+        crop.save(buffer, format="JPEG", quality=90)
+        total += buffer.tell()
+    return total
+
+
+def run(spines: int, min_seconds: float = 0.5) -> list[dict[str, Any]]:
+    detector = StubDetector(spines_per_row=max(1, spines // 2), rows=2)
+    results = []
+    for name, data in load_photos().items():
+        image = _decode(data)
+        crops, _ = detector.detect_all(image, max_detections=spines)
+        cases = {
+            "decode": lambda: _decode(data),
+            "crop": lambda: detector.detect_all(image, max_detections=spines),
+            "encode_crops": lambda: _encode_crops(crops),
+        }
+        for case, func in cases.items():
+            seconds = time_per_call(func, min_seconds)
+            results.append(
+                {
+                    "case": case,
+                    "image": name,
+                    "size": f"{image.width}x{image.height}",
+                    "spines": len(crops),
+                    "msPerImage": round(seconds * 1000, 3),
+                }
+            )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spines", type=int, default=30, help="Spine crops cut from each photo.")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="Minimum timing window per case.")
+    parser.add_argument("--output", type=Path, default=None, help="Optional JSON results path.")
+    args = parser.parse_args()
+
+    results = run(args.spines, args.min_seconds)
+    for row in results:
+        print(f"{row['case']:<14} {row['size']:>10} {row['image'][:40]:<40} {row['msPerImage']:>9.3f} ms")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
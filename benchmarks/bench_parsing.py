@@ -0,0 +1,84 @@
+"""Text-side CPU costs: `_parse_response` on realistic model outputs, `_flatten_json` and lookup CSV writing.
+
+    python benchmarks/bench_parsing.py --spines 20 --items 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from _common import time_per_call
+
+from bookshelf_scanner.extractor import BookExtractor
+from bookshelf_scanner.lookup import _flatten_json, _lookup_rows, _write_output_csv
+from bookshelf_scanner.stubs import StubBooksClient, stub_volume
+
+METRIC = "usPerCall"
+
+# Shapes the VLM actually answers with, from cleanest to the parser's last resort.
+MODEL_OUTPUTS = {
+    "clean_json": '{"title": "The Left Hand of Darkness", "author": "Ursula K. Le Guin"}',
+    "json_null_author": '{"title": "Gödel, Escher, Bach", "author": null}',
+    "fenced_json": '```json\n{\n  "title": "Cien años de soledad",\n  "author": "Gabriel García Márquez"\n}\n```',
+    "json_in_prose": 'Sure! Here is the spine text: {"title": "Dune", "author": "Frank Herbert"} Let me know if you need more.',
+    "truncated_json": '{"title": "The Structure of Scientific Revolutions", "author": "Thomas S. Ku',
+    "plain_text": "THE ROAD\nCormac McCarthy\nVintage International",
+    "empty": "   ",
+}
+
+
+class _NoBackend:
+    def extract(self, spine_image: Any) -> dict[str, Any]:
+        raise AssertionError("not used")
+
+
+def run(spines: int, items: int, min_seconds: float = 0.5) -> list[dict[str, Any]]:
+    results = []
+    extractor = BookExtractor(backend=_NoBackend())
+    for case, output in MODEL_OUTPUTS.items():
+        seconds = time_per_call(lambda: extractor._parse_response(output), min_seconds)
+        results.append({"case": f"parse_response.{case}", "usPerCall": round(seconds * 1e6, 2)})
+
+    volume = stub_volume("Le Petit Prince", "Antoine de Saint-Exupéry", 7)
+    seconds = time_per_call(lambda: _flatten_json("item", volume, {}), min_seconds)
+    results.append({"case": "flatten_json.volume", "usPerCall": round(seconds * 1e6, 2)})
+
+    client = StubBooksClient(items=items)
+    input_rows = [
+        {"spine_index": str(index), "image_path": f"crops/spine_{index:02d}.jpg", "title": f"Book {index}", "author": "A. Writer"}
+        for index in range(spines)
+    ]
+    seconds = time_per_call(lambda: _lookup_rows(input_rows, client), min_seconds)  # type: ignore[arg-type]
+    results.append({"case": "lookup_rows", "spines": spines, "items": items, "usPerCall": round(seconds * 1e6, 1)})
+
+    rows = _lookup_rows(input_rows, client)  # type: ignore[arg-type]
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "lookup.csv"
+        seconds = time_per_call(lambda: _write_output_csv(path, rows), min_seconds)
+    results.append({"case": "write_output_csv", "rows": len(rows), "usPerCall": round(seconds * 1e6, 1)})
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spines", type=int, default=20, help="Spines looked up per CSV.")
+    parser.add_argument("--items", type=int, default=5, help="Google Books items per lookup.")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="Minimum timing window per case.")
+    parser.add_argument("--output", type=Path, default=None, help="Optional JSON results path.")
+    args = parser.parse_args()
+
+    results = run(args.spines, args.items, args.min_seconds)
+    for row in results:
+        print(f"{row['case']:<32} {row['usPerCall']:>10.2f} us/call")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,168 @@
+"""Serialization cost per `/scan/capture`: stdlib JSON vs. the `jsonutil` codec, and pydantic validation.
+
+Builds a synthetic capture with realistic Google Books volumes and times the
+response body, `raw_item_json` cells, the capture-cache size estimate and
+`SpineExtraction` construction. Offline, CPU only.
+
+    python benchmarks/bench_serialization.py --spines 20 --items 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Callable
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from _common import time_per_call
+
+from bookshelf_scanner.jsonutil import JSONCodec, get_codec, orjson_available
+from bookshelf_scanner.schemas import SpineExtraction
+from bookshelf_scanner.web_api import FastJSONProvider
+
+METRIC = "usPerCapture"
+
+
+def synthetic_volume(number: int) -> dict[str, Any]:
+    """A Google Books `volumes` item of typical size (~2 KB)."""
+    return {
+        "kind": "books#volume",
+        "id": f"vol{number:06d}",
+        "etag": f"etag{number}",
+        "selfLink": f"https://www.googleapis.com/books/v1/volumes/vol{number:06d}",
+        "volumeInfo": {
+            "title": f"Le Petit Livre n°{number}",
+            "subtitle": "Une histoire complète — édition révisée",
+            "authors": ["Amélie Dupré", "José Núñez"],
+            "publisher": "Éditions Exemple",
+            "publishedDate": "2019-05-14",
+            "description": "Un récit sur les étagères, les livres et leurs lecteurs. " * 16,
+            "industryIdentifiers": [
+                {"type": "ISBN_13", "identifier": f"978{number:010d}"},
+                {"type": "ISBN_10", "identifier": f"{number:010d}"},
+            ],
+            "pageCount": 320 + number,
+            "printType": "BOOK",
+            "categories": ["Fiction / Literary"],
+            "averageRating": 4.5,
+            "ratingsCount": 120 + number,
+            "language": "fr",
+            "imageLinks": {
+                "smallThumbnail": f"http://books.google.com/books/content?id=vol{number:06d}&zoom=5",
+                "thumbnail": f"http://books.google.com/books/content?id=vol{number:06d}&zoom=1",
+            },
+            "previewLink": f"http://books.google.com/books?id=vol{number:06d}&hl=&source=gbs_api",
+        },
+        "saleInfo": {"country": "FR", "saleability": "NOT_FOR_SALE", "isEbook": False},
+        "accessInfo": {"country": "FR", "viewability": "PARTIAL", "embeddable": True, "publicDomain": False},
+    }
+
+
+def synthetic_capture(spines: int, items: int) -> dict[str, Any]:
+    """Shape of a `/scan/capture` response body."""
+    return {
+        "count": spines,
+        "frameWidth": 1920,
+        "frameHeight": 1080,
+        "spines": [
+            {
+                "spineIndex": index,
+                "bbox": [index * 40, 20, index * 40 + 36, 980],
+                "confidence": 0.87,
+                "extraction": {"title": f"Le Petit Livre n°{index}", "author": "Amélie Dupré", "confidence": 0.8},
+                "lookup": {
+                    "query": f"intitle:Le Petit Livre n°{index}",
+                    "totalItems": items,
+                    "items": [synthetic_volume(index * items + offset) for offset in range(items)],
+                    "source": "google_books",
+                },
+            }
+            for index in range(spines)
+        ],
+        "dedupe": {"extractionsAvoided": 0},
+        "lookupStats": {"local": 0, "remote": spines, "localFraction": 0.0},
+        "timingsMs": {"decode": 12.5, "detect": 80.1, "extractLookup": 900.4, "total": 1001.2},
+    }
+
+
+def _codec_cases(codec: JSONCodec, app: Flask, capture: dict[str, Any]) -> dict[str, Callable[[], Any]]:
+    provider = FastJSONProvider(app, codec)
+    volumes = [item for spine in capture["spines"] for item in spine["lookup"]["items"]]
+    raw_items = [codec.dumps(item) for item in volumes]
+    events = [{"type": "spine", **spine} for spine in capture["spines"]]
+    return {
+        "response": lambda: provider.response(capture),
+        "raw_item_json": lambda: [codec.dumps(item) for item in volumes],
+        "raw_item_loads": lambda: [codec.loads(raw) for raw in raw_items],
+        "cache_size": lambda: len(codec.dumps_bytes(events)),
+    }
+
+
+def _flask_default_cases(app: Flask, capture: dict[str, Any]) -> dict[str, Callable[[], Any]]:
+    # What the API did before: DefaultJSONProvider (sorted keys) and json.dumps(ensure_ascii=False).
+    provider = DefaultJSONProvider(app)
+    volumes = [item for spine in capture["spines"] for item in spine["lookup"]["items"]]
+    raw_items = [json.dumps(item, ensure_ascii=False) for item in volumes]
+    events = [{"type": "spine", **spine} for spine in capture["spines"]]
+    return {
+        "response": lambda: provider.response(capture),
+        "raw_item_json": lambda: [json.dumps(item, ensure_ascii=False) for item in volumes],
+        "raw_item_loads": lambda: [json.loads(raw) for raw in raw_items],
+        "cache_size": lambda: len(json.dumps(events, ensure_ascii=False)),
+    }
+
+
+def run(spines: int, items: int, min_seconds: float = 0.5) -> list[dict[str, Any]]:
+    app = Flask(__name__)
+    capture = synthetic_capture(spines, items)
+    backends: dict[str, Callable[[], dict[str, Callable[[], Any]]]] = {
+        "flask_default": lambda: _flask_default_cases(app, capture),
+        "codec_json": lambda: _codec_cases(get_codec("json"), app, capture),
+    }
+    if orjson_available():
+        backends["codec_orjson"] = lambda: _codec_cases(get_codec("orjson"), app, capture)
+
+    results = []
+    with app.app_context():
+        for backend, build in backends.items():
+            for case, func in build().items():
+                seconds = time_per_call(func, min_seconds)
+                results.append({"case": case, "backend": backend, "usPerCapture": round(seconds * 1e6, 1)})
+
+    titles = [(f"  Le Petit Livre n°{index} ", "Amélie Dupré") for index in range(spines)]
+    extraction_cases = {
+        "validated": lambda: [SpineExtraction(title=t, author=a, confidence=0.8) for t, a in titles],
+        "model_construct": lambda: [
+            SpineExtraction.model_construct(title=t, author=a, confidence=0.8, raw_response=None) for t, a in titles
+        ],
+        "trusted": lambda: [SpineExtraction.trusted(t, a, 0.8) for t, a in titles],
+    }
+    for backend, func in extraction_cases.items():
+        seconds = time_per_call(func, min_seconds)
+        results.append({"case": "spine_extraction", "backend": backend, "usPerCapture": round(seconds * 1e6, 1)})
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spines", type=int, default=20, help="Spines per synthetic capture.")
+    parser.add_argument("--items", type=int, default=5, help="Google Books items per spine lookup.")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="Minimum timing window per case.")
+    parser.add_argument("--output", type=Path, default=None, help="Optional JSON results path.")
+    args = parser.parse_args()
+
+    results = run(args.spines, args.items, args.min_seconds)
+    print(f"{args.spines} spines x {args.items} items per capture")
+    for row in results:
+        print(f"{row['case']:<18} {row['backend']:<16} {row['usPerCapture']:>10.1f} us/capture")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
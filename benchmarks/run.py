@@ -0,0 +1,151 @@
+"""Run the offline benchmark suite and write one JSON file per run; optionally compare against an earlier run.
+
+    python benchmarks/run.py                                   # all benchmarks
+    python benchmarks/run.py --only detections parsing --quick
+    python benchmarks/run.py --compare outputs/benchmarks/<earlier>.json
+
+Every benchmark reports one headline metric per row (lower is better); the
+comparison matches rows by their non-metric fields and prints the ratio.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from _common import REPO_ROOT
+
+import bench_capture
+import bench_detections
+import bench_images
+import bench_parsing
+import bench_serialization
+
+# name -> (module, runner taking the parsed arguments)
+SUITE: dict[str, tuple[Any, Callable[[argparse.Namespace], list[dict[str, Any]]]]] = {
+    "detections": (bench_detections, lambda args: bench_detections.run([50, 500], args.min_seconds)),
+    "parsing": (bench_parsing, lambda args: bench_parsing.run(20, 5, args.min_seconds)),
+    "serialization": (bench_serialization, lambda args: bench_serialization.run(20, 5, args.min_seconds)),
+    "images": (bench_images, lambda args: bench_images.run(30, args.min_seconds)),
+    "capture": (
+        bench_capture,
+        lambda args: bench_capture.run(args.requests, 24, args.detect_ms, args.extract_ms, args.lookup_ms),
+    ),
+}
+
+# Fields that vary run to run and must not be used to match rows.
+_VOLATILE_FIELDS = {"requests", "errors", "serverTimingsMs", "meanMs", "p95Ms", "kept"}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(names: list[str], args: argparse.Namespace) -> dict[str, Any]:
+    report: dict[str, Any] = {
+        "commit": _git_commit(),
+        "createdAt": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": {},
+    }
+    for name in names:
+        module, runner = SUITE[name]
+        started = time.perf_counter()
+        rows = runner(args)
+        report["benchmarks"][name] = {"metric": module.METRIC, "rows": rows}
+        print(f"{name}: {len(rows)} row(s) in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return report
+
+
+def _row_key(row: dict[str, Any], metric: str) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in row.items() if key != metric and key not in _VOLATILE_FIELDS))
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> list[dict[str, Any]]:
+    """Rows present in both reports with `ratio = current / baseline` and a `regressed` flag."""
+    compared = []
+    for name, section in current["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None or previous.get("metric") != section["metric"]:
+            continue
+        metric = section["metric"]
+        before = {_row_key(row, metric): row[metric] for row in previous["rows"]}
+        for row in section["rows"]:
+            old = before.get(_row_key(row, metric))
+            if not old:
+                continue
+            ratio = row[metric] / old
+            compared.append(
+                {
+                    "benchmark": name,
+                    "case": row.get("case", ""),
+                    "row": dict(_row_key(row, metric)),
+                    "metric": metric,
+                    "baseline": old,
+                    "current": row[metric],
+                    "ratio": round(ratio, 3),
+                    "regressed": ratio > threshold,
+                }
+            )
+    return compared
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(SUITE), default=None, help="Benchmarks to run.")
+    parser.add_argument("--quick", action="store_true", help="Shorter timing windows and fewer requests.")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="Minimum timing window per micro-benchmark case.")
+    parser.add_argument("--requests", type=int, default=20, help="Timed /scan/capture requests per case.")
+    parser.add_argument("--detect-ms", type=float, default=40.0, help="Stub detector latency per frame.")
+    parser.add_argument("--extract-ms", type=float, default=20.0, help="Stub extractor latency per spine.")
+    parser.add_argument("--lookup-ms", type=float, default=80.0, help="Stub Google Books latency per lookup.")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Results JSON path (default: outputs/benchmarks/<time>-<commit>.json).",
+    )
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier results JSON to compare against.")
+    parser.add_argument(
+        "--threshold", type=float, default=1.2, help="current/baseline ratio above which a row counts as a regression."
+    )
+    args = parser.parse_args()
+    if args.quick:
+        args.min_seconds = min(args.min_seconds, 0.1)
+        args.requests = min(args.requests, 5)
+
+    report = run_suite(args.only or list(SUITE), args)
+    output = args.output or REPO_ROOT / "outputs" / "benchmarks" / f"{time.strftime('%Y%m%d-%H%M%S')}-{report['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"Wrote {output}")
+
+    if args.compare is None:
+        return 0
+    baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+    rows = compare(baseline, report, args.threshold)
+    print(f"Compared with {args.compare} (commit {baseline.get('commit', '?')}):")
+    for row in rows:
+        flag = "  REGRESSED" if row["regressed"] else ""
+        details = " ".join(f"{key}={value}" for key, value in row["row"].items() if key != "case")
+        print(
+            f"  {row['benchmark']:<14} {row['case']:<32} {details[:40]:<40} "
+            f"{row['baseline']:>10} -> {row['current']:>10} {row['metric']} (x{row['ratio']:.2f}){flag}"
+        )
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -60,3 +60,55 @@ export const searchBooks = async (
   }
 };
 
+
+export type SearchBooksBatchRequest = {
+  apiBaseUrl: string;
+  queries: Array<string | { q: string; maxResults?: number }>;
+  maxResults?: number;
+  timeoutMs?: number;
+};
+
+export type SearchBooksBatchResult = SearchBooksResponse & {
+  query: string;
+  maxResults: number;
+  error: string | null;
+};
+
+export const searchBooksBatch = async (
+  request: SearchBooksBatchRequest
+): Promise<SearchBooksBatchResult[]> => {
+  if (request.queries.length === 0) {
+    return [];
+  }
+
+  const controller = new AbortController();
+  const timeoutHandle = setTimeout(
+    () => controller.abort(),
+    Math.max(300, request.timeoutMs ?? 20000)
+  );
+
+  try {
+    const response = await fetch(makeEndpointUrl(request.apiBaseUrl, "/books/search/batch"), {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        queries: request.queries,
+        maxResults: Math.max(1, Math.round(request.maxResults ?? 20))
+      }),
+      signal: controller.signal
+    });
+
+    if (!response.ok) {
+      throw new Error(`books_search_batch_http_${response.status}`);
+    }
+
+    const payload = (await response.json()) as { results?: SearchBooksBatchResult[] };
+    return (Array.isArray(payload.results) ? payload.results : []).map((result) => ({
+      ...result,
+      totalItems: Number(result.totalItems) || 0,
+      items: Array.isArray(result.items) ? result.items : []
+    }));
+  } finally {
+    clearTimeout(timeoutHandle);
+  }
+};
@@ -1,4 +1,4 @@
-import type { CaptureScanResponse } from "../types/vision";
+import type { CaptureScanResponse, ShelfSessionSummary } from "../types/vision";
 
 export type CaptureScanRequest = {
   photoUri: string;
@@ -7,6 +7,8 @@ export type CaptureScanRequest = {
   maxDetections?: number;
   maxLookupResults?: number;
   timeoutMs?: number;
+  // Shelf session from createShelfSession; spines seen in earlier captures are reused.
+  sessionId?: string;
 };
 
 export const runCaptureLookup = async (
@@ -27,6 +29,9 @@ export const runCaptureLookup = async (
     "maxLookupResults",
     String(Math.max(1, Math.round(request.maxLookupResults ?? 3)))
   );
+  if (request.sessionId) {
+    formData.append("sessionId", request.sessionId);
+  }
 
   const controller = new AbortController();
   const timeoutHandle = setTimeout(
@@ -54,3 +59,90 @@ export const runCaptureLookup = async (
     clearTimeout(timeoutHandle);
   }
 };
+
+export type CaptureJobRequest = CaptureScanRequest & {
+  jobsEndpointUrl: string;
+  pollIntervalMs?: number;
+  onProgress?: (progress: Record<string, unknown>) => void;
+};
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Submits the capture to /scan/jobs and polls for the result, so no single request
+// has to stay open for the whole detect/extract/lookup run.
+export const runCaptureLookupJob = async (
+  request: CaptureJobRequest
+): Promise<CaptureScanResponse> => {
+  const formData = new FormData();
+  formData.append("image", {
+    uri: request.photoUri,
+    name: "capture.jpg",
+    type: "image/jpeg"
+  } as unknown as Blob);
+  formData.append("minArea", String(Math.max(0, Math.round(request.minArea ?? 250))));
+  formData.append(
+    "maxDetections",
+    String(Math.max(1, Math.round(request.maxDetections ?? 50)))
+  );
+  formData.append(
+    "maxLookupResults",
+    String(Math.max(1, Math.round(request.maxLookupResults ?? 3)))
+  );
+  if (request.sessionId) {
+    formData.append("sessionId", request.sessionId);
+  }
+
+  const jobsUrl = request.jobsEndpointUrl.trim().replace(/\/+$/, "");
+  const submitted = await fetch(jobsUrl, { method: "POST", body: formData });
+  if (!submitted.ok) {
+    throw new Error(`capture_job_http_${submitted.status}`);
+  }
+  const { jobId } = (await submitted.json()) as { jobId: string };
+
+  const deadline = Date.now() + Math.max(300, request.timeoutMs ?? 120000);
+  while (Date.now() < deadline) {
+    const response = await fetch(`${jobsUrl}/${jobId}/result`);
+    const payload = (await response.json()) as {
+      status: string;
+      progress?: Record<string, unknown>;
+      result?: CaptureScanResponse;
+    };
+    if (response.status === 200 && payload.result) {
+      return {
+        ...payload.result,
+        spines: Array.isArray(payload.result.spines) ? payload.result.spines : []
+      };
+    }
+    if (response.status !== 202) {
+      throw new Error(`capture_job_http_${response.status}`);
+    }
+    if (payload.progress) {
+      request.onProgress?.(payload.progress);
+    }
+    await sleep(Math.max(100, request.pollIntervalMs ?? 500));
+  }
+  throw new Error("capture_job_timeout");
+};
+
+// `sessionsEndpointUrl` is the API's `/scan/sessions` URL.
+export const createShelfSession = async (sessionsEndpointUrl: string): Promise<string> => {
+  const response = await fetch(sessionsEndpointUrl.trim().replace(/\/+$/, ""), { method: "POST" });
+  if (!response.ok) {
+    throw new Error(`session_http_${response.status}`);
+  }
+  const { sessionId } = (await response.json()) as { sessionId: string };
+  return sessionId;
+};
+
+export const fetchShelfSessionSummary = async (
+  sessionsEndpointUrl: string,
+  sessionId: string
+): Promise<ShelfSessionSummary> => {
+  const response = await fetch(
+    `${sessionsEndpointUrl.trim().replace(/\/+$/, "")}/${encodeURIComponent(sessionId)}`
+  );
+  if (!response.ok) {
+    throw new Error(`session_http_${response.status}`);
+  }
+  return (await response.json()) as ShelfSessionSummary;
+};
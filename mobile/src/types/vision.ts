@@ -12,7 +12,9 @@ export type FrameDetections = {
 };
 
 export type LookupBookItem = {
-  id?: string;
+  // Google Books volume id; null for local catalog rows from a Goodreads export.
+  id?: string | null;
+  goodreadsId?: string;
   title?: string;
   authors?: string[];
   publishedDate?: string;
@@ -43,6 +45,8 @@ export type CaptureScanSpine = {
     items: LookupBookItem[];
     error: string | null;
   };
+  sessionSpineId?: number;
+  reused?: boolean;
 };
 
 export type CaptureScanResponse = {
@@ -52,9 +56,29 @@ export type CaptureScanResponse = {
   spines: CaptureScanSpine[];
   timingsMs?: {
     detect: number;
-    extractLookup: number;
+    extract: number;
+    lookup: number;
     total: number;
   };
+  session?: {
+    sessionId: string;
+    captureIndex: number;
+    newSpines: number;
+    reusedSpines: number;
+    totalSpines: number;
+  };
+};
+
+export type ShelfSessionSummary = {
+  sessionId: string;
+  captures: number;
+  count: number;
+  spines: {
+    sessionSpineId: number;
+    extraction: CaptureScanSpine["extraction"];
+    lookup: CaptureScanSpine["lookup"];
+    captures: number[];
+  }[];
 };
 
 export type FeedDecision = "accepted" | "rejected" | null;
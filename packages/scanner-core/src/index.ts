@@ -2,3 +2,4 @@ export * from "./types";
 export * from "./iouTracker";
 export * from "./qualityScorer";
 export * from "./readyStateMachine";
+export * from "./packedBoxes";
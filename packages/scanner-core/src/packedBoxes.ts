@@ -0,0 +1,62 @@
+export const PACKED_BOXES_MIMETYPE = "application/vnd.bookshelf.boxes";
+
+const PACKED_MAGIC = "BSB1";
+const HEADER_BYTES = 16;
+const BOX_BYTES = 12;
+
+export type PackedBoxesPayload = {
+  count: number;
+  frameWidth: number;
+  frameHeight: number;
+  inferenceMs: number;
+  // [x1, y1, x2, y2, confidence] in frame pixels.
+  boxes: [number, number, number, number, number][];
+};
+
+/**
+ * Decode a `/detect/spines` response sent as `application/vnd.bookshelf.boxes`:
+ * a 16-byte little-endian header (magic "BSB1", u16 count, u16 frameWidth,
+ * u16 frameHeight, u16 reserved, f32 inferenceMs) followed by 12-byte records
+ * (u16 x1, y1, x2, y2, f32 confidence).
+ */
+export const decodePackedBoxes = (buffer: ArrayBuffer): PackedBoxesPayload => {
+  if (buffer.byteLength < HEADER_BYTES) {
+    throw new Error("packed_boxes_truncated");
+  }
+
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(
+    view.getUint8(0),
+    view.getUint8(1),
+    view.getUint8(2),
+    view.getUint8(3)
+  );
+  if (magic !== PACKED_MAGIC) {
+    throw new Error("packed_boxes_bad_magic");
+  }
+
+  const count = view.getUint16(4, true);
+  if (buffer.byteLength < HEADER_BYTES + count * BOX_BYTES) {
+    throw new Error("packed_boxes_truncated");
+  }
+
+  const boxes: PackedBoxesPayload["boxes"] = [];
+  for (let index = 0; index < count; index += 1) {
+    const offset = HEADER_BYTES + index * BOX_BYTES;
+    boxes.push([
+      view.getUint16(offset, true),
+      view.getUint16(offset + 2, true),
+      view.getUint16(offset + 4, true),
+      view.getUint16(offset + 6, true),
+      view.getFloat32(offset + 8, true)
+    ]);
+  }
+
+  return {
+    count,
+    frameWidth: view.getUint16(6, true),
+    frameHeight: view.getUint16(8, true),
+    inferenceMs: view.getFloat32(12, true),
+    boxes
+  };
+};
@@ -0,0 +1,23 @@
+import { describe, expect, it } from "vitest";
+import { decodePackedBoxes } from "../src/packedBoxes";
+
+// encode_packed([(10, 20, 40, 300, 0.5)], 1280, 720, 12.5) from bookshelf_scanner.transport
+const PACKED_FIXTURE = [
+  66, 83, 66, 49, 1, 0, 0, 5, 208, 2, 0, 0, 0, 0, 72, 65, 10, 0, 20, 0, 40, 0, 44, 1, 0, 0, 0, 63
+];
+
+describe("decodePackedBoxes", () => {
+  it("decodes the header and box records written by the API", () => {
+    const payload = decodePackedBoxes(new Uint8Array(PACKED_FIXTURE).buffer);
+
+    expect(payload.count).toBe(1);
+    expect(payload.frameWidth).toBe(1280);
+    expect(payload.frameHeight).toBe(720);
+    expect(payload.inferenceMs).toBeCloseTo(12.5, 5);
+    expect(payload.boxes).toEqual([[10, 20, 40, 300, 0.5]]);
+  });
+
+  it("rejects payloads without the packed magic", () => {
+    expect(() => decodePackedBoxes(new Uint8Array(20).buffer)).toThrow("packed_boxes_bad_magic");
+  });
+});
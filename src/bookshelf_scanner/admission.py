@@ -0,0 +1,108 @@
+"""Per-client admission control for the `/detect/spines` preview loop."""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+ADMITTED = "admitted"
+REJECTED = "rejected"
+SUPERSEDED = "superseded"
+DROPPED = "dropped"
+
+
+class _Ticket:
+    __slots__ = ("outcome", "event")
+
+    def __init__(self) -> None:
+        self.outcome: str | None = None
+        self.event = threading.Event()
+
+
+class _ClientState:
+    __slots__ = ("waiting",)
+
+    def __init__(self) -> None:
+        self.waiting: _Ticket | None = None
+
+
+class PreviewAdmission:
+    """At most one in-flight preview per client, latest frame wins, global in-flight cap.
+
+    A client with nothing in flight is admitted if a global slot is free and
+    rejected otherwise. A client that already has a frame in flight parks the
+    new frame as its single waiter; a newer frame supersedes that waiter, and a
+    waiter that is not handed the client's slot within `wait_timeout` is dropped.
+    When a frame finishes, its slot passes straight to the client's waiter, so
+    a busy server never re-queues stale frames behind other clients.
+    """
+
+    def __init__(self, max_in_flight: int = 4, wait_timeout: float = 2.0) -> None:
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.wait_timeout = wait_timeout
+        self.in_flight = 0
+        self.counts = {ADMITTED: 0, REJECTED: 0, SUPERSEDED: 0, DROPPED: 0}
+        self._clients: dict[str, _ClientState] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, client_id: str) -> str:
+        """Block until this frame may run or is turned away; returns the outcome."""
+        with self._lock:
+            state = self._clients.get(client_id)
+            if state is None:
+                if self.in_flight >= self.max_in_flight:
+                    self.counts[REJECTED] += 1
+                    return REJECTED
+                self._clients[client_id] = _ClientState()
+                self.in_flight += 1
+                self.counts[ADMITTED] += 1
+                return ADMITTED
+
+            if state.waiting is not None:
+                self._finish_locked(state.waiting, SUPERSEDED)
+            ticket = _Ticket()
+            state.waiting = ticket
+
+        ticket.event.wait(self.wait_timeout)
+        with self._lock:
+            if ticket.outcome is None:
+                if state.waiting is ticket:
+                    state.waiting = None
+                self._finish_locked(ticket, DROPPED)
+            return ticket.outcome
+
+    def release(self, client_id: str) -> None:
+        """Finish an admitted frame and hand its slot to the client's newest waiting frame."""
+        with self._lock:
+            state = self._clients.get(client_id)
+            if state is None:
+                return
+            if state.waiting is not None:
+                ticket, state.waiting = state.waiting, None
+                self._finish_locked(ticket, ADMITTED)
+                return
+            del self._clients[client_id]
+            self.in_flight -= 1
+
+    @contextmanager
+    def admit(self, client_id: str) -> Iterator[str]:
+        outcome = self.acquire(client_id)
+        try:
+            yield outcome
+        finally:
+            if outcome == ADMITTED:
+                self.release(client_id)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "inFlight": self.in_flight,
+                "maxInFlight": self.max_in_flight,
+                **{outcome: count for outcome, count in self.counts.items()},
+            }
+
+    def _finish_locked(self, ticket: _Ticket, outcome: str) -> None:
+        ticket.outcome = outcome
+        self.counts[outcome] += 1
+        ticket.event.set()
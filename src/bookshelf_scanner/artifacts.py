@@ -0,0 +1,192 @@
+"""Background writer for debug artifacts: annotated frames and per-spine crops."""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from PIL import Image, ImageDraw
+
+from .cropstore import CropStoreWriter
+
+logger = logging.getLogger(__name__)
+
+# (encode seconds, write seconds) for one finished artifact set.
+ArtifactObserver = Callable[[float, float], None]
+
+_BOX_COLOR = (255, 64, 64)
+_LABEL_COLOR = (255, 255, 0)
+
+
+def annotate(image: Image.Image, spines: Sequence[Any]) -> Image.Image:
+    """Copy of `image` with each spine's box and reading-order index drawn on it."""
+    annotated = image.convert("RGB") if image.mode != "RGB" else image.copy()
+    draw = ImageDraw.Draw(annotated)
+    width = max(2, round(min(annotated.size) / 300))
+    for position, spine in enumerate(spines):
+        x1, y1, x2, y2 = (int(value) for value in spine.bbox)
+        draw.rectangle((x1, y1, x2, y2), outline=_BOX_COLOR, width=width)
+        index = getattr(spine, "index", position)
+        draw.text((x1 + width + 1, y1 + width + 1), f"{index} {float(spine.confidence):.2f}", fill=_LABEL_COLOR)
+    return annotated
+
+
+def _encode_jpeg(image: Image.Image, quality: int) -> bytes:
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+class _ArtifactJob:
+    __slots__ = ("name", "image", "spines")
+
+    def __init__(self, name: str, image: Image.Image, spines: Sequence[Any]) -> None:
+        self.name = name
+        self.image = image
+        self.spines = list(spines)
+
+
+class DebugArtifactWriter:
+    """Write `<name>_annotated.jpg` and `<name>_crops/spine_NN.jpg` off the scan path.
+
+    With a `crop_store`, crops are appended to its packed segments instead of
+    being written as one small file each.
+    `submit` only enqueues; drawing, JPEG encoding and file writes happen on a
+    worker thread. When `max_queue` artifact sets are already waiting the new
+    one is dropped and counted, so a slow disk never stalls detection. Callers
+    must not modify a submitted image afterwards. The worker starts on first
+    use, so it is created after a pre-fork.
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        max_queue: int = 32,
+        jpeg_quality: int = 90,
+        save_crops: bool = True,
+        on_artifact: ArtifactObserver | None = None,
+        crop_store: CropStoreWriter | None = None,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self.max_queue = max(1, int(max_queue))
+        self.jpeg_quality = int(jpeg_quality)
+        self.save_crops = save_crops
+        self.on_artifact = on_artifact
+        self.crop_store = crop_store
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.encode_seconds = 0.0
+        self.write_seconds = 0.0
+        self._queue: queue.Queue[_ArtifactJob | None] = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._owner_pid: int | None = None
+        self._worker: threading.Thread | None = None
+
+    def submit(self, name: str, image: Image.Image, spines: Sequence[Any]) -> bool:
+        """Queue one frame's artifacts; returns False when the queue is full and they were dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(_ArtifactJob(name, image, spines))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Finish queued artifacts and stop the worker."""
+        worker = self._worker
+        if worker is None or self._owner_pid != os.getpid():
+            return
+        self._queue.put(None)
+        worker.join(timeout=timeout)
+        self._worker = None
+        self._owner_pid = None
+        if self.crop_store is not None:
+            self.crop_store.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "queued": self._queue.qsize(),
+                "encodeSeconds": round(self.encode_seconds, 3),
+                "writeSeconds": round(self.write_seconds, 3),
+            }
+
+    def __enter__(self) -> "DebugArtifactWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _ensure_started(self) -> None:
+        if self._owner_pid == os.getpid():
+            return
+        with self._lock:
+            if self._owner_pid == os.getpid():
+                return
+            # Threads do not survive fork; each worker process gets its own writer thread.
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._worker = threading.Thread(target=self._run, name="debug-artifacts", daemon=True)
+            self._worker.start()
+            self._owner_pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            try:
+                encode_seconds, write_seconds = self._write(job)
+            except Exception:
+                logger.exception("debug artifact %s failed", job.name)
+                with self._lock:
+                    self.failed += 1
+                continue
+            with self._lock:
+                self.written += 1
+                self.encode_seconds += encode_seconds
+                self.write_seconds += write_seconds
+            if self.on_artifact is not None:
+                try:
+                    self.on_artifact(encode_seconds, write_seconds)
+                except Exception:  # pragma: no cover - observers must not stop the writer
+                    logger.exception("debug artifact observer failed")
+
+    def _write(self, job: _ArtifactJob) -> tuple[float, float]:
+        started = time.perf_counter()
+        annotated = _encode_jpeg(annotate(job.image, job.spines), self.jpeg_quality)
+        crops: list[tuple[Any, bytes]] = []
+        if self.save_crops:
+            for spine in job.spines:
+                crop = job.image.crop(tuple(int(value) for value in spine.bbox))
+                crops.append((spine, _encode_jpeg(crop, self.jpeg_quality)))
+        encoded = time.perf_counter()
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        (self.output_dir / f"{job.name}_annotated.jpg").write_bytes(annotated)
+        if self.crop_store is not None:
+            for position, (spine, data) in enumerate(crops):
+                self.crop_store.add(job.name, position, data, bbox=spine.bbox)
+        elif crops:
+            crops_dir = self.output_dir / f"{job.name}_crops"
+            crops_dir.mkdir(exist_ok=True)
+            for position, (_, data) in enumerate(crops):
+                (crops_dir / f"spine_{position:02d}.jpg").write_bytes(data)
+        return encoded - started, time.perf_counter() - encoded
@@ -0,0 +1,151 @@
+"""Micro-batching of concurrent detection requests into one batched model call."""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Sequence
+
+from PIL import Image
+
+from .detections import SpineDetections
+
+logger = logging.getLogger(__name__)
+
+DetectionOutput = SpineDetections
+# (images, min_area, max_detections) -> one detect_columnar-style result per image.
+BatchRunner = Callable[[Sequence[Image.Image], int, int], list[DetectionOutput]]
+# (batch size, per-frame queue wait seconds, model run seconds)
+BatchObserver = Callable[[int, list[float], float], None]
+
+
+class _PendingFrame:
+    __slots__ = ("image", "min_area", "max_detections", "future", "enqueued_at")
+
+    def __init__(self, image: Image.Image, min_area: int, max_detections: int) -> None:
+        self.image = image
+        self.min_area = min_area
+        self.max_detections = max_detections
+        self.future: Future[DetectionOutput] = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class DetectionBatcher:
+    """Collect frames for up to `max_wait_ms` (or `max_batch_size` frames) and run them together.
+
+    A dispatcher thread takes the first waiting frame, waits for a free model
+    slot, then gathers whatever else arrives within the window. While every
+    slot is busy, frames keep accumulating, so batches grow under load and
+    stay size 1 (plus at most the window) when idle. Frames with different
+    `min_area`/`max_detections` in one batch are run as separate model calls.
+    The dispatcher starts on first use, so it is created after a pre-fork.
+    """
+
+    def __init__(
+        self,
+        runner: BatchRunner,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        concurrency: int = 1,
+        on_batch: BatchObserver | None = None,
+    ) -> None:
+        self.runner = runner
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_s = max(0.0, float(max_wait_ms)) / 1000
+        self.concurrency = max(1, int(concurrency))
+        self.on_batch = on_batch
+        self._queue: queue.SimpleQueue[_PendingFrame | None] = queue.SimpleQueue()
+        self._slots = threading.Semaphore(self.concurrency)
+        self._start_lock = threading.Lock()
+        self._owner_pid: int | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._dispatcher: threading.Thread | None = None
+
+    def detect(self, image: Image.Image, min_area: int, max_detections: int) -> DetectionOutput:
+        """Queue one frame and block until its batch has run."""
+        self._ensure_started()
+        frame = _PendingFrame(image, min_area, max_detections)
+        self._queue.put(frame)
+        return frame.future.result()
+
+    def shutdown(self) -> None:
+        if self._dispatcher is not None and self._owner_pid == os.getpid():
+            self._queue.put(None)
+            self._dispatcher.join(timeout=5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._dispatcher = None
+        self._executor = None
+
+    def _ensure_started(self) -> None:
+        if self._owner_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._owner_pid == os.getpid():
+                return
+            # Threads do not survive fork; each worker process gets its own dispatcher.
+            self._queue = queue.SimpleQueue()
+            self._slots = threading.Semaphore(self.concurrency)
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="detect-batch")
+            self._dispatcher = threading.Thread(target=self._dispatch, name="detect-batcher", daemon=True)
+            self._dispatcher.start()
+            self._owner_pid = os.getpid()
+
+    def _dispatch(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            self._slots.acquire()
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait_s
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    frame = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if frame is None:
+                    stop = True
+                    break
+                batch.append(frame)
+            assert self._executor is not None
+            self._executor.submit(self._run, batch)
+            if stop:
+                return
+
+    def _run(self, batch: list[_PendingFrame]) -> None:
+        started = time.perf_counter()
+        waits = [started - frame.enqueued_at for frame in batch]
+        settled: list[tuple[_PendingFrame, DetectionOutput | None, BaseException | None]] = []
+        try:
+            groups: dict[tuple[int, int], list[_PendingFrame]] = {}
+            for frame in batch:
+                groups.setdefault((frame.min_area, frame.max_detections), []).append(frame)
+            for (min_area, max_detections), frames in groups.items():
+                try:
+                    outputs = self.runner([frame.image for frame in frames], min_area, max_detections)
+                    if len(outputs) != len(frames):
+                        raise RuntimeError(f"batch runner returned {len(outputs)} results for {len(frames)} frames")
+                except Exception as exc:
+                    settled.extend((frame, None, exc) for frame in frames)
+                else:
+                    settled.extend((frame, output, None) for frame, output in zip(frames, outputs))
+        finally:
+            self._slots.release()
+        # Record the batch before waking requests so metrics never lag the responses.
+        if self.on_batch is not None:
+            try:
+                self.on_batch(len(batch), waits, time.perf_counter() - started)
+            except Exception:  # pragma: no cover - observers must not break detection
+                logger.exception("detection batch observer failed")
+        for frame, output, error in settled:
+            if error is not None:
+                frame.future.set_exception(error)
+            else:
+                frame.future.set_result(output)
@@ -0,0 +1,271 @@
+"""Local fuzzy catalog index used to resolve titles before hitting the network."""
+
+from __future__ import annotations
+
+import csv
+import json
+import re
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable
+
+try:
+    from . import jsonutil
+    from .schemas import CatalogMatch
+except ImportError:  # pragma: no cover - supports direct script execution
+    from bookshelf_scanner import jsonutil
+    from bookshelf_scanner.schemas import CatalogMatch
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SUBTITLE_SPLIT = re.compile(r"[:(\[]")
+
+
+def normalize_text(value: str | None) -> str:
+    """Lowercase, strip accents and punctuation, and collapse whitespace."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    ascii_only = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD.sub(" ", ascii_only.lower()).split())
+
+
+def normalize_isbn(value: str | None) -> str:
+    """Strip Goodreads `="..."` quoting and separators from an ISBN value."""
+    if not value:
+        return ""
+    cleaned = value.strip()
+    if cleaned.startswith("="):
+        cleaned = cleaned[1:]
+    cleaned = cleaned.strip('"')
+    return "".join(ch for ch in cleaned if ch.isdigit() or ch in "xX").upper()
+
+
+def trigrams(text: str) -> set[str]:
+    """Return padded character trigrams for already-normalized text."""
+    if not text:
+        return set()
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(left: str, right: str) -> float:
+    """Dice coefficient over character trigrams of two normalized strings."""
+    left_grams = trigrams(left)
+    right_grams = trigrams(right)
+    if not left_grams or not right_grams:
+        return 0.0
+    return 2 * len(left_grams & right_grams) / (len(left_grams) + len(right_grams))
+
+
+def author_similarity(query_author: str, candidate_authors: Iterable[str]) -> float:
+    """Best match of a normalized query author against normalized candidate authors.
+
+    Initials and spacing differ a lot between spines and catalog rows, so a
+    shared surname counts as a strong match on its own.
+    """
+    query_tokens = query_author.split()
+    best = 0.0
+    for candidate in candidate_authors:
+        if not candidate:
+            continue
+        score = trigram_similarity(query_author, candidate)
+        candidate_tokens = candidate.split()
+        if query_tokens and candidate_tokens and query_tokens[-1] == candidate_tokens[-1]:
+            score = max(score, 0.9)
+        best = max(best, score)
+    return best
+
+
+def title_variants(title: str) -> list[str]:
+    """Normalized full title plus the main title before any subtitle/series suffix."""
+    full = normalize_text(title)
+    main = normalize_text(_SUBTITLE_SPLIT.split(title, 1)[0])
+    if main and main != full:
+        return [full, main]
+    return [full] if full else []
+
+
+def score_candidate(
+    query_title: str,
+    query_author: str,
+    candidate_titles: Iterable[str],
+    authors: Iterable[str],
+) -> float:
+    """Score a candidate volume against a normalized title/author query."""
+    title_score = max((trigram_similarity(query_title, variant) for variant in candidate_titles), default=0.0)
+    authors = list(authors)
+    if not query_author or not authors:
+        return title_score
+    return 0.8 * title_score + 0.2 * author_similarity(query_author, authors)
+
+
+# Catalog items from a Goodreads export carry `goodreads:<Book Id>` ids; they are not Google Books volumes.
+GOODREADS_ID_PREFIX = "goodreads:"
+
+
+def goodreads_book_id(item_id: Any) -> str | None:
+    """The Goodreads `Book Id` behind a catalog item id, or None for Google Books volume ids."""
+    if isinstance(item_id, str) and item_id.startswith(GOODREADS_ID_PREFIX):
+        return item_id[len(GOODREADS_ID_PREFIX) :]
+    return None
+
+
+def goodreads_row_to_volume(row: dict[str, str]) -> dict[str, Any] | None:
+    """Convert a Goodreads export row into a Google Books `volumes` item shape."""
+    title = (row.get("Title") or "").strip()
+    if not title:
+        return None
+    book_id = (row.get("Book Id") or "").strip()
+    authors = [" ".join((row.get("Author") or "").split())]
+    authors.extend(
+        " ".join(name.split())
+        for name in (row.get("Additional Authors") or "").split(",")
+        if name.strip()
+    )
+    identifiers = []
+    isbn13 = normalize_isbn(row.get("ISBN13"))
+    if isbn13:
+        identifiers.append({"type": "ISBN_13", "identifier": isbn13})
+    isbn10 = normalize_isbn(row.get("ISBN"))
+    if isbn10:
+        identifiers.append({"type": "ISBN_10", "identifier": isbn10})
+
+    volume_info: dict[str, Any] = {
+        "title": title,
+        "authors": [name for name in authors if name],
+        "publisher": (row.get("Publisher") or "").strip() or None,
+        "publishedDate": (row.get("Original Publication Year") or row.get("Year Published") or "").strip() or None,
+        "industryIdentifiers": identifiers,
+    }
+    pages = (row.get("Number of Pages") or "").strip()
+    if pages.isdigit():
+        volume_info["pageCount"] = int(pages)
+    try:
+        volume_info["averageRating"] = float(row.get("Average Rating") or "")
+    except ValueError:
+        pass
+    if book_id:
+        volume_info["infoLink"] = f"https://www.goodreads.com/book/show/{book_id}"
+
+    return {"id": f"{GOODREADS_ID_PREFIX}{book_id}" if book_id else None, "volumeInfo": volume_info}
+
+
+class CatalogIndex:
+    """In-memory trigram index over known volumes (Goodreads rows, cached lookups)."""
+
+    DEFAULT_MIN_SCORE = 0.86
+    CANDIDATE_LIMIT = 25
+
+    def __init__(self, min_score: float = DEFAULT_MIN_SCORE) -> None:
+        self.min_score = min_score
+        self._items: list[dict[str, Any]] = []
+        self._sources: list[str] = []
+        self._title_variants: list[list[str]] = []
+        self._authors: list[list[str]] = []
+        self._postings: dict[str, list[int]] = {}
+        self._keys: set[str] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add_volume(self, item: dict[str, Any], source: str = "google_books") -> bool:
+        """Index one Google Books-shaped item. Returns False for duplicates/untitled items."""
+        volume_info = item.get("volumeInfo") or {}
+        variants = title_variants(str(volume_info.get("title") or ""))
+        if not variants:
+            return False
+        authors = [normalize_text(name) for name in volume_info.get("authors") or []]
+        key = str(item.get("id") or "") or f"{variants[0]}|{'|'.join(authors)}"
+
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            entry_id = len(self._items)
+            self._items.append(item)
+            self._sources.append(source)
+            self._title_variants.append(variants)
+            self._authors.append(authors)
+            for gram in set().union(*(trigrams(variant) for variant in variants)):
+                self._postings.setdefault(gram, []).append(entry_id)
+        return True
+
+    def load_goodreads_csv(self, path: str | Path) -> int:
+        """Index every row of a Goodreads library export."""
+        added = 0
+        with Path(path).open("r", encoding="utf-8", newline="") as handle:
+            for row in csv.DictReader(handle):
+                item = goodreads_row_to_volume(row)
+                if item is not None and self.add_volume(item, source="goodreads"):
+                    added += 1
+        return added
+
+    def load_lookup_csv(self, path: str | Path) -> int:
+        """Index the raw items stored in a `lookup.py` output CSV."""
+        added = 0
+        with Path(path).open("r", encoding="utf-8", newline="") as handle:
+            for row in csv.DictReader(handle):
+                raw = (row.get("raw_item_json") or "").strip()
+                if not raw:
+                    continue
+                try:
+                    item = jsonutil.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(item, dict) and self.add_volume(item, source="google_books"):
+                    added += 1
+        return added
+
+    def load_path(self, path: str | Path) -> int:
+        """Index a CSV, detecting Goodreads export vs lookup output from its header."""
+        with Path(path).open("r", encoding="utf-8", newline="") as handle:
+            header = next(csv.reader(handle), [])
+        if "Book Id" in header:
+            return self.load_goodreads_csv(path)
+        if "raw_item_json" in header:
+            return self.load_lookup_csv(path)
+        raise ValueError(f"Unrecognized catalog CSV format: {path}")
+
+    def match(self, title: str, author: str | None = None) -> CatalogMatch | None:
+        """Return the best confident match for a title/author pair, if any."""
+        query_title = normalize_text(title)
+        if not query_title or not self._items:
+            return None
+        query_author = normalize_text(author)
+
+        counts: Counter[int] = Counter()
+        for gram in trigrams(query_title):
+            counts.update(self._postings.get(gram, ()))
+        if not counts:
+            return None
+
+        best_id = -1
+        best_score = 0.0
+        for entry_id, _ in counts.most_common(self.CANDIDATE_LIMIT):
+            score = score_candidate(
+                query_title,
+                query_author,
+                self._title_variants[entry_id],
+                self._authors[entry_id],
+            )
+            if score > best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id < 0 or best_score < self.min_score:
+            return None
+        return CatalogMatch(
+            item=self._items[best_id],
+            score=round(best_score, 4),
+            source=self._sources[best_id],
+        )
+
+
+def build_catalog(paths: Iterable[str | Path], min_score: float = CatalogIndex.DEFAULT_MIN_SCORE) -> CatalogIndex:
+    """Create a catalog index preloaded from Goodreads exports and lookup CSVs."""
+    catalog = CatalogIndex(min_score=min_score)
+    for path in paths:
+        catalog.load_path(path)
+    return catalog
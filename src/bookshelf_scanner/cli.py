@@ -1,6 +1,21 @@
-"""CLI entry point for bookshelf scanner (to be implemented)."""
+"""CLI entry point for bookshelf scanner."""
+
+from __future__ import annotations
+
+import csv
+import os
+from pathlib import Path
+from typing import Any
 
 import typer
+from rich.console import Console
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, ProgressColumn, TextColumn, TimeElapsedColumn
+from rich.table import Table
+from rich.text import Text
+
+from .config import load_config
+from .extractor import _collect_image_paths
+from .lookup import _load_env_file
 
 app = typer.Typer(
     name="bookshelf-scanner",
@@ -8,11 +23,237 @@ app = typer.Typer(
     add_completion=False,
 )
 
+console = Console()
+
+_STAGES = ("detect", "extract", "lookup", "export")
+
+
+class _RateColumn(ProgressColumn):
+    """Items per second over rich's recent-progress window."""
+
+    def render(self, task: Any) -> Text:
+        speed = task.finished_speed or task.speed
+        return Text("-" if speed is None else f"{speed:.1f}/s", style="progress.data.speed")
+
+
+@app.callback()
+def _root() -> None:
+    """Scan bookshelves and export to Goodreads/StoryGraph CSV."""
+
+
+@app.command()
+def scan(
+    input_path: Path = typer.Argument(..., help="Shelf photo or directory of shelf photos."),
+    output: Path = typer.Option(Path("outputs/scan_results.csv"), "--output", "-o", help="Results CSV path."),
+    config: Path | None = typer.Option(None, "--config", "-c", help="Config file (defaults to ./config.yaml)."),
+    catalog: list[Path] = typer.Option(
+        [],
+        "--catalog",
+        help="Goodreads export or previous lookup CSV to resolve titles locally first (repeatable).",
+    ),
+    books_output: Path = typer.Option(
+        Path("outputs/goodreads_import.csv"), "--books-output", help="Goodreads/StoryGraph import CSV path."
+    ),
+    existing: Path | None = typer.Option(
+        None, "--existing", help="Library export (e.g. goodreads_library_export.csv); books in it are not exported again."
+    ),
+    merge: bool = typer.Option(False, "--merge", help="Write the existing export followed by the new books."),
+    no_lookup: bool = typer.Option(False, "--no-lookup", help="Skip Google Books lookups."),
+    debug_images: bool | None = typer.Option(
+        None,
+        "--debug-images/--no-debug-images",
+        help="Override processing.save_debug_images (annotated photos and crops under processing.debug_output_dir).",
+    ),
+    limit: int | None = typer.Option(None, "--limit", min=1, help="Only process the first N photos."),
+    detect_workers: int | None = typer.Option(None, min=1, help="Override pipeline.detect_workers."),
+    extract_workers: int | None = typer.Option(None, min=1, help="Override pipeline.extract_workers."),
+    lookup_workers: int | None = typer.Option(None, min=1, help="Override pipeline.lookup_workers."),
+    env_file: Path = typer.Option(Path("secrets/.env"), help="Optional env file for GOOGLE_BOOKS_API_KEY."),
+) -> None:
+    """Detect, extract and look up every spine in shelf photo(s), streaming rows to a CSV."""
+    from .artifacts import DebugArtifactWriter
+    from .cropstore import CropStoreWriter
+    from .catalog import build_catalog
+    from .exporter import BookExporter
+    from .pipeline import ScanResultWriter, build_scan_pipeline
+    from .serving import ModelPool
+
+    settings = load_config(config)
+    detection = settings["detection"]
+    extraction = settings["extraction"]
+    lookup = settings["lookup"]
+    processing = settings["processing"]
+    pipeline = settings["pipeline"]
+
+    try:
+        paths = _collect_image_paths(input_path)
+    except FileNotFoundError as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(code=1)
+    if limit is not None:
+        paths = paths[:limit]
+    if not paths:
+        console.print(f"No image files found in: {input_path}")
+        raise typer.Exit(code=1)
+
+    def _detector_factory() -> Any:
+        from .detector import SpineDetector
+
+        return SpineDetector(
+            model_path=detection["model"],
+            confidence=detection["confidence"],
+            iou_threshold=detection["iou_threshold"],
+            device=detection["device"],
+            classes=detection["classes"],
+        )
+
+    def _extractor_factory() -> Any:
+        from .extractor import BookExtractor
+
+        extractor = BookExtractor(
+            model_name=extraction["model"],
+            revision=extraction["revision"],
+            device=extraction["device"],
+            max_new_tokens=extraction["max_new_tokens"],
+            temperature=extraction["temperature"],
+        )
+        extractor.load()
+        return extractor
+
+    books_client = None
+    if lookup["enabled"] and not no_lookup:
+        from .lookup import GoogleBooksClient
+
+        _load_env_file(env_file)
+        books_client = GoogleBooksClient(
+            api_key=lookup["api_key"] or os.getenv("GOOGLE_BOOKS_API_KEY"),
+            timeout=lookup["timeout"],
+            max_results=lookup["max_results"],
+            base_url=os.getenv("GOOGLE_BOOKS_BASE_URL"),
+        )
+    catalog_index = build_catalog(catalog) if catalog else None
+
+    progress = Progress(
+        TextColumn("{task.description:<8}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        _RateColumn(),
+        TimeElapsedColumn(),
+        console=console,
+    )
+    tasks = {stage: progress.add_task(stage, total=len(paths) if stage == "detect" else 0) for stage in _STAGES}
+
+    def _on_progress(stage: str, emitted: int) -> None:
+        progress.advance(tasks[stage])
+        if stage == "detect" and emitted:
+            # Every detected spine becomes one unit of work for each later stage.
+            for later in _STAGES[1:]:
+                progress.update(tasks[later], total=progress.tasks[tasks[later]].total + emitted)
+
+    try:
+        exporter = _build_exporter(BookExporter, books_output, settings["export"], existing, merge)
+    except (OSError, ValueError) as exc:
+        console.print(f"[red]{exc}[/red]")
+        raise typer.Exit(code=1)
+
+    save_debug_images = processing["save_debug_images"] if debug_images is None else debug_images
+    artifacts = None
+    if save_debug_images:
+        debug_dir = Path(processing["debug_output_dir"])
+        artifacts = DebugArtifactWriter(
+            debug_dir,
+            crop_store=CropStoreWriter(debug_dir / "crops") if processing["packed_crops"] else None,
+        )
+
+    with ScanResultWriter(output, include_unmatched=settings["export"]["include_unmatched"]) as writer, exporter:
+        scan_pipeline = build_scan_pipeline(
+            detector_pool=ModelPool(_detector_factory, size=detect_workers or pipeline["detect_workers"], name="detector"),
+            extractor_pool=ModelPool(
+                _extractor_factory, size=extract_workers or pipeline["extract_workers"], name="extractor"
+            ),
+            writer=writer,
+            exporter=exporter,
+            artifacts=artifacts,
+            books_client=books_client,
+            catalog=catalog_index,
+            min_area=processing["min_spine_area"],
+            max_spines=processing["max_spines"],
+            lookup_workers=lookup_workers or pipeline["lookup_workers"],
+            queue_size=pipeline["queue_size"],
+            on_progress=_on_progress,
+        )
+        with progress:
+            stats = scan_pipeline.run(paths)
+    if artifacts is not None:
+        artifacts.close()
+
+    table = Table(title=f"Scanned {len(paths)} photo(s) in {stats['elapsedSeconds']:.1f}s")
+    for column in ("stage", "workers", "processed", "emitted", "errors", "busy s"):
+        table.add_column(column, justify="left" if column == "stage" else "right")
+    for name, stage in stats["stages"].items():
+        table.add_row(
+            name,
+            str(stage["workers"]),
+            str(stage["processed"]),
+            str(stage["emitted"]),
+            str(stage["errors"]),
+            f"{stage['busySeconds']:.1f}",
+        )
+    console.print(table)
+    console.print(f"Wrote: {output} ({writer.rows_written} row(s))")
+    _print_export_summary(exporter)
+    if artifacts is not None:
+        artifact_stats = artifacts.stats()
+        console.print(
+            f"Debug images: {artifact_stats['written']} written to {artifacts.output_dir}, "
+            f"{artifact_stats['dropped']} dropped, {artifact_stats['failed']} failed "
+            f"(encode {artifact_stats['encodeSeconds']:.1f}s, write {artifact_stats['writeSeconds']:.1f}s)"
+        )
+
 
 @app.command()
-def scan() -> None:
-    """Scan a bookshelf image (implementation pending)."""
-    raise NotImplementedError("CLI scan command is not implemented yet.")
+def export(
+    results: Path = typer.Argument(..., help="Scan results or lookup.py output CSV."),
+    output: Path = typer.Option(
+        Path("outputs/goodreads_import.csv"), "--output", "-o", help="Goodreads/StoryGraph import CSV path."
+    ),
+    existing: Path | None = typer.Option(
+        None, "--existing", help="Library export (e.g. goodreads_library_export.csv); books in it are not exported again."
+    ),
+    merge: bool = typer.Option(False, "--merge", help="Write the existing export followed by the new books."),
+    config: Path | None = typer.Option(None, "--config", "-c", help="Config file (defaults to ./config.yaml)."),
+) -> None:
+    """Turn a results CSV into a Goodreads/StoryGraph import file without rescanning."""
+    from .exporter import BookExporter
+
+    settings = load_config(config)
+    try:
+        exporter = _build_exporter(BookExporter, output, settings["export"], existing, merge)
+        with exporter, results.open("r", encoding="utf-8", newline="") as handle:
+            exporter.add_lookup_rows(csv.DictReader(handle))
+    except (OSError, ValueError) as exc:
+        console.print(f"[red]Export failed: {type(exc).__name__}: {exc}[/red]")
+        raise typer.Exit(code=1)
+    _print_export_summary(exporter)
+
+
+def _build_exporter(exporter_cls: Any, path: Path, settings: dict[str, Any], existing: Path | None, merge: bool) -> Any:
+    return exporter_cls(
+        path,
+        export_format=settings["format"],
+        default_shelf=settings["default_shelf"],
+        date_format=settings["date_format"],
+        include_unmatched=settings["include_unmatched"],
+        existing=existing,
+        merge=merge,
+    )
+
+
+def _print_export_summary(exporter: Any) -> None:
+    details = f"{exporter.written} new book(s), {exporter.skipped} duplicate(s) skipped"
+    if exporter.merge:
+        details += f", {exporter.copied} copied from the existing export"
+    console.print(f"Wrote: {exporter.path} ({details})")
 
 
 def main() -> None:
@@ -0,0 +1,78 @@
+"""`config.yaml` loading with defaults for every setting the CLI reads."""
+
+from __future__ import annotations
+
+import copy
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+DEFAULT_CONFIG_PATH = Path("config.yaml")
+
+DEFAULT_CONFIG: dict[str, Any] = {
+    "detection": {
+        "model": "yolov8n.pt",
+        "confidence": 0.25,
+        "iou_threshold": 0.45,
+        "device": "auto",
+        "classes": [73],
+    },
+    "extraction": {
+        "model": "moondream-0.5b",
+        "revision": None,
+        "device": "auto",
+        "max_new_tokens": 100,
+        "temperature": 0.1,
+    },
+    "lookup": {
+        "enabled": True,
+        "api_key": None,
+        "timeout": 10,
+        "max_results": 5,
+        "fallback_to_extraction": True,
+    },
+    "export": {
+        "format": "goodreads",
+        "default_shelf": "to-read",
+        "include_unmatched": True,
+        "date_format": "%Y/%m/%d",
+    },
+    "processing": {
+        "max_spines": 50,
+        "min_spine_area": 1000,
+        "save_debug_images": False,
+        "debug_output_dir": "debug/",
+        "packed_crops": True,
+    },
+    "pipeline": {
+        "detect_workers": 1,
+        "extract_workers": 1,
+        "lookup_workers": 4,
+        "queue_size": 16,
+    },
+}
+
+
+def _merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_config(path: str | Path | None = None) -> dict[str, Any]:
+    """Read `config.yaml` (or `path`) over the defaults; a missing default file is not an error."""
+    config_path = Path(path) if path is not None else DEFAULT_CONFIG_PATH
+    if not config_path.exists():
+        if path is not None:
+            raise FileNotFoundError(f"Config file not found: {config_path}")
+        return copy.deepcopy(DEFAULT_CONFIG)
+    with config_path.open("r", encoding="utf-8") as handle:
+        loaded = yaml.safe_load(handle) or {}
+    if not isinstance(loaded, dict):
+        raise ValueError(f"Config file must contain a mapping: {config_path}")
+    return _merge(copy.deepcopy(DEFAULT_CONFIG), loaded)
@@ -0,0 +1,280 @@
+"""Packed crop store: spine crops of many captures appended to large segment files plus an index.
+
+Layout of a store directory:
+
+- `<writer>-NNNN.seg`: concatenated JPEG bytes; a new segment starts once one
+  reaches `max_segment_bytes`.
+- `<writer>.idx.csv`: one row per crop with `capture_id, spine_index, x1, y1,
+  x2, y2, segment, offset, length`.
+
+Every writer (one per process) has its own segments and index, so forked API
+workers never share a file. Readers load all indexes and memory-map segments
+on first access, so reading a crop is a slice of a mapped file rather than an
+open/read/close of a tiny file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import mmap
+import os
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple, Sequence
+
+from PIL import Image
+
+INDEX_SUFFIX = ".idx.csv"
+SEGMENT_SUFFIX = ".seg"
+INDEX_COLUMNS = ["capture_id", "spine_index", "x1", "y1", "x2", "y2", "segment", "offset", "length"]
+DEFAULT_SEGMENT_BYTES = 256 * 1024 * 1024
+
+
+class CropRecord(NamedTuple):
+    capture_id: str
+    spine_index: int
+    bbox: tuple[int, int, int, int] | None
+    segment: str
+    offset: int
+    length: int
+
+    @property
+    def name(self) -> str:
+        """Path-like label matching the old `<capture>_crops/spine_NN.jpg` layout."""
+        return f"{self.capture_id}_crops/spine_{self.spine_index:02d}.jpg"
+
+
+def is_crop_store(path: str | Path) -> bool:
+    path = Path(path)
+    return path.is_dir() and any(path.glob(f"*{INDEX_SUFFIX}"))
+
+
+class CropStoreWriter:
+    """Append crops to this process's segment files and index. Thread-safe."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        jpeg_quality: int = 90,
+    ) -> None:
+        self.path = Path(path)
+        self.max_segment_bytes = max(1, int(max_segment_bytes))
+        self.jpeg_quality = int(jpeg_quality)
+        self.records_written = 0
+        self._writer_id: str | None = None
+        self._owner_pid: int | None = None
+        self._segment_number = 0
+        self._segment: Any = None
+        self._segment_name = ""
+        self._segment_size = 0
+        self._index: Any = None
+        self._index_writer: Any = None
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        capture_id: str,
+        spine_index: int,
+        crop: Image.Image | bytes,
+        bbox: Sequence[int] | None = None,
+    ) -> CropRecord:
+        """Store one crop (a PIL image is JPEG-encoded first) and index it."""
+        if isinstance(crop, Image.Image):
+            image = crop if crop.mode in ("RGB", "L") else crop.convert("RGB")
+            buffer = BytesIO()
+            image.save(buffer, format="JPEG", quality=self.jpeg_quality)
+            data = buffer.getvalue()
+        else:
+            data = bytes(crop)
+        box = tuple(int(value) for value in bbox) if bbox is not None else None
+
+        with self._lock:
+            self._ensure_open()
+            if self._segment_size and self._segment_size + len(data) > self.max_segment_bytes:
+                self._start_segment()
+            offset = self._segment_size
+            self._segment.write(data)
+            self._segment.flush()
+            self._segment_size += len(data)
+            record = CropRecord(str(capture_id), int(spine_index), box, self._segment_name, offset, len(data))  # type: ignore[arg-type]
+            # The index row is written after the bytes are flushed, so a crash never indexes a partial crop.
+            self._index_writer.writerow(_record_row(record))
+            self._index.flush()
+            self.records_written += 1
+            return record
+
+    def close(self) -> None:
+        with self._lock:
+            for handle in (self._segment, self._index):
+                if handle is not None:
+                    handle.close()
+            self._segment = None
+            self._index = None
+            self._index_writer = None
+            self._owner_pid = None
+
+    def __enter__(self) -> "CropStoreWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _ensure_open(self) -> None:
+        if self._owner_pid == os.getpid():
+            return
+        # A forked child must not append to its parent's files; it starts its own writer id.
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._writer_id = f"{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-{id(self) & 0xFFFF:04x}"
+        self._segment_number = 0
+        self._index = (self.path / f"{self._writer_id}{INDEX_SUFFIX}").open("w", newline="", encoding="utf-8")
+        self._index_writer = csv.writer(self._index)
+        self._index_writer.writerow(INDEX_COLUMNS)
+        self._start_segment()
+        self._owner_pid = os.getpid()
+
+    def _start_segment(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+        self._segment_number += 1
+        self._segment_name = f"{self._writer_id}-{self._segment_number:04d}{SEGMENT_SUFFIX}"
+        self._segment = (self.path / self._segment_name).open("ab")
+        self._segment_size = 0
+
+
+def _record_row(record: CropRecord) -> list[str]:
+    bbox = [str(value) for value in record.bbox] if record.bbox is not None else ["", "", "", ""]
+    return [record.capture_id, str(record.spine_index), *bbox, record.segment, str(record.offset), str(record.length)]
+
+
+class CropStore:
+    """Read-only view of a crop store; crops are sliced out of memory-mapped segments."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        if not self.path.is_dir():
+            raise FileNotFoundError(f"Crop store not found: {self.path}")
+        self._records = self._load_index()
+        self._maps: dict[str, tuple[object, mmap.mmap]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[CropRecord]:
+        return iter(self._records)
+
+    def records(self, capture_id: str | None = None) -> list[CropRecord]:
+        if capture_id is None:
+            return list(self._records)
+        return [record for record in self._records if record.capture_id == capture_id]
+
+    def capture_ids(self) -> list[str]:
+        return list(dict.fromkeys(record.capture_id for record in self._records))
+
+    def read_bytes(self, record: CropRecord) -> bytes:
+        mapped = self._map(record.segment, record.offset + record.length)
+        return mapped[record.offset : record.offset + record.length]
+
+    def open_image(self, record: CropRecord) -> Image.Image:
+        """Decode one crop as an RGB image."""
+        image = Image.open(BytesIO(self.read_bytes(record)))
+        return image.convert("RGB") if image.mode != "RGB" else image
+
+    def close(self) -> None:
+        with self._lock:
+            for handle, mapped in self._maps.values():
+                mapped.close()
+                handle.close()  # type: ignore[attr-defined]
+            self._maps.clear()
+
+    def __enter__(self) -> "CropStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _map(self, segment: str, needed: int) -> mmap.mmap:
+        with self._lock:
+            entry = self._maps.get(segment)
+            # Segments still being written can outgrow an earlier mapping; remap once they do.
+            if entry is None or len(entry[1]) < needed:
+                if entry is not None:
+                    entry[1].close()
+                    entry[0].close()  # type: ignore[attr-defined]
+                handle = (self.path / segment).open("rb")
+                entry = (handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+                self._maps[segment] = entry
+            if len(entry[1]) < needed:
+                raise ValueError(f"crop extends past the end of segment {segment}")
+            return entry[1]
+
+    def _load_index(self) -> list[CropRecord]:
+        records: list[CropRecord] = []
+        for index_path in sorted(self.path.glob(f"*{INDEX_SUFFIX}")):
+            with index_path.open("r", encoding="utf-8", newline="") as handle:
+                for row in csv.DictReader(handle):
+                    coordinates = [row.get(name) or "" for name in ("x1", "y1", "x2", "y2")]
+                    records.append(
+                        CropRecord(
+                            capture_id=row["capture_id"],
+                            spine_index=int(row["spine_index"]),
+                            bbox=tuple(int(value) for value in coordinates) if all(coordinates) else None,  # type: ignore[arg-type]
+                            segment=row["segment"],
+                            offset=int(row["offset"]),
+                            length=int(row["length"]),
+                        )
+                    )
+        return records
+
+
+def pack_crop_directories(source: str | Path, store_path: str | Path) -> int:
+    """Pack existing `<capture>_crops/spine_NN.jpg` directories into a store; returns crops packed."""
+    packed = 0
+    with CropStoreWriter(store_path) as writer:
+        for crops_dir in sorted(Path(source).glob("*_crops")):
+            if not crops_dir.is_dir():
+                continue
+            capture_id = crops_dir.name[: -len("_crops")]
+            for crop_path in sorted(crops_dir.glob("spine_*.jpg")):
+                try:
+                    spine_index = int(crop_path.stem.split("_", 1)[1])
+                except ValueError:
+                    continue
+                writer.add(capture_id, spine_index, crop_path.read_bytes())
+                packed += 1
+    return packed
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Pack or inspect spine crop stores.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    pack = subparsers.add_parser("pack", help="Pack <capture>_crops/spine_NN.jpg directories into a crop store.")
+    pack.add_argument("source", type=Path, help="Directory containing *_crops directories (e.g. outputs/detections).")
+    pack.add_argument("store", type=Path, help="Crop store directory to append to.")
+    info = subparsers.add_parser("info", help="Summarize a crop store.")
+    info.add_argument("store", type=Path, help="Crop store directory.")
+    return parser
+
+
+def _run_cli() -> int:
+    args = _build_arg_parser().parse_args()
+    if args.command == "pack":
+        packed = pack_crop_directories(args.source, args.store)
+        print(f"Packed {packed} crop(s) into {args.store}")
+        return 0
+    with CropStore(args.store) as store:
+        segments = {record.segment for record in store}
+        total = sum(record.length for record in store)
+        print(
+            f"{args.store}: {len(store)} crop(s), {len(store.capture_ids())} capture(s), "
+            f"{len(segments)} segment(s), {total / 1e6:.1f} MB"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_run_cli())
@@ -0,0 +1,119 @@
+"""Pre-extraction suppression of overlapping boxes and visually identical spine crops."""
+
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+from PIL import Image, ImageStat
+
+HASH_SIZE = 8
+
+
+def box_overlap(a: Sequence[int], b: Sequence[int]) -> tuple[float, float]:
+    """Return (IoU, intersection over the smaller box) for two xyxy boxes."""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    if inter == 0:
+        return 0.0, 0.0
+    area_a = max(0, a[2] - a[0]) * max(0, a[3] - a[1])
+    area_b = max(0, b[2] - b[0]) * max(0, b[3] - b[1])
+    union = area_a + area_b - inter
+    smaller = min(area_a, area_b)
+    return (inter / union if union else 0.0), (inter / smaller if smaller else 0.0)
+
+
+def _hash_thumbnail(image: Image.Image, hash_size: int = HASH_SIZE) -> Image.Image:
+    # Spines are tall and thin, so hash the crop as if it were lying on its side.
+    if image.height > image.width:
+        image = image.transpose(Image.Transpose.ROTATE_90)
+    return image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+
+
+def difference_hash(image: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """64-bit dHash of a crop; near-identical crops differ in only a few bits."""
+    return _thumbnail_hash(_hash_thumbnail(image, hash_size), hash_size)
+
+
+def _thumbnail_hash(thumbnail: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    pixels = thumbnail.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def crop_signature(image: Image.Image, min_texture: float = 8.0) -> int | None:
+    """dHash of a crop, or None when the crop is too uniform to identify by its hash."""
+    thumbnail = _hash_thumbnail(image)
+    if ImageStat.Stat(thumbnail).stddev[0] < min_texture:
+        return None
+    return _thumbnail_hash(thumbnail)
+
+
+def hamming_distance(left: int, right: int) -> int:
+    return (left ^ right).bit_count()
+
+
+def similar_size(a: tuple[int, int], b: tuple[int, int], tolerance: float = 0.2) -> bool:
+    """True when two (width, height) sizes differ by at most `tolerance` per side."""
+    return all(abs(x - y) <= tolerance * max(x, y) for x, y in zip(a, b))
+
+
+def dedupe_spines(
+    crops: Sequence[Image.Image],
+    spines: Sequence[Any],
+    *,
+    containment_threshold: float = 0.85,
+    iou_threshold: float = 0.7,
+    hash_overlap: float = 0.3,
+    hash_distance: int = 4,
+    min_texture: float = 8.0,
+) -> tuple[list[Image.Image], list[Any], dict[str, int]]:
+    """Keep one representative per group of overlapping or visually identical spines.
+
+    Spines are visited in the given (reading) order; a spine is dropped when its
+    box heavily overlaps an already kept box, or when it partly overlaps one
+    (intersection over the smaller box at least `hash_overlap`) and its crop
+    hash is within `hash_distance` bits of that crop at a similar size. Boxes
+    that merely touch are never hash-matched: a series shares one spine design,
+    so neighbouring volumes hash alike. Near-uniform crops (grayscale stddev
+    below `min_texture`) are never hash-matched either. Returns the kept
+    crops/spines and counts of what was merged.
+    """
+    kept_crops: list[Image.Image] = []
+    kept_spines: list[Any] = []
+    kept_hashes: list[int | None] = []
+    stats = {"mergedBoxes": 0, "duplicateCrops": 0}
+
+    for crop, spine in zip(crops, spines):
+        overlapped = False
+        neighbours: list[int] = []
+        for position, other in enumerate(kept_spines):
+            iou, containment = box_overlap(spine.bbox, other.bbox)
+            if iou >= iou_threshold or containment >= containment_threshold:
+                overlapped = True
+                break
+            if containment >= hash_overlap:
+                neighbours.append(position)
+        if overlapped:
+            stats["mergedBoxes"] += 1
+            continue
+
+        crop_hash = crop_signature(crop, min_texture)
+        if crop_hash is not None and any(
+            kept_hashes[position] is not None
+            and hamming_distance(crop_hash, kept_hashes[position]) <= hash_distance
+            and similar_size(crop.size, kept_crops[position].size)
+            for position in neighbours
+        ):
+            stats["duplicateCrops"] += 1
+            continue
+
+        kept_crops.append(crop)
+        kept_spines.append(spine)
+        kept_hashes.append(crop_hash)
+
+    return kept_crops, kept_spines, stats
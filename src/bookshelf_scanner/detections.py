@@ -0,0 +1,145 @@
+"""Columnar (NumPy-backed) spine detection results."""
+
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+import numpy as np
+from PIL import Image
+
+from .schemas import DetectedSpine
+
+
+def _to_numpy(values: Any) -> np.ndarray:
+    # Torch tensors (possibly on GPU) expose .cpu(); NumPy arrays and lists pass straight through.
+    if hasattr(values, "cpu"):
+        values = values.cpu().numpy()
+    return np.asarray(values)
+
+
+class SpineDetections:
+    """Boxes, confidences and detector indices for one frame as parallel arrays.
+
+    `boxes` is an `(n, 4)` int32 array of `x1, y1, x2, y2`, `confidences` a
+    float32 array and `indices` the positions of each box in the detector
+    output. Filtering and ordering return new instances without creating
+    per-box objects; `to_spines()` builds `DetectedSpine`s only when a caller
+    still needs them.
+    """
+
+    __slots__ = ("boxes", "confidences", "indices")
+
+    def __init__(self, boxes: np.ndarray, confidences: np.ndarray, indices: np.ndarray | None = None) -> None:
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        self.confidences = np.asarray(confidences, dtype=np.float32).reshape(-1)
+        self.indices = (
+            np.arange(len(self.boxes), dtype=np.int32) if indices is None else np.asarray(indices, dtype=np.int32)
+        )
+
+    @classmethod
+    def empty(cls) -> "SpineDetections":
+        return cls(np.zeros((0, 4), dtype=np.int32), np.zeros(0, dtype=np.float32))
+
+    @classmethod
+    def from_boxes(cls, boxes: Any) -> "SpineDetections":
+        """Build from an ultralytics `Boxes` object (its `xyxy` and `conf` tensors) in one copy each."""
+        if boxes is None or len(boxes) == 0:
+            return cls.empty()
+        # astype(int32) truncates toward zero, matching the old per-box `int(...)` conversion.
+        return cls(_to_numpy(boxes.xyxy).astype(np.int32), _to_numpy(boxes.conf).astype(np.float32))
+
+    @classmethod
+    def from_spines(cls, spines: Sequence[DetectedSpine]) -> "SpineDetections":
+        if not spines:
+            return cls.empty()
+        return cls(
+            np.array([spine.bbox for spine in spines], dtype=np.int32),
+            np.array([spine.confidence for spine in spines], dtype=np.float32),
+            np.array([spine.index for spine in spines], dtype=np.int32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    @property
+    def widths(self) -> np.ndarray:
+        return self.boxes[:, 2] - self.boxes[:, 0]
+
+    @property
+    def heights(self) -> np.ndarray:
+        return self.boxes[:, 3] - self.boxes[:, 1]
+
+    @property
+    def areas(self) -> np.ndarray:
+        return self.widths.astype(np.int64) * self.heights
+
+    def take(self, order: np.ndarray | slice) -> "SpineDetections":
+        return SpineDetections(self.boxes[order], self.confidences[order], self.indices[order])
+
+    def filter_min_area(self, min_area: int) -> "SpineDetections":
+        return self.take(np.flatnonzero(self.areas >= min_area))
+
+    def head(self, count: int) -> "SpineDetections":
+        return self.take(slice(0, max(0, int(count))))
+
+    def reading_order(self) -> np.ndarray:
+        """Permutation that puts boxes in shelf reading order: rows top to bottom, then left to right.
+
+        Same grouping as the original per-object sort: boxes are visited left to
+        right and join the first row whose vertical extent contains their
+        center; rows are ordered by their top edge.
+        """
+        count = len(self.boxes)
+        if count < 2:
+            return np.arange(count)
+        by_left = np.argsort(self.boxes[:, 0], kind="stable")
+        # Row assignment is inherently sequential; it runs on plain floats so the loop stays cheap.
+        tops = self.boxes[by_left, 1].tolist()
+        bottoms = self.boxes[by_left, 3].tolist()
+        row_tops: list[int] = []
+        row_bottoms: list[int] = []
+        rows = np.empty(count, dtype=np.int64)
+        for position, (top, bottom) in enumerate(zip(tops, bottoms)):
+            center = (top + bottom) / 2
+            for row, (row_top, row_bottom) in enumerate(zip(row_tops, row_bottoms)):
+                if row_top <= center <= row_bottom:
+                    rows[position] = row
+                    if top < row_top:
+                        row_tops[row] = top
+                    if bottom > row_bottom:
+                        row_bottoms[row] = bottom
+                    break
+            else:
+                rows[position] = len(row_tops)
+                row_tops.append(top)
+                row_bottoms.append(bottom)
+        row_rank = np.empty(len(row_tops), dtype=np.int64)
+        row_rank[np.argsort(np.asarray(row_tops), kind="stable")] = np.arange(len(row_tops))
+        # Within a row boxes keep their left-to-right visiting order.
+        return by_left[np.lexsort((np.arange(count), row_rank[rows]))]
+
+    def sorted(self) -> "SpineDetections":
+        return self.take(self.reading_order())
+
+    def renumbered(self) -> "SpineDetections":
+        """Same boxes with indices 0..n-1 in their current order."""
+        return SpineDetections(self.boxes, self.confidences)
+
+    def rows(self) -> list[tuple[int, int, int, int, float]]:
+        """`(x1, y1, x2, y2, confidence)` tuples, the shape the compact preview encoders take."""
+        return [
+            (x1, y1, x2, y2, confidence)
+            for (x1, y1, x2, y2), confidence in zip(self.boxes.tolist(), self.confidences.tolist())
+        ]
+
+    def to_spines(self) -> list[DetectedSpine]:
+        """Materialize `DetectedSpine` objects; values come from the detector, so validation is skipped."""
+        return [
+            DetectedSpine.trusted((x1, y1, x2, y2), confidence, index)
+            for (x1, y1, x2, y2), confidence, index in zip(
+                self.boxes.tolist(), self.confidences.tolist(), self.indices.tolist()
+            )
+        ]
+
+    def crops(self, image: Image.Image) -> list[Image.Image]:
+        return [image.crop(tuple(box)) for box in self.boxes.tolist()]
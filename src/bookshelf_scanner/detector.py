@@ -10,11 +10,12 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Iterator
+from typing import Iterator, Sequence
 
 from PIL import Image
 from ultralytics import YOLO
 
+from .detections import SpineDetections
 from .schemas import DetectedSpine
 
 logger = logging.getLogger(__name__)
@@ -67,29 +68,78 @@ class SpineDetector:
             logger.warning("No book spines detected in image")
             return
 
-        detections: list[DetectedSpine] = []
-        for i, box in enumerate(results[0].boxes):
-            bbox = tuple(map(int, box.xyxy[0].tolist()))
-            spine = DetectedSpine(
-                bbox=bbox,
-                confidence=float(box.conf[0]),
-                index=i,
-            )
-            if spine.area >= min_area:
-                detections.append(spine)
+        crops, detections = self._collect_spines(results[0], image, min_area, max_detections)
+        logger.info("Detected %s book spines", len(detections))
+        yield from zip(crops, detections)
 
-        detections = self._sort_reading_order(detections)
-        detections = detections[:max_detections]
+    def detect_batch(
+        self,
+        images: Sequence[Image.Image],
+        min_area: int = 1000,
+        max_detections: int = 50,
+    ) -> list[tuple[list[Image.Image], list[DetectedSpine]]]:
+        """Run one batched YOLO call over several frames; returns `detect_all` output per frame."""
+        return [
+            (detections.crops(image), detections.to_spines())
+            for detections, image in zip(self.detect_columnar_batch(images, min_area, max_detections), images)
+        ]
+
+    def detect_columnar(
+        self,
+        image: Image.Image | str | Path,
+        min_area: int = 1000,
+        max_detections: int = 50,
+    ) -> SpineDetections:
+        """Detect spines and return array-backed boxes in reading order, without crops or per-box objects."""
+        if isinstance(image, (str, Path)):
+            image = Image.open(image).convert("RGB")
 
-        for i, det in enumerate(detections):
-            det.index = i
+        results = self.model.predict(
+            source=image,
+            conf=self.confidence,
+            iou=self.iou_threshold,
+            classes=self.classes,
+            device=self.device,
+            verbose=False,
+        )
+        if not results:
+            return SpineDetections.empty()
+        return self._select(results[0], min_area, max_detections)
 
-        logger.info("Detected %s book spines", len(detections))
+    def detect_columnar_batch(
+        self,
+        images: Sequence[Image.Image],
+        min_area: int = 1000,
+        max_detections: int = 50,
+    ) -> list[SpineDetections]:
+        """Run one batched YOLO call over several frames; returns `detect_columnar` output per frame."""
+        if not images:
+            return []
+
+        results = self.model.predict(
+            source=list(images),
+            conf=self.confidence,
+            iou=self.iou_threshold,
+            classes=self.classes,
+            device=self.device,
+            verbose=False,
+        )
+        return [self._select(result, min_area, max_detections) for result in results]
 
-        for det in detections:
-            x1, y1, x2, y2 = det.bbox
-            cropped = image.crop((x1, y1, x2, y2))
-            yield cropped, det
+    @staticmethod
+    def _select(result, min_area: int, max_detections: int) -> SpineDetections:
+        detections = SpineDetections.from_boxes(result.boxes).filter_min_area(min_area)
+        return detections.sorted().head(max_detections).renumbered()
+
+    def _collect_spines(
+        self,
+        result,
+        image: Image.Image,
+        min_area: int,
+        max_detections: int,
+    ) -> tuple[list[Image.Image], list[DetectedSpine]]:
+        detections = self._select(result, min_area, max_detections)
+        return detections.crops(image), detections.to_spines()
 
     def detect_all(
         self,
@@ -121,29 +171,7 @@ class SpineDetector:
     def _sort_reading_order(detections: list[DetectedSpine]) -> list[DetectedSpine]:
         if not detections:
             return detections
-
-        detections = sorted(detections, key=lambda d: d.bbox[0])
-        rows: list[list[DetectedSpine]] = []
-
-        for det in detections:
-            det_center_y = (det.bbox[1] + det.bbox[3]) / 2
-            placed = False
-
-            for row in rows:
-                row_top = min(d.bbox[1] for d in row)
-                row_bottom = max(d.bbox[3] for d in row)
-                if row_top <= det_center_y <= row_bottom:
-                    row.append(det)
-                    placed = True
-                    break
-
-            if not placed:
-                rows.append([det])
-
-        rows.sort(key=lambda row: min(d.bbox[1] for d in row))
-        for row in rows:
-            row.sort(key=lambda d: d.bbox[0])
-
-        return [det for row in rows for det in row]
+        order = SpineDetections.from_spines(detections).reading_order()
+        return [detections[position] for position in order.tolist()]
 
 # %%
@@ -1,8 +1,264 @@
-"""CSV exporter (to be implemented)."""
+"""Streaming Goodreads/StoryGraph CSV export with an indexed merge into an existing library export."""
+
+from __future__ import annotations
+
+import csv
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from . import jsonutil
+from .catalog import goodreads_book_id, normalize_isbn, normalize_text, title_variants
+
+# Column layout of a Goodreads library export. Goodreads imports it as-is and
+# StoryGraph's importer accepts the same Goodreads file.
+GOODREADS_COLUMNS = [
+    "Book Id",
+    "Title",
+    "Author",
+    "Author l-f",
+    "Additional Authors",
+    "ISBN",
+    "ISBN13",
+    "My Rating",
+    "Average Rating",
+    "Publisher",
+    "Binding",
+    "Number of Pages",
+    "Year Published",
+    "Original Publication Year",
+    "Date Read",
+    "Date Added",
+    "Bookshelves",
+    "Bookshelves with positions",
+    "Exclusive Shelf",
+    "My Review",
+    "Spoiler",
+    "Private Notes",
+    "Read Count",
+    "Owned Copies",
+]
+
+EXPORT_FORMATS = ("goodreads", "storygraph")
+_EXCLUSIVE_SHELVES = ("read", "currently-reading", "to-read")
+
+
+def isbn13(value: str | None) -> str:
+    """Normalized ISBN-13 for an ISBN-10 or ISBN-13 value (Goodreads `="..."` quoting allowed)."""
+    digits = normalize_isbn(value)
+    if len(digits) == 13:
+        return digits
+    if len(digits) != 10:
+        return ""
+    core = "978" + digits[:9]
+    if not core.isdigit():
+        return ""
+    total = sum(int(ch) * (1 if index % 2 == 0 else 3) for index, ch in enumerate(core))
+    return core + str((10 - total % 10) % 10)
+
+
+def book_keys(book: dict[str, str]) -> list[str]:
+    """Identity keys of a Goodreads-format row: ISBN-13, Book Id, and main title + author surname."""
+    keys: list[str] = []
+    isbn = isbn13(book.get("ISBN13")) or isbn13(book.get("ISBN"))
+    if isbn:
+        keys.append(f"isbn:{isbn}")
+    book_id = (book.get("Book Id") or "").strip()
+    if book_id:
+        keys.append(f"id:{book_id}")
+    variants = title_variants(book.get("Title") or "")
+    if variants:
+        # The main title drops series/subtitle suffixes that differ between Goodreads and Google Books;
+        # the surname ignores initials and spacing ("Michael   Lewis" vs "Michael M. Lewis").
+        surname = (normalize_text(book.get("Author")).split() or [""])[-1]
+        keys.append(f"title:{variants[-1]}|{surname}")
+    return keys
+
+
+def _quoted_isbn(value: str) -> str:
+    return f'="{value}"' if value else '=""'
+
+
+def book_from_volume(
+    item: dict[str, Any],
+    shelf: str = "to-read",
+    date_added: str = "",
+) -> dict[str, str] | None:
+    """Goodreads-format row for a Google Books `volumes` item (or a catalog item built from Goodreads)."""
+    info = item.get("volumeInfo") or {}
+    title = " ".join(str(info.get("title") or "").split())
+    if not title:
+        return None
+    subtitle = " ".join(str(info.get("subtitle") or "").split())
+    authors = [" ".join(str(name).split()) for name in info.get("authors") or [] if name]
+    identifiers = {entry.get("type"): str(entry.get("identifier") or "") for entry in info.get("industryIdentifiers") or []}
+    author = authors[0] if authors else ""
+    name_parts = author.rsplit(" ", 1)
+    published = str(info.get("publishedDate") or "")
+    rating = info.get("averageRating")
+    pages = info.get("pageCount")
+    return {
+        "Book Id": goodreads_book_id(item.get("id")) or "",
+        "Title": f"{title}: {subtitle}" if subtitle else title,
+        "Author": author,
+        "Author l-f": f"{name_parts[1]}, {name_parts[0]}" if len(name_parts) == 2 else author,
+        "Additional Authors": ", ".join(authors[1:]),
+        "ISBN": _quoted_isbn(normalize_isbn(identifiers.get("ISBN_10"))),
+        "ISBN13": _quoted_isbn(normalize_isbn(identifiers.get("ISBN_13"))),
+        "My Rating": "0",
+        "Average Rating": f"{float(rating):.2f}" if rating is not None else "",
+        "Publisher": str(info.get("publisher") or ""),
+        "Binding": "",
+        "Number of Pages": str(pages) if pages else "",
+        "Year Published": published[:4],
+        "Original Publication Year": "",
+        "Date Read": "",
+        "Date Added": date_added,
+        "Bookshelves": shelf,
+        "Bookshelves with positions": "",
+        "Exclusive Shelf": shelf if shelf in _EXCLUSIVE_SHELVES else "to-read",
+        "My Review": "",
+        "Spoiler": "",
+        "Private Notes": "",
+        "Read Count": "0",
+        "Owned Copies": "0",
+    }
 
 
 class BookExporter:
-    """Placeholder for the CSV export pipeline."""
+    """Write scanned books as Goodreads/StoryGraph CSV rows while they stream in.
+
+    With an `existing` library export, its rows are read once: every row's
+    ISBN-13, Book Id and title/author key goes into a set (and, when `merge`
+    is true, the row itself is copied straight to the output). Each scanned
+    book is then an O(1) membership check, so only new books are written and
+    memory holds keys rather than rows. Books added during the run join the
+    index, so a spine seen in two photos is exported once.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        export_format: str = "goodreads",
+        default_shelf: str = "to-read",
+        date_format: str = "%Y/%m/%d",
+        include_unmatched: bool = True,
+        existing: str | Path | None = None,
+        merge: bool = False,
+    ) -> None:
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format} (expected one of {', '.join(EXPORT_FORMATS)})")
+        self.path = Path(path)
+        self.export_format = export_format
+        self.default_shelf = default_shelf
+        self.date_added = datetime.now().strftime(date_format)
+        self.include_unmatched = include_unmatched
+        self.existing = Path(existing) if existing is not None else None
+        self.merge = merge
+        if merge and self.existing is None:
+            raise ValueError("merge=True needs an existing export to merge into")
+        if self.existing is not None and not self.existing.is_file():
+            raise FileNotFoundError(f"Existing export not found: {self.existing}")
+        if self.existing is not None and self.existing.resolve() == self.path.resolve():
+            raise ValueError("export path must differ from the existing export it is merged with")
+        self.copied = 0
+        self.written = 0
+        self.skipped = 0
+        self._keys: set[str] = set()
+        self._handle: Any = None
+        self._writer: csv.DictWriter | None = None
+
+    def open(self) -> "BookExporter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.path.open("w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._handle, fieldnames=GOODREADS_COLUMNS, extrasaction="ignore")
+        self._writer.writeheader()
+        if self.existing is not None:
+            self._index_existing(self.existing)
+        self._handle.flush()
+        return self
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self._writer = None
+
+    def __enter__(self) -> "BookExporter":
+        return self.open()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __contains__(self, book: dict[str, str]) -> bool:
+        return any(key in self._keys for key in book_keys(book))
+
+    def add_book(self, book: dict[str, str]) -> bool:
+        """Write one Goodreads-format row unless the library already has it; returns whether it was written."""
+        if self._writer is None:
+            raise RuntimeError("BookExporter is not open")
+        keys = book_keys(book)
+        if not keys or any(key in self._keys for key in keys):
+            self.skipped += 1
+            return False
+        self._keys.update(keys)
+        self._writer.writerow(book)
+        self._handle.flush()
+        self.written += 1
+        return True
+
+    def add_volume(self, item: dict[str, Any]) -> bool:
+        book = book_from_volume(item, shelf=self.default_shelf, date_added=self.date_added)
+        return self.add_book(book) if book is not None else False
+
+    def add_lookup_row(self, row: dict[str, str]) -> bool:
+        """Export a `lookup.py`/scan result row: its matched item, else the extracted title if allowed."""
+        raw = (row.get("raw_item_json") or "").strip()
+        if raw:
+            try:
+                item = jsonutil.loads(raw)
+            except json.JSONDecodeError:
+                item = None
+            if isinstance(item, dict):
+                return self.add_volume(item)
+        title = " ".join((row.get("input_title") or "").split())
+        # Placeholder titles such as "[Extraction Failed]" are never books.
+        if not self.include_unmatched or not title or title.startswith("["):
+            return False
+        author = " ".join((row.get("input_author") or "").split())
+        volume = {"volumeInfo": {"title": title, "authors": [author] if author else []}}
+        return self.add_volume(volume)
+
+    def add_lookup_rows(self, rows: Iterable[dict[str, str]]) -> int:
+        """Export the best (first) result of each spine in lookup-output rows."""
+        return sum(
+            self.add_lookup_row(row)
+            for row in rows
+            if (row.get("result_index") or "0") == "0"
+        )
+
+    def _index_existing(self, path: Path) -> None:
+        with path.open("r", encoding="utf-8-sig", newline="") as handle:
+            reader = csv.DictReader(handle)
+            if reader.fieldnames is None or "Title" not in reader.fieldnames:
+                raise ValueError(f"Not a Goodreads/StoryGraph export (no Title column): {path}")
+            for row in reader:
+                self._keys.update(book_keys(row))
+                if self.merge:
+                    self._writer.writerow(row)  # type: ignore[union-attr]
+                    self.copied += 1
+
 
-    def __init__(self, *args, **kwargs) -> None:
-        raise NotImplementedError("BookExporter is not implemented yet.")
+def export_lookup_csv(
+    input_csv: str | Path,
+    output_csv: str | Path,
+    existing: str | Path | None = None,
+    merge: bool = False,
+    **options: Any,
+) -> BookExporter:
+    """Stream a `lookup.py` or scan results CSV into a Goodreads/StoryGraph import file."""
+    with BookExporter(output_csv, existing=existing, merge=merge, **options) as exporter:
+        with Path(input_csv).open("r", encoding="utf-8", newline="") as handle:
+            exporter.add_lookup_rows(csv.DictReader(handle))
+    return exporter
@@ -15,12 +15,16 @@ from typing import Protocol, Sequence
 from PIL import Image
 
 try:
+    from .cropstore import CropRecord, CropStore, is_crop_store
     from .schemas import SpineExtraction, SpineExtractionResult
 except ImportError:  # pragma: no cover - supports direct script execution
+    from bookshelf_scanner.cropstore import CropRecord, CropStore, is_crop_store
     from bookshelf_scanner.schemas import SpineExtraction, SpineExtractionResult
 
 logger = logging.getLogger(__name__)
 
+EXTRACTION_FAILED_TITLE = "[Extraction Failed]"
+
 
 class ExtractionBackend(Protocol):
     """Contract for interchangeable extraction backends."""
@@ -93,6 +97,10 @@ Rules:
             return response
         return {"answer": str(response), "confidence": 0.0}
 
+    def load(self) -> None:
+        """Load weights now instead of on the first extraction."""
+        self._ensure_model()
+
     def _ensure_model(self):
         if self._model is not None:
             return self._model
@@ -263,14 +271,20 @@ class BookExtractor:
         else:
             self.backend = backend
 
+    def load(self) -> None:
+        """Eagerly load backend weights when the backend supports it."""
+        load = getattr(self.backend, "load", None)
+        if callable(load):
+            load()
+
     def extract(self, spine_image: Image.Image) -> SpineExtraction:
         """Extract structured text for one segmented spine image."""
         try:
             response = self.backend.extract(spine_image)
         except Exception as exc:
             logger.exception("Extraction backend failed")
-            return SpineExtraction(
-                title="[Extraction Failed]",
+            return SpineExtraction.trusted(
+                title=EXTRACTION_FAILED_TITLE,
                 author=None,
                 confidence=0.0,
                 raw_response=f"{type(exc).__name__}: {exc}",
@@ -298,26 +312,51 @@ class BookExtractor:
         return [self.extract(image) for image in spine_images]
 
     def extract_from_paths(self, image_paths: Sequence[str | Path]) -> list[SpineExtractionResult]:
-        """Load segmented spine images from disk and extract text from each."""
+        """Load segmented spine images from disk and extract text from each.
+
+        A path that is a packed crop store directory contributes every crop in it.
+        """
         results: list[SpineExtractionResult] = []
 
-        for index, image_path in enumerate(image_paths):
+        for image_path in image_paths:
             path = Path(image_path)
+            if is_crop_store(path):
+                with CropStore(path) as store:
+                    results.extend(self.extract_from_store(store, start_index=len(results)))
+                continue
             with Image.open(path) as image:
                 extraction = self.extract(image.convert("RGB"))
             results.append(
                 SpineExtractionResult(
-                    spine_index=index,
+                    spine_index=len(results),
                     image_path=path,
                     extraction=extraction,
                 )
             )
         return results
 
+    def extract_from_store(
+        self,
+        store: CropStore,
+        records: Sequence[CropRecord] | None = None,
+        start_index: int = 0,
+    ) -> list[SpineExtractionResult]:
+        """Extract text from crops in a packed crop store (all of them unless `records` is given)."""
+        results: list[SpineExtractionResult] = []
+        for offset, record in enumerate(store.records() if records is None else records):
+            results.append(
+                SpineExtractionResult(
+                    spine_index=start_index + offset,
+                    image_path=store.path / record.name,
+                    extraction=self.extract(store.open_image(record)),
+                )
+            )
+        return results
+
     def _parse_response(self, response: str) -> SpineExtraction:
         response = response.strip()
         if not response:
-            return SpineExtraction(title="[No Text Detected]", author=None)
+            return _placeholder("[No Text Detected]")
 
         try:
             data = json.loads(response)
@@ -350,7 +389,12 @@ class BookExtractor:
             if title:
                 return SpineExtraction(title=title, author=None)
 
-        return SpineExtraction(title="[Could Not Parse]", author=None)
+        return _placeholder("[Could Not Parse]")
+
+
+def _placeholder(title: str) -> SpineExtraction:
+    # Fixed placeholder titles are already clean; validating them again on every spine is wasted work.
+    return SpineExtraction.trusted(title)
 
 
 def _collect_image_paths(input_path: Path) -> list[Path]:
@@ -390,7 +434,10 @@ def _write_results_csv(output_path: Path, results: Sequence[SpineExtractionResul
 
 def _build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run Moondream extraction on spine image(s).")
-    parser.add_argument("input", type=Path, help="Input spine image path or directory of spine images.")
+    parser.add_argument(
+        "input", type=Path, help="Input spine image path, directory of spine images, or packed crop store."
+    )
+    parser.add_argument("--capture-id", default=None, help="With a crop store, only extract this capture's crops.")
     parser.add_argument("--limit", type=int, default=None, help="Only process first N images.")
     parser.add_argument("--output", type=Path, default=None, help="Optional CSV output path.")
     parser.add_argument("--model-name", default="moondream-0.5b", help="Model name, repo ID, or local path.")
@@ -417,15 +464,26 @@ def _run_cli() -> int:
     parser = _build_arg_parser()
     args = parser.parse_args()
 
-    paths = _collect_image_paths(args.input)
-    if not paths:
-        print(f"No image files found in: {args.input}")
-        return 1
+    store = CropStore(args.input) if is_crop_store(args.input) else None
+    if store is not None:
+        # Crops are read straight out of the packed segments; nothing is globbed or unpacked.
+        records = store.records(capture_id=args.capture_id)
+        paths: list[Path] = []
+        if not records:
+            print(f"No crops found in store: {args.input}")
+            return 1
+    else:
+        paths = _collect_image_paths(args.input)
+        if not paths:
+            print(f"No image files found in: {args.input}")
+            return 1
 
     if args.limit is not None:
         if args.limit <= 0:
             print("--limit must be greater than 0.")
             return 1
+        if store is not None:
+            records = records[: args.limit]
         paths = paths[: args.limit]
 
     extractor = BookExtractor(
@@ -438,7 +496,11 @@ def _run_cli() -> int:
         modules_cache_dir=args.modules_cache_dir,
         local_files_only=True if args.local_files_only else None,
     )
-    results = extractor.extract_from_paths(paths)
+    if store is not None:
+        with store:
+            results = extractor.extract_from_store(store, records)
+    else:
+        results = extractor.extract_from_paths(paths)
 
     for row in results:
         extraction = row.extraction
@@ -0,0 +1,151 @@
+"""Bounded background job queue for long-running capture scans."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[..., None]
+JobRunner = Callable[[dict[str, Any], ProgressCallback], dict[str, Any]]
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the job queue already holds its maximum number of pending jobs."""
+
+
+class ScanJob:
+    """State of one submitted capture scan."""
+
+    def __init__(self, params: dict[str, Any]) -> None:
+        self.id = uuid.uuid4().hex
+        self.params: dict[str, Any] | None = params
+        self.status = "queued"
+        self.progress: dict[str, Any] = {"stage": "queued"}
+        self.result: dict[str, Any] | None = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in {"succeeded", "failed"}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "jobId": self.id,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "error": self.error,
+            "createdAt": round(self.created_at, 3),
+            "startedAt": round(self.started_at, 3) if self.started_at else None,
+            "finishedAt": round(self.finished_at, 3) if self.finished_at else None,
+        }
+
+
+class ScanJobManager:
+    """Runs capture jobs on a fixed worker pool with a bounded queue and TTL eviction."""
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        max_workers: int = 1,
+        max_queue: int = 16,
+        ttl_seconds: float = 600.0,
+        max_jobs: int = 256,
+    ) -> None:
+        self.runner = runner
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(1, int(max_queue))
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max(1, int(max_jobs))
+        self._jobs: dict[str, ScanJob] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scan-job")
+
+    def submit(self, params: dict[str, Any]) -> ScanJob:
+        with self._lock:
+            self._evict_locked()
+            if self._count_locked("queued") >= self.max_queue:
+                raise JobQueueFull(f"scan job queue is full ({self.max_queue} pending)")
+            job = ScanJob(params)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> ScanJob | None:
+        with self._lock:
+            self._evict_locked()
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            self._evict_locked()
+            return {
+                "queueDepth": self._count_locked("queued"),
+                "running": self._count_locked("running"),
+                "finished": sum(1 for job in self._jobs.values() if job.finished),
+                "workers": self.max_workers,
+                "maxQueue": self.max_queue,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: ScanJob) -> None:
+        params = job.params or {}
+        with self._lock:
+            job.status = "running"
+            job.started_at = time.time()
+            job.progress = {"stage": "starting"}
+
+        def _progress(**fields: Any) -> None:
+            with self._lock:
+                job.progress.update(fields)
+
+        try:
+            result = self.runner(params, _progress)
+        except Exception as exc:
+            logger.exception("scan job failed job_id=%s", job.id)
+            with self._lock:
+                job.status = "failed"
+                job.error = f"{type(exc).__name__}: {exc}"
+                job.progress["stage"] = "failed"
+        else:
+            with self._lock:
+                job.status = "succeeded"
+                job.result = result
+                job.progress["stage"] = "done"
+        finally:
+            with self._lock:
+                job.finished_at = time.time()
+                # Drop the decoded image as soon as the job no longer needs it.
+                job.params = None
+
+    def _count_locked(self, status: str) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == status)
+
+    def _evict_locked(self) -> None:
+        now = time.time()
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at is not None and now - job.finished_at > self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        overflow = len(self._jobs) - self.max_jobs
+        if overflow > 0:
+            finished = sorted(
+                (job for job in self._jobs.values() if job.finished),
+                key=lambda job: job.finished_at or 0.0,
+            )
+            for job in finished[:overflow]:
+                del self._jobs[job.id]
@@ -0,0 +1,101 @@
+"""Pluggable JSON codec: orjson when it is installed, the standard library otherwise.
+
+API responses, `raw_item_json` cells and cache size estimates all go through
+`dumps`/`dumps_bytes`/`loads` here. Output is compact (`,`/`:` separators) and
+non-ASCII characters are written as UTF-8 rather than `\\uXXXX` escapes in
+both backends. orjson rejects a few things the standard library accepts
+(non-string dict keys, integers beyond 64 bits); such payloads fall back to
+the standard library instead of failing.
+
+`BOOKSHELF_JSON_BACKEND` selects the default codec: `auto` (orjson if
+available), `orjson` or `json`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Callable
+
+JSON_BACKENDS = ("auto", "orjson", "json")
+
+
+def orjson_available() -> bool:
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class JSONCodec:
+    """Standard-library codec; also the fallback for payloads orjson cannot encode."""
+
+    name = "json"
+
+    def dumps(self, obj: Any, default: Callable[[Any], Any] | None = None) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+
+    def dumps_bytes(self, obj: Any, default: Callable[[Any], Any] | None = None) -> bytes:
+        return self.dumps(obj, default=default).encode("utf-8")
+
+    def loads(self, data: str | bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj: Any, default: Callable[[Any], Any] | None = None) -> str:
+        return self.dumps_bytes(obj, default=default).decode("utf-8")
+
+    def dumps_bytes(self, obj: Any, default: Callable[[Any], Any] | None = None) -> bytes:
+        try:
+            return self._orjson.dumps(obj, default=default)
+        except TypeError:
+            return JSONCodec.dumps(self, obj, default=default).encode("utf-8")
+
+    def loads(self, data: str | bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+def get_codec(backend: str = "auto") -> JSONCodec:
+    """Codec for `backend`; `orjson` raises `ImportError` when the package is missing."""
+    backend = (backend or "auto").strip().lower()
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend {backend!r}; expected one of {', '.join(JSON_BACKENDS)}")
+    if backend == "json" or (backend == "auto" and not orjson_available()):
+        return JSONCodec()
+    return OrjsonCodec()
+
+
+_codec = get_codec(os.getenv("BOOKSHELF_JSON_BACKEND", "auto"))
+
+
+def default_codec() -> JSONCodec:
+    return _codec
+
+
+def set_default_codec(codec: JSONCodec) -> JSONCodec:
+    """Swap the module-wide codec (used by `dumps`/`loads`); returns the previous one."""
+    global _codec
+    previous, _codec = _codec, codec
+    return previous
+
+
+def dumps(obj: Any) -> str:
+    return _codec.dumps(obj)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return _codec.dumps_bytes(obj)
+
+
+def loads(data: str | bytes) -> Any:
+    return _codec.loads(data)
+
@@ -0,0 +1,388 @@
+"""Load generator for the web API: replay shelf photos at a fixed rate and report latency percentiles.
+
+Each worker behaves like one phone (its own `X-Client-Id`) and sends the
+`data/` photos to `/detect/spines` (raw JPEG body) and/or `/scan/capture`
+(multipart upload). With `--rate` requests are scheduled open-loop at that many
+per second and latency is measured from each request's scheduled start, so a
+saturated server shows up as growing latency rather than as a quietly lower
+request rate. Without `--rate` every worker sends back to back.
+
+Point it at a running server with `--url`, or let it serve the app in-process
+on stub models (`--serve-stub`) and optionally a local Google Books stand-in
+(`--stand-in`). An in-process server shares this process's CPU and GIL, so run
+the server separately (`BOOKSHELF_STUB_MODELS=true gunicorn ...`) for
+multi-worker numbers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+import requests
+
+try:
+    from .replay import FixtureStore, StandInServer
+    from .stubs import stub_factories
+except ImportError:  # pragma: no cover - supports direct script execution
+    from bookshelf_scanner.replay import FixtureStore, StandInServer
+    from bookshelf_scanner.stubs import stub_factories
+
+ENDPOINTS = {"detect": "/detect/spines", "capture": "/scan/capture"}
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
+_PERCENTILES = (0.50, 0.95, 0.99)
+
+
+@dataclass
+class RequestResult:
+    endpoint: str
+    status: int
+    latency_ms: float
+    server_timings: dict[str, float] = field(default_factory=dict)
+    cache: str | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile (0 for no values)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered), max(1, math.ceil(fraction * len(ordered))))
+    return ordered[rank - 1]
+
+
+def load_photos(directory: str | Path) -> list[tuple[str, bytes]]:
+    photos = [
+        (path.name, path.read_bytes())
+        for path in sorted(Path(directory).glob("*"))
+        if path.suffix.lower() in IMAGE_SUFFIXES
+    ]
+    if not photos:
+        raise FileNotFoundError(f"No shelf photos (*.jpg, *.jpeg, *.png) in {directory}")
+    return photos
+
+
+def _cache_busted(photo: bytes, number: int) -> bytes:
+    # Bytes after the JPEG end marker are ignored by decoders but change the capture cache key.
+    return photo + b"\xff\xfe" + number.to_bytes(8, "big")
+
+
+class LoadGenerator:
+    """Send `total` requests (or run for `duration` seconds) across `concurrency` workers."""
+
+    def __init__(
+        self,
+        base_url: str,
+        photos: list[tuple[str, bytes]],
+        endpoints: Sequence[str] = ("capture",),
+        concurrency: int = 5,
+        rate: float | None = None,
+        total: int | None = None,
+        duration: float | None = None,
+        timeout: float = 60.0,
+        cache_bust: bool = True,
+        form: dict[str, str] | None = None,
+    ) -> None:
+        unknown = [name for name in endpoints if name not in ENDPOINTS]
+        if unknown:
+            raise ValueError(f"Unknown endpoint(s) {unknown}; expected {sorted(ENDPOINTS)}")
+        if total is None and duration is None:
+            raise ValueError("LoadGenerator needs a request count or a duration")
+        self.base_url = base_url.rstrip("/")
+        self.photos = photos
+        self.endpoints = list(endpoints)
+        self.concurrency = max(1, int(concurrency))
+        self.rate = rate if rate and rate > 0 else None
+        self.total = total
+        self.duration = duration
+        self.timeout = timeout
+        self.cache_bust = cache_bust
+        self.form = dict(form or {})
+        self.results: list[RequestResult] = []
+        self.wall_seconds = 0.0
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    def run(self) -> list[RequestResult]:
+        started = time.perf_counter()
+        deadline = started + self.duration if self.duration is not None else None
+        workers = [
+            threading.Thread(target=self._worker, args=(started, deadline), name=f"loadgen-{index}", daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.wall_seconds = time.perf_counter() - started
+        return self.results
+
+    def _next(self, started: float, deadline: float | None) -> tuple[int, float] | None:
+        """Claim the next request number and its scheduled start time, or None when done."""
+        number = next(self._sequence)
+        if self.total is not None and number >= self.total:
+            return None
+        scheduled = started + number / self.rate if self.rate else time.perf_counter()
+        if deadline is not None and scheduled >= deadline:
+            return None
+        return number, scheduled
+
+    def _worker(self, started: float, deadline: float | None) -> None:
+        session = requests.Session()
+        session.headers["X-Client-Id"] = f"loadgen-{uuid.uuid4().hex[:12]}"
+        while True:
+            claimed = self._next(started, deadline)
+            if claimed is None:
+                return
+            number, scheduled = claimed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            endpoint = self.endpoints[number % len(self.endpoints)]
+            # Every endpoint cycles through all photos even when endpoints alternate.
+            _, photo = self.photos[(number // len(self.endpoints)) % len(self.photos)]
+            result = self._send(session, endpoint, photo, number, scheduled)
+            with self._lock:
+                self.results.append(result)
+
+    def _send(
+        self, session: requests.Session, endpoint: str, photo: bytes, number: int, scheduled: float
+    ) -> RequestResult:
+        url = self.base_url + ENDPOINTS[endpoint]
+        try:
+            if endpoint == "detect":
+                response = session.post(
+                    url,
+                    data=photo,
+                    headers={"Content-Type": "image/jpeg", "Accept": "application/json"},
+                    timeout=self.timeout,
+                )
+            else:
+                body = _cache_busted(photo, number) if self.cache_bust else photo
+                response = session.post(
+                    url, files={"image": ("shelf.jpg", body, "image/jpeg")}, data=self.form, timeout=self.timeout
+                )
+        except requests.RequestException as exc:
+            latency_ms = (time.perf_counter() - scheduled) * 1000
+            return RequestResult(endpoint, 0, latency_ms, error=type(exc).__name__)
+        latency_ms = (time.perf_counter() - scheduled) * 1000
+        return RequestResult(
+            endpoint,
+            response.status_code,
+            latency_ms,
+            server_timings=_server_timings(endpoint, response),
+            cache=response.headers.get("X-Capture-Cache"),
+        )
+
+
+def _server_timings(endpoint: str, response: requests.Response) -> dict[str, float]:
+    if response.status_code != 200 or "json" not in response.headers.get("Content-Type", ""):
+        return {}
+    try:
+        payload = response.json()
+    except ValueError:
+        return {}
+    if endpoint == "detect":
+        timings = {"inference": payload.get("inferenceMs")}
+        serialize = response.headers.get("X-Serialize-Ms")
+        if serialize:
+            timings["serialize"] = serialize
+    else:
+        timings = dict(payload.get("timingsMs") or {})
+    return {stage: float(value) for stage, value in timings.items() if value is not None}
+
+
+def summarize(results: Sequence[RequestResult], wall_seconds: float) -> dict[str, Any]:
+    """Per-endpoint throughput, latency percentiles, error breakdown and mean server timings."""
+    summary: dict[str, Any] = {"wallSeconds": round(wall_seconds, 3), "endpoints": {}}
+    for endpoint in sorted({result.endpoint for result in results}):
+        selected = [result for result in results if result.endpoint == endpoint]
+        succeeded = [result for result in selected if result.ok]
+        latencies = [result.latency_ms for result in succeeded]
+        failures = Counter(result.error or str(result.status) for result in selected if not result.ok)
+        stages: dict[str, list[float]] = {}
+        for result in succeeded:
+            for stage, value in result.server_timings.items():
+                stages.setdefault(stage, []).append(value)
+        cache = Counter(result.cache for result in succeeded if result.cache)
+        summary["endpoints"][endpoint] = {
+            "requests": len(selected),
+            "ok": len(succeeded),
+            "errorRate": round(1 - len(succeeded) / len(selected), 4) if selected else 0.0,
+            "errors": dict(failures),
+            "throughputPerSecond": round(len(succeeded) / wall_seconds, 2) if wall_seconds else 0.0,
+            "latencyMs": {
+                "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+                **{f"p{int(fraction * 100)}": round(percentile(latencies, fraction), 2) for fraction in _PERCENTILES},
+                "max": round(max(latencies), 2) if latencies else 0.0,
+            },
+            "serverTimingsMs": {
+                stage: {"mean": round(sum(values) / len(values), 2), "p95": round(percentile(values, 0.95), 2)}
+                for stage, values in stages.items()
+            },
+            **({"captureCache": dict(cache)} if cache else {}),
+        }
+    return summary
+
+
+class _ServedApp:
+    """The Flask app on stub models, served from a background thread."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        from werkzeug.serving import make_server
+
+        # Imported here so driving a remote server never loads the model stack.
+        try:
+            from .web_api import build_books_client_factory, create_app
+        except ImportError:  # pragma: no cover - supports direct script execution
+            from bookshelf_scanner.web_api import build_books_client_factory, create_app
+
+        self.stand_in: StandInServer | None = None
+        factories = stub_factories(
+            detect_ms=args.detect_ms,
+            extract_ms=args.extract_ms,
+            lookup_ms=args.lookup_ms,
+            spines_per_row=(args.stub_spines + 1) // 2,
+            rows=2 if args.stub_spines > 1 else 1,
+            with_books_client=not args.stand_in,
+        )
+        if args.stand_in:
+            self.stand_in = StandInServer(
+                FixtureStore(args.stand_in_fixtures),
+                latency_ms=args.lookup_ms,
+                jitter_ms=args.lookup_ms / 4,
+                error_rate=args.stand_in_error_rate,
+            )
+            factories["books_client_factory"] = build_books_client_factory(
+                api_key="stand-in", timeout=10, max_results=5, base_url=self.stand_in.start()
+            )
+        app = create_app(**factories, model_version="stub")
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        self._server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="loadgen-server", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._thread.join(timeout=5)
+        if self.stand_in is not None:
+            self.stand_in.stop()
+
+
+def _iter_report_lines(summary: dict[str, Any]) -> Iterator[str]:
+    yield f"Wall time {summary['wallSeconds']:.1f}s"
+    for endpoint, stats in summary["endpoints"].items():
+        latency = stats["latencyMs"]
+        yield (
+            f"{endpoint:<8} {stats['ok']}/{stats['requests']} ok  {stats['throughputPerSecond']:.2f} req/s  "
+            f"p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  p99 {latency['p99']:.1f}  max {latency['max']:.1f} ms  "
+            f"errors {stats['errorRate']:.1%} {stats['errors'] or ''}"
+        )
+        for stage, timing in stats["serverTimingsMs"].items():
+            yield f"         server {stage:<10} mean {timing['mean']:.1f} ms  p95 {timing['p95']:.1f} ms"
+        if "captureCache" in stats:
+            yield f"         capture cache {stats['captureCache']}"
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Replay shelf photos against the web API and report latency percentiles.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default="http://127.0.0.1:5000", help="Base URL of a running API.")
+    target.add_argument("--serve-stub", action="store_true", help="Serve the app in-process on stub models.")
+    parser.add_argument("--photos", type=Path, default=Path("data"), help="Directory of shelf photos to replay.")
+    parser.add_argument(
+        "--endpoint",
+        action="append",
+        choices=sorted(ENDPOINTS),
+        default=None,
+        help="Endpoint(s) to hit, alternating per request (repeatable; default: capture).",
+    )
+    parser.add_argument("--concurrency", type=int, default=5, help="Concurrent clients (default: 5).")
+    parser.add_argument("--rate", type=float, default=None, help="Total requests per second (default: closed loop).")
+    parser.add_argument("--requests", type=int, default=None, help="Requests to send (default: 50 unless --duration).")
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to run instead of a request count.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds.")
+    parser.add_argument(
+        "--no-cache-bust",
+        dest="cache_bust",
+        action="store_false",
+        help="Upload identical bytes so repeated captures can hit the capture cache.",
+    )
+    parser.add_argument("--max-detections", type=int, default=None, help="maxDetections form field for captures.")
+    stub = parser.add_argument_group("stub server (--serve-stub)")
+    stub.add_argument("--detect-ms", type=float, default=40.0, help="Stub detector latency per frame.")
+    stub.add_argument("--extract-ms", type=float, default=20.0, help="Stub extractor latency per spine.")
+    stub.add_argument("--lookup-ms", type=float, default=80.0, help="Stub or stand-in Google Books latency.")
+    stub.add_argument("--stub-spines", type=int, default=24, help="Spines the stub detector finds per photo.")
+    stub.add_argument("--stand-in", action="store_true", help="Look up through a local Google Books stand-in server.")
+    stub.add_argument("--stand-in-fixtures", type=Path, default=None, help="Fixture store JSON for the stand-in.")
+    stub.add_argument("--stand-in-error-rate", type=float, default=0.0, help="Fraction of stand-in lookups that fail.")
+    parser.add_argument("--output", type=Path, default=None, help="Write the summary as JSON.")
+    return parser
+
+
+def _run_cli() -> int:
+    args = _build_arg_parser().parse_args()
+    photos = load_photos(args.photos)
+    total = args.requests if args.requests is not None or args.duration is not None else 50
+    form = {"maxDetections": str(args.max_detections)} if args.max_detections else {}
+
+    served = _ServedApp(args) if args.serve_stub else None
+    try:
+        generator = LoadGenerator(
+            served.url if served is not None else args.url,
+            photos,
+            endpoints=args.endpoint or ["capture"],
+            concurrency=args.concurrency,
+            rate=args.rate,
+            total=total,
+            duration=args.duration,
+            timeout=args.timeout,
+            cache_bust=args.cache_bust,
+            form=form,
+        )
+        amount = f"{total} requests" if total is not None else f"{args.duration:g}s of requests"
+        pacing = f" at {generator.rate:g} req/s" if generator.rate else ""
+        print(f"Sending {amount} to {generator.base_url} ({', '.join(generator.endpoints)}) "
+              f"with {generator.concurrency} client(s){pacing}")
+        results = generator.run()
+    finally:
+        if served is not None:
+            served.close()
+
+    summary = summarize(results, generator.wall_seconds)
+    summary["config"] = {
+        "url": generator.base_url,
+        "endpoints": generator.endpoints,
+        "concurrency": generator.concurrency,
+        "rate": generator.rate,
+        "photos": [name for name, _ in photos],
+        "stub": args.serve_stub,
+        "standIn": args.stand_in,
+    }
+    for line in _iter_report_lines(summary):
+        print(line)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(_run_cli())
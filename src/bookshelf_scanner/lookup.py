@@ -4,32 +4,99 @@ from __future__ import annotations
 
 import argparse
 import csv
-import json
 import os
 from pathlib import Path
 from typing import Any
 
 import requests
 
+try:
+    from .cache import BoundedCache
+    from . import jsonutil
+    from .catalog import CatalogIndex, build_catalog, normalize_text, score_candidate, title_variants
+    from .replay import FixtureStore, record_client
+except ImportError:  # pragma: no cover - supports direct script execution
+    from bookshelf_scanner.cache import BoundedCache
+    from bookshelf_scanner import jsonutil
+    from bookshelf_scanner.catalog import CatalogIndex, build_catalog, normalize_text, score_candidate, title_variants
+    from bookshelf_scanner.replay import FixtureStore, record_client
+
 
 class GoogleBooksClient:
     """Thin Google Books API client."""
 
     BASE_URL = "https://www.googleapis.com/books/v1/volumes"
-
-    def __init__(self, api_key: str | None = None, timeout: int = 10, max_results: int = 5) -> None:
+    MIN_MATCH_SCORE = 0.6
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        timeout: int = 10,
+        max_results: int = 5,
+        min_match_score: float = MIN_MATCH_SCORE,
+        step_cache_size: int = 4096,
+        base_url: str | None = None,
+        search_cache_size: int = 1024,
+        search_cache_ttl: float | None = 900.0,
+        no_match_ttl: float | None = 300.0,
+    ) -> None:
         self.api_key = api_key
+        # Overridable so benchmarks can target the local stand-in (`replay.StandInServer`).
+        self.base_url = base_url or self.BASE_URL
         self.timeout = timeout
         self.max_results = max_results
+        self.min_match_score = min_match_score
         self.session = requests.Session()
+        # Normalized title/author -> ladder step that answered it; only reorders the ladder.
+        self.step_cache = BoundedCache(max_entries=step_cache_size)
+        # Keys no step could answer; short-lived so transient empty answers and new volumes resolve later.
+        self.no_match_cache = BoundedCache(max_entries=step_cache_size, ttl_seconds=no_match_ttl)
+        # (query, maxResults) -> successful raw response, shared by lookup and search callers.
+        self.search_cache = BoundedCache(max_entries=search_cache_size, ttl_seconds=search_cache_ttl)
 
     def lookup(self, title: str, author: str | None = None) -> dict[str, Any]:
-        """Fetch raw Google Books response for one title/author pair."""
-        query = _build_query(title=title, author=author)
-        if not query:
-            return {"totalItems": 0, "items": []}
-
-        return self.search(query=query, max_results=self.max_results)
+        """Fetch raw Google Books response for one title/author pair.
+
+        Walks the query ladder (strict, title-only, keywords) and stops at the
+        first step whose best item scores well against the input. The returned
+        payload carries the `query` and `queryStep` that produced it.
+        """
+        ladder = _query_ladder(title=title, author=author)
+        if not ladder:
+            return {"totalItems": 0, "items": [], "query": "", "queryStep": None}
+
+        key = _lookup_key(title=title, author=author)
+        if self.no_match_cache.get(key) is not None:
+            return {"totalItems": 0, "items": [], "query": ladder[0][1], "queryStep": None}
+        cached_step = self.step_cache.get(key)
+        if cached_step is not None:
+            # Try the step that answered last time first; the rest of the ladder stays as a fallback.
+            ladder = sorted(ladder, key=lambda step: step[0] != cached_step)
+
+        best_payload: dict[str, Any] = {}
+        best_score = -1.0
+        best_step: str | None = None
+        for step, query in ladder:
+            payload = dict(self.search(query=query, max_results=self.max_results))
+            payload["query"] = query
+            payload["queryStep"] = step
+            items = payload.get("items") or []
+            if not items:
+                best_payload = best_payload or payload
+                continue
+            score = _best_item_score(items, title=title, author=author)
+            if score > best_score:
+                best_payload, best_score, best_step = payload, score, step
+            if score >= self.min_match_score:
+                break
+
+        # Remember the answering step, or briefly cache keys no step could answer.
+        if best_step is not None:
+            self.step_cache.set(key, best_step)
+        else:
+            self.step_cache.pop(key)
+            self.no_match_cache.set(key, True)
+        return best_payload
 
     def search(self, query: str, max_results: int | None = None) -> dict[str, Any]:
         """Fetch raw Google Books response for an arbitrary query string."""
@@ -40,13 +107,20 @@ class GoogleBooksClient:
         effective_max_results = self.max_results if max_results is None else max_results
         effective_max_results = max(1, min(40, int(effective_max_results)))
 
+        cache_key = (query, effective_max_results)
+        cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         params: dict[str, Any] = {"q": query, "printType": "books", "maxResults": effective_max_results}
         if self.api_key:
             params["key"] = self.api_key
 
-        response = self.session.get(self.BASE_URL, params=params, timeout=self.timeout)
+        response = self.session.get(self.base_url, params=params, timeout=self.timeout)
         response.raise_for_status()
-        return response.json()
+        payload = response.json()
+        self.search_cache.set(cache_key, payload)
+        return payload
 
 
 def _build_query(title: str, author: str | None = None) -> str:
@@ -61,6 +135,44 @@ def _build_query(title: str, author: str | None = None) -> str:
     return f'inauthor:"{author}"'
 
 
+def _query_ladder(title: str, author: str | None = None) -> list[tuple[str, str]]:
+    """Query forms from strictest to loosest, without repeating identical queries."""
+    title = (title or "").strip()
+    author = (author or "").strip()
+    candidates = [
+        ("strict", _build_query(title=title, author=author)),
+        ("title", _build_query(title=title) if title else ""),
+        ("keywords", " ".join(f"{title} {author}".replace('"', " ").split())),
+    ]
+    ladder: list[tuple[str, str]] = []
+    seen: set[str] = set()
+    for step, query in candidates:
+        if query and query not in seen:
+            seen.add(query)
+            ladder.append((step, query))
+    return ladder
+
+
+def _lookup_key(title: str, author: str | None = None) -> str:
+    return f"{normalize_text(title)}|{normalize_text(author)}"
+
+
+def _best_item_score(items: list[dict[str, Any]], title: str, author: str | None = None) -> float:
+    query_title = normalize_text(title)
+    query_author = normalize_text(author)
+    best = 0.0
+    for item in items:
+        volume_info = item.get("volumeInfo") or {}
+        score = score_candidate(
+            query_title,
+            query_author,
+            title_variants(str(volume_info.get("title") or "")),
+            [normalize_text(name) for name in volume_info.get("authors") or []],
+        )
+        best = max(best, score)
+    return best
+
+
 def _flatten_json(prefix: str, value: Any, out: dict[str, str]) -> None:
     if isinstance(value, dict):
         for key, child in value.items():
@@ -109,13 +221,32 @@ def _read_extractions_csv(path: Path) -> list[dict[str, str]]:
     return rows
 
 
-def _lookup_rows(rows: list[dict[str, str]], client: GoogleBooksClient) -> list[dict[str, str]]:
+def _lookup_rows(
+    rows: list[dict[str, str]],
+    client: GoogleBooksClient,
+    catalog: CatalogIndex | None = None,
+    stats: dict[str, int] | None = None,
+) -> list[dict[str, str]]:
     output_rows: list[dict[str, str]] = []
     for input_row in rows:
         title = (input_row.get("title") or "").strip()
         author = (input_row.get("author") or "").strip() or None
         query = _build_query(title=title, author=author)
-        payload = client.lookup(title=title, author=author)
+
+        # A confident local catalog hit replaces the Google Books call entirely.
+        local_match = catalog.match(title=title, author=author) if catalog is not None else None
+        if local_match is not None:
+            payload = {"totalItems": 1, "items": [local_match.item]}
+            # No Google Books query was sent for a catalog hit.
+            query = ""
+            match_source = "catalog"
+        else:
+            payload = client.lookup(title=title, author=author)
+            query = payload.get("query") or query
+            match_source = "google_books"
+        if stats is not None:
+            stat_key = "local" if local_match is not None else "remote"
+            stats[stat_key] = stats.get(stat_key, 0) + 1
         items = payload.get("items") or []
 
         if not items:
@@ -129,6 +260,7 @@ def _lookup_rows(rows: list[dict[str, str]], client: GoogleBooksClient) -> list[
                     "response_total_items": str(payload.get("totalItems", 0)),
                     "match_found": "false",
                     "result_index": "",
+                    "match_source": "",
                     "raw_item_json": "",
                 }
             )
@@ -144,7 +276,8 @@ def _lookup_rows(rows: list[dict[str, str]], client: GoogleBooksClient) -> list[
                 "response_total_items": str(payload.get("totalItems", len(items))),
                 "match_found": "true",
                 "result_index": str(result_index),
-                "raw_item_json": json.dumps(item, ensure_ascii=False),
+                "match_source": match_source,
+                "raw_item_json": jsonutil.dumps(item),
             }
             _flatten_json("item", item, row)
             output_rows.append(row)
@@ -166,6 +299,7 @@ def _write_output_csv(path: Path, rows: list[dict[str, str]]) -> None:
                     "response_total_items",
                     "match_found",
                     "result_index",
+                    "match_source",
                     "raw_item_json",
                 ]
             )
@@ -180,6 +314,7 @@ def _write_output_csv(path: Path, rows: list[dict[str, str]]) -> None:
         "response_total_items",
         "match_found",
         "result_index",
+        "match_source",
         "raw_item_json",
     ]
     all_keys = {key for row in rows for key in row.keys()}
@@ -198,11 +333,19 @@ def run_lookup(
     api_key: str | None = None,
     timeout: int = 10,
     max_results: int = 5,
+    catalog: CatalogIndex | None = None,
+    stats: dict[str, int] | None = None,
+    base_url: str | None = None,
+    fixture_store: FixtureStore | None = None,
 ) -> int:
     rows = _read_extractions_csv(input_csv)
-    client = GoogleBooksClient(api_key=api_key, timeout=timeout, max_results=max_results)
-    output_rows = _lookup_rows(rows, client)
+    client = GoogleBooksClient(api_key=api_key, timeout=timeout, max_results=max_results, base_url=base_url)
+    if fixture_store is not None:
+        record_client(client, fixture_store)
+    output_rows = _lookup_rows(rows, client, catalog=catalog, stats=stats)
     _write_output_csv(output_csv, output_rows)
+    if fixture_store is not None and fixture_store.path is not None:
+        fixture_store.save()
     return len(output_rows)
 
 
@@ -228,6 +371,30 @@ def _build_arg_parser() -> argparse.ArgumentParser:
         default=Path("secrets/.env"),
         help="Optional env file path for GOOGLE_BOOKS_API_KEY.",
     )
+    parser.add_argument(
+        "--base-url",
+        default=None,
+        help="Override the Google Books volumes URL (defaults to GOOGLE_BOOKS_BASE_URL or the public API).",
+    )
+    parser.add_argument(
+        "--record-fixtures",
+        type=Path,
+        default=None,
+        help="Record every API response into this fixture store JSON for offline replay.",
+    )
+    parser.add_argument(
+        "--catalog",
+        type=Path,
+        action="append",
+        default=[],
+        help="Goodreads export or previous lookup CSV to resolve titles locally first (repeatable).",
+    )
+    parser.add_argument(
+        "--catalog-min-score",
+        type=float,
+        default=CatalogIndex.DEFAULT_MIN_SCORE,
+        help="Minimum fuzzy score for a local catalog match to skip the API call.",
+    )
     return parser
 
 
@@ -238,19 +405,30 @@ def _run_cli() -> int:
     _load_env_file(args.env_file)
     api_key = args.api_key or os.getenv("GOOGLE_BOOKS_API_KEY")
 
+    stats: dict[str, int] = {}
     try:
+        catalog = build_catalog(args.catalog, min_score=args.catalog_min_score) if args.catalog else None
         row_count = run_lookup(
             input_csv=args.input,
             output_csv=args.output,
             api_key=api_key,
             timeout=args.timeout,
             max_results=args.max_results,
+            catalog=catalog,
+            stats=stats,
+            base_url=args.base_url or os.getenv("GOOGLE_BOOKS_BASE_URL"),
+            fixture_store=FixtureStore(args.record_fixtures) if args.record_fixtures else None,
         )
     except Exception as exc:
         print(f"Lookup failed: {type(exc).__name__}: {exc}")
         return 1
 
     print(f"Wrote: {args.output} ({row_count} row(s))")
+    if catalog is not None:
+        resolved = stats.get("local", 0)
+        total = resolved + stats.get("remote", 0)
+        fraction = resolved / total if total else 0.0
+        print(f"Resolved locally: {resolved}/{total} ({fraction:.1%})")
     return 0
 
 
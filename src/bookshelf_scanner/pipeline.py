@@ -0,0 +1,320 @@
+"""Streaming detect -> extract -> lookup -> export pipeline behind `bookshelf-scanner scan`."""
+
+from __future__ import annotations
+
+import csv
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from PIL import Image
+
+from .artifacts import DebugArtifactWriter
+from .catalog import CatalogIndex
+from .exporter import BookExporter
+from .lookup import GoogleBooksClient, _build_query, _lookup_rows
+from .schemas import DetectedSpine, SpineExtraction
+from .serving import ModelPool
+from .utils import load_image
+
+logger = logging.getLogger(__name__)
+
+# (stage name, items the stage just emitted downstream)
+ProgressCallback = Callable[[str, int], None]
+
+SCAN_RESULT_COLUMNS = [
+    "input_spine_index",
+    "input_image_path",
+    "input_title",
+    "input_author",
+    "input_confidence",
+    "input_bbox",
+    "query",
+    "response_total_items",
+    "match_found",
+    "result_index",
+    "match_source",
+    "raw_item_json",
+]
+
+_DONE = object()
+
+
+class Stage:
+    """One pipeline step: `handler(item)` yields zero or more items for the next stage."""
+
+    def __init__(self, name: str, handler: Callable[[Any], Iterable[Any]], workers: int = 1) -> None:
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "errors": self.errors,
+            "busySeconds": round(self.busy_seconds, 3),
+        }
+
+
+class StreamingPipeline:
+    """Run stages concurrently, each fed by a bounded queue from the stage before it.
+
+    Bounded queues give backpressure: a slow stage fills its input queue and the
+    stage before it blocks instead of buffering the whole run in memory. An item
+    that raises is logged and counted against its stage; the run continues.
+    Output order across items is not preserved when a stage has several workers.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        queue_size: int = 16,
+        on_progress: ProgressCallback | None = None,
+    ) -> None:
+        if not stages:
+            raise ValueError("pipeline needs at least one stage")
+        self.stages = list(stages)
+        self.queue_size = max(1, int(queue_size))
+        self.on_progress = on_progress
+        self.elapsed_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def run(self, items: Iterable[Any]) -> dict[str, Any]:
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = [stage.workers for stage in self.stages]
+        threads: list[threading.Thread] = []
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(index, queues, remaining),
+                    name=f"scan-{stage.name}-{worker}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        started = time.perf_counter()
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+        self.elapsed_seconds = time.perf_counter() - started
+        return self.stats()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "elapsedSeconds": round(self.elapsed_seconds, 3),
+            "stages": {stage.name: stage.stats() for stage in self.stages},
+        }
+
+    def _work(self, index: int, queues: list[Any], remaining: list[int]) -> None:
+        stage = self.stages[index]
+        downstream = queues[index + 1] if index + 1 < len(queues) else None
+        while True:
+            item = queues[index].get()
+            if item is _DONE:
+                break
+            emitted = 0
+            started = time.perf_counter()
+            try:
+                for output in stage.handler(item) or ():
+                    if downstream is not None:
+                        downstream.put(output)
+                    emitted += 1
+            except Exception:
+                logger.exception("%s stage failed on %r", stage.name, item)
+                with self._lock:
+                    stage.errors += 1
+            with self._lock:
+                stage.processed += 1
+                stage.emitted += emitted
+                stage.busy_seconds += time.perf_counter() - started
+            if self.on_progress is not None:
+                self.on_progress(stage.name, emitted)
+
+        with self._lock:
+            remaining[index] -= 1
+            last_worker = remaining[index] == 0
+        if last_worker and downstream is not None:
+            for _ in range(self.stages[index + 1].workers):
+                downstream.put(_DONE)
+
+
+class SpineTask:
+    """One detected spine as it moves through the scan stages."""
+
+    __slots__ = ("image_path", "spine_index", "crop", "spine", "extraction", "rows")
+
+    def __init__(self, image_path: Path, spine_index: int, crop: Image.Image | None, spine: DetectedSpine) -> None:
+        self.image_path = image_path
+        self.spine_index = spine_index
+        self.crop = crop
+        self.spine = spine
+        self.extraction: SpineExtraction | None = None
+        self.rows: list[dict[str, str]] = []
+
+    def input_row(self) -> dict[str, str]:
+        extraction = self.extraction
+        return {
+            "spine_index": str(self.spine_index),
+            "image_path": str(self.image_path),
+            "title": extraction.title if extraction else "",
+            "author": (extraction.author or "") if extraction else "",
+        }
+
+
+class ScanResultWriter:
+    """Append scan rows to a CSV as they arrive, flushing after each spine."""
+
+    def __init__(self, path: str | Path, include_unmatched: bool = True) -> None:
+        self.path = Path(path)
+        self.include_unmatched = include_unmatched
+        self.rows_written = 0
+        self._handle: Any = None
+        self._writer: csv.DictWriter | None = None
+
+    def open(self) -> "ScanResultWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.path.open("w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._handle, fieldnames=SCAN_RESULT_COLUMNS, extrasaction="ignore")
+        self._writer.writeheader()
+        self._handle.flush()
+        return self
+
+    def write(self, task: SpineTask) -> int:
+        if self._writer is None:
+            raise RuntimeError("ScanResultWriter is not open")
+        rows = [
+            row
+            for row in task.rows
+            if self.include_unmatched or row.get("match_found") == "true"
+        ]
+        extraction = task.extraction
+        for row in rows:
+            row["input_confidence"] = f"{extraction.confidence:.4f}" if extraction else ""
+            row["input_bbox"] = " ".join(str(value) for value in task.spine.bbox)
+        self._writer.writerows(rows)
+        self._handle.flush()
+        self.rows_written += len(rows)
+        return len(rows)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self._writer = None
+
+    def __enter__(self) -> "ScanResultWriter":
+        return self.open()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class _CatalogOnlyClient:
+    """Stands in for Google Books when only a local catalog is configured."""
+
+    def lookup(self, title: str, author: str | None = None) -> dict[str, Any]:
+        return {"totalItems": 0, "items": [], "query": _build_query(title=title, author=author)}
+
+
+def _unmatched_row(input_row: dict[str, str]) -> dict[str, str]:
+    title = input_row.get("title") or ""
+    author = input_row.get("author") or None
+    return {
+        "input_spine_index": input_row.get("spine_index") or "",
+        "input_image_path": input_row.get("image_path") or "",
+        "input_title": title,
+        "input_author": author or "",
+        "query": _build_query(title=title, author=author) if title else "",
+        "response_total_items": "0",
+        "match_found": "false",
+        "result_index": "",
+        "match_source": "",
+        "raw_item_json": "",
+    }
+
+
+def build_scan_pipeline(
+    detector_pool: ModelPool[Any],
+    extractor_pool: ModelPool[Any],
+    writer: ScanResultWriter,
+    exporter: BookExporter | None = None,
+    artifacts: DebugArtifactWriter | None = None,
+    books_client: GoogleBooksClient | None = None,
+    catalog: CatalogIndex | None = None,
+    min_area: int = 1000,
+    max_spines: int = 50,
+    lookup_workers: int = 4,
+    queue_size: int = 16,
+    on_progress: ProgressCallback | None = None,
+) -> StreamingPipeline:
+    """Wire the four scan stages; detector/extractor workers match their pool sizes.
+
+    With `books_client` and `catalog` both unset the lookup stage passes every
+    spine through as unmatched, so extraction-only scans still export. With an
+    `exporter`, each spine's best match is also streamed into the Goodreads file.
+    With `artifacts`, each photo's annotated frame and crops are queued for
+    writing in the background.
+    """
+
+    def _detect(image_path: Path) -> Iterator[SpineTask]:
+        image = load_image(image_path)
+        with detector_pool.acquire() as detector:
+            crops, spines = detector.detect_all(image, min_area=min_area, max_detections=max_spines)
+        if artifacts is not None:
+            artifacts.submit(Path(image_path).stem, image, spines)
+        for index, (crop, spine) in enumerate(zip(crops, spines)):
+            yield SpineTask(Path(image_path), index, crop, spine)
+
+    def _extract(task: SpineTask) -> Iterator[SpineTask]:
+        with extractor_pool.acquire() as extractor:
+            task.extraction = extractor.extract(task.crop)
+        # Crops are the bulk of a task's memory and nothing downstream needs them.
+        task.crop = None
+        yield task
+
+    def _lookup(task: SpineTask) -> Iterator[SpineTask]:
+        input_row = task.input_row()
+        title = input_row["title"]
+        if title.startswith("[") or (books_client is None and catalog is None):
+            task.rows = [_unmatched_row(input_row)]
+        else:
+            try:
+                task.rows = _lookup_rows([input_row], books_client or _CatalogOnlyClient(), catalog=catalog)
+            except Exception as exc:
+                # Keep the spine with its extracted title rather than dropping it.
+                logger.warning("Lookup failed for %r: %s: %s", title, type(exc).__name__, exc)
+                task.rows = [_unmatched_row(input_row)]
+        yield task
+
+    def _export(task: SpineTask) -> Iterator[SpineTask]:
+        writer.write(task)
+        if exporter is not None:
+            exporter.add_lookup_rows(task.rows)
+        return iter(())
+
+    return StreamingPipeline(
+        [
+            Stage("detect", _detect, workers=detector_pool.size),
+            Stage("extract", _extract, workers=extractor_pool.size),
+            Stage("lookup", _lookup, workers=lookup_workers),
+            # A single writer keeps CSV rows whole and the export index consistent without extra locking.
+            Stage("export", _export, workers=1),
+        ],
+        queue_size=queue_size,
+        on_progress=on_progress,
+    )
+
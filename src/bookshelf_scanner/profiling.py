@@ -0,0 +1,328 @@
+"""On-demand cProfile (and optionally torch profiler) runs for individual live requests.
+
+`RequestProfiler.start()` hands out a `ProfileSession` only within strict
+limits: at most `max_concurrent` at once, at least `min_interval` seconds
+between starts, a `probability` sample, and an optional shared token. Work is
+profiled only while `ProfileSession.active()` is entered, so a streamed
+capture can be profiled step by step without timing the client's reads:
+
+    session, outcome = profiler.start(header_value)
+    if session is not None:
+        with session.active():
+            run_pipeline()
+        summary = session.finish()
+
+Before Python 3.12, cProfile sees only the thread that enters `active()`, and
+work on other threads (the lookup pool) shows up as time waiting for it. From
+3.12 cProfile is interpreter-wide: while a session is active it also records,
+and slows down, every other thread, including concurrent requests. Only one
+profiler can be enabled at a time, so `max_concurrent` is clamped to 1 there.
+The torch profiler, when enabled, records operators from every thread for the
+whole session.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import hmac
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .jsonutil import dumps
+
+logger = logging.getLogger(__name__)
+
+PROFILED = "profiled"
+BUSY = "busy"
+RATE_LIMITED = "rate_limited"
+NOT_SAMPLED = "not_sampled"
+FORBIDDEN = "forbidden"
+OUTCOMES = (PROFILED, BUSY, RATE_LIMITED, NOT_SAMPLED, FORBIDDEN)
+
+_EXHAUSTED = object()
+
+# From 3.12 cProfile hooks sys.monitoring, which allows one profiler per interpreter.
+CPROFILE_IS_GLOBAL = sys.version_info >= (3, 12)
+
+
+def torch_profiler_available() -> bool:
+    try:
+        import torch.profiler  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _cprofile_free() -> bool:
+    """False when another profiling tool already holds the interpreter-wide cProfile hook."""
+    probe = cProfile.Profile()
+    try:
+        probe.enable()
+    except ValueError:
+        return False
+    probe.disable()
+    return True
+
+
+def _short_path(filename: str) -> str:
+    for marker in ("site-packages/", "dist-packages/", "src/"):
+        _, found, tail = filename.rpartition(marker)
+        if found:
+            return tail
+    return filename
+
+
+def function_rows(stats: pstats.Stats, top_n: int, sort: str) -> list[dict[str, Any]]:
+    """The `top_n` functions by `sort` (`cumulative` or `self`) as JSON-ready rows."""
+    index = 3 if sort == "cumulative" else 2
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][index], reverse=True)  # type: ignore[attr-defined]
+    rows = []
+    for (filename, line, name), (primitive_calls, calls, self_s, cumulative_s, _callers) in entries[:top_n]:
+        location = name if filename == "~" else f"{_short_path(filename)}:{line}({name})"
+        rows.append(
+            {
+                "function": location,
+                "calls": calls,
+                "primitiveCalls": primitive_calls,
+                "selfMs": round(self_s * 1000, 3),
+                "cumulativeMs": round(cumulative_s * 1000, 3),
+            }
+        )
+    return rows
+
+
+def operator_rows(torch_profile: Any, top_n: int) -> list[dict[str, Any]]:
+    """The `top_n` torch operators by self CPU time; times in ms."""
+    events = sorted(torch_profile.key_averages(), key=lambda event: event.self_cpu_time_total, reverse=True)
+    return [
+        {
+            "operator": event.key,
+            "calls": event.count,
+            "selfCpuMs": round(event.self_cpu_time_total / 1000, 3),
+            "cpuMs": round(event.cpu_time_total / 1000, 3),
+            "selfDeviceMs": round(getattr(event, "self_device_time_total", 0.0) / 1000, 3),
+        }
+        for event in events[:top_n]
+    ]
+
+
+class ProfileSession:
+    """One profiled request; `finish()` is idempotent and returns the same summary every time."""
+
+    def __init__(
+        self,
+        profile_id: str,
+        top_n: int,
+        output_dir: Path | None,
+        keep: int,
+        torch_ops: bool,
+        on_finish: Callable[[ProfileSession], None],
+    ) -> None:
+        self.id = profile_id
+        self.top_n = top_n
+        self.output_dir = output_dir
+        self.keep = keep
+        self._on_finish = on_finish
+        self._profile = cProfile.Profile()
+        self._lock = threading.Lock()
+        self._summary: dict[str, Any] | None = None
+        self.unavailable = False
+        self._started = time.perf_counter()
+        self._torch_profile = None
+        if torch_ops:
+            self._torch_profile = self._start_torch_profile()
+
+    @staticmethod
+    def _start_torch_profile() -> Any:
+        import torch
+        from torch.profiler import ProfilerActivity, profile
+
+        activities = [ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(ProfilerActivity.CUDA)
+        torch_profile = profile(activities=activities)
+        torch_profile.start()
+        return torch_profile
+
+    @contextmanager
+    def active(self) -> Iterator[None]:
+        """Profile the block; an exception escaping it ends the session.
+
+        If another profiling tool took the cProfile hook after `start()` (3.12+),
+        the block runs unprofiled and the summary reports `profilerUnavailable`.
+        """
+        failed = False
+        try:
+            self._profile.enable()
+            enabled = True
+        except ValueError:
+            if not self.unavailable:
+                logger.warning("profile %s: another profiler is active; running unprofiled", self.id)
+            self.unavailable = True
+            enabled = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            if enabled:
+                self._profile.disable()
+            if failed:
+                self.finish()
+
+    def wrap(self, items: Iterator[Any]) -> Iterator[Any]:
+        """Pass `items` through, profiling only the work that produces each one; finishes when exhausted."""
+        try:
+            while True:
+                with self.active():
+                    item = next(items, _EXHAUSTED)
+                if item is _EXHAUSTED:
+                    return
+                yield item
+        finally:
+            self.finish()
+
+    def finish(self) -> dict[str, Any]:
+        with self._lock:
+            if self._summary is not None:
+                return self._summary
+            # Release the profiler slot even if summarizing fails, or profiling would stay blocked.
+            self._summary = {"profileId": self.id}
+            try:
+                self._summary = self._summarize()
+            finally:
+                self._on_finish(self)
+            return self._summary
+
+    def _summarize(self) -> dict[str, Any]:
+        wall_ms = (time.perf_counter() - self._started) * 1000
+        self._profile.create_stats()
+        stats = pstats.Stats()
+        if self._profile.stats:  # type: ignore[attr-defined]
+            stats.add(self._profile)
+        summary: dict[str, Any] = {
+            "profileId": self.id,
+            "wallMs": round(wall_ms, 2),
+            "profiledMs": round(stats.total_tt * 1000, 2),  # type: ignore[attr-defined]
+            "functions": {
+                "cumulative": function_rows(stats, self.top_n, "cumulative"),
+                "self": function_rows(stats, self.top_n, "self"),
+            },
+        }
+        if self.unavailable:
+            summary["profilerUnavailable"] = True
+        if self._torch_profile is not None:
+            self._torch_profile.stop()
+            summary["operators"] = operator_rows(self._torch_profile, self.top_n)
+        if self.output_dir is not None:
+            try:
+                summary["files"] = self._write(stats, summary)
+            except OSError:  # pragma: no cover - disk/runtime dependent
+                logger.exception("profile %s could not be written", self.id)
+        return summary
+
+    def _write(self, stats: pstats.Stats, summary: dict[str, Any]) -> dict[str, str]:
+        assert self.output_dir is not None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        stem = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}{int(now * 1000) % 1000:03d}-{self.id}"
+        stats_path = self.output_dir / f"{stem}.prof"
+        summary_path = self.output_dir / f"{stem}.json"
+        stats.dump_stats(stats_path)
+        files = {"pstats": str(stats_path), "summary": str(summary_path)}
+        summary_path.write_text(dumps({**summary, "files": files}) + "\n", encoding="utf-8")
+        _rotate(self.output_dir, self.keep)
+        return files
+
+
+def _rotate(directory: Path, keep: int) -> None:
+    """Delete the oldest profiles so at most `keep` remain; names sort by start time."""
+    stems = sorted({path.stem for path in directory.glob("*.json")} | {path.stem for path in directory.glob("*.prof")})
+    for stem in stems[: max(0, len(stems) - keep)]:
+        for suffix in (".json", ".prof"):
+            (directory / f"{stem}{suffix}").unlink(missing_ok=True)
+
+
+class RequestProfiler:
+    """Decides which flagged requests get profiled, and counts every decision by outcome."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int = 1,
+        min_interval: float = 10.0,
+        probability: float = 1.0,
+        top_n: int = 25,
+        output_dir: str | Path | None = None,
+        keep: int = 20,
+        torch_ops: bool = False,
+        token: str | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.max_concurrent = max(1, int(max_concurrent))
+        if CPROFILE_IS_GLOBAL and self.max_concurrent > 1:
+            logger.warning("cProfile is interpreter-wide on Python 3.12+; profiling one request at a time")
+            self.max_concurrent = 1
+        self.min_interval = max(0.0, float(min_interval))
+        self.probability = max(0.0, min(1.0, float(probability)))
+        self.top_n = max(1, int(top_n))
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.keep = max(1, int(keep))
+        self.torch_ops = torch_ops and torch_profiler_available()
+        if torch_ops and not self.torch_ops:
+            logger.warning("torch operator profiling requested but torch is not installed; using cProfile only")
+        self.token = token or None
+        self.counts = {outcome: 0 for outcome in OUTCOMES}
+        self._active = 0
+        self._last_started: float | None = None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def start(self, flag: str) -> tuple[ProfileSession | None, str]:
+        """(session, outcome) for a request carrying the profile header with value `flag`."""
+        with self._lock:
+            outcome = self._admit(flag)
+            self.counts[outcome] += 1
+            if outcome != PROFILED:
+                return None, outcome
+            self._active += 1
+            self._last_started = time.monotonic()
+        try:
+            session = ProfileSession(
+                os.urandom(4).hex(), self.top_n, self.output_dir, self.keep, self.torch_ops, self._release
+            )
+        except BaseException:
+            with self._lock:
+                self._active -= 1
+            raise
+        return session, PROFILED
+
+    def _admit(self, flag: str) -> str:
+        if self.token is not None and not hmac.compare_digest(flag.encode(), self.token.encode()):
+            return FORBIDDEN
+        if self._active >= self.max_concurrent:
+            return BUSY
+        if self._last_started is not None and time.monotonic() - self._last_started < self.min_interval:
+            return RATE_LIMITED
+        if self.probability < 1.0 and self._random.random() >= self.probability:
+            return NOT_SAMPLED
+        if CPROFILE_IS_GLOBAL and not _cprofile_free():
+            return BUSY
+        return PROFILED
+
+    def _release(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._active -= 1
@@ -0,0 +1,300 @@
+"""Record/replay fixtures and a local Google Books stand-in server for offline benchmarks."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+try:
+    from . import jsonutil
+except ImportError:  # pragma: no cover - supports direct script execution
+    from bookshelf_scanner import jsonutil
+
+logger = logging.getLogger(__name__)
+
+VOLUMES_PATH = "/books/v1/volumes"
+
+
+class FixtureStore:
+    """Query string -> raw `volumes` response, persisted as one JSON file."""
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path else None
+        self._responses: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def get(self, query: str) -> dict[str, Any] | None:
+        return self._responses.get(_fixture_key(query))
+
+    def put(self, query: str, payload: dict[str, Any]) -> None:
+        with self._lock:
+            self._responses[_fixture_key(query)] = payload
+
+    def load(self) -> None:
+        if self.path is None:
+            return
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        with self._lock:
+            self._responses.update(data.get("responses") or {})
+
+    def save(self, path: str | Path | None = None) -> Path:
+        target = Path(path) if path else self.path
+        if target is None:
+            raise ValueError("FixtureStore.save requires a path")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            payload = {"responses": dict(sorted(self._responses.items()))}
+        target.write_text(json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8")
+        return target
+
+    def import_lookup_csv(self, path: str | Path) -> int:
+        """Rebuild per-query responses from a `lookup.py` output CSV. Returns queries imported."""
+        grouped: dict[str, list[tuple[int, dict[str, Any]]]] = defaultdict(list)
+        totals: dict[str, int] = {}
+        with Path(path).open("r", encoding="utf-8", newline="") as handle:
+            for row in csv.DictReader(handle):
+                query = (row.get("query") or "").strip()
+                if not query:
+                    continue
+                try:
+                    totals[query] = max(totals.get(query, 0), int(row.get("response_total_items") or 0))
+                except ValueError:
+                    totals.setdefault(query, 0)
+                grouped.setdefault(query, [])
+                raw = (row.get("raw_item_json") or "").strip()
+                if row.get("match_found") != "true" or not raw:
+                    continue
+                try:
+                    item = jsonutil.loads(raw)
+                    result_index = int(row.get("result_index") or 0)
+                except (json.JSONDecodeError, ValueError):
+                    continue
+                grouped[query].append((result_index, item))
+
+        for query, indexed_items in grouped.items():
+            items = [item for _, item in sorted(indexed_items, key=lambda pair: pair[0])]
+            payload: dict[str, Any] = {"kind": "books#volumes", "totalItems": totals.get(query, len(items))}
+            if items:
+                payload["items"] = items
+            self.put(query, payload)
+        return len(grouped)
+
+
+class RecordingSession:
+    """`requests.Session` wrapper that stores every successful `volumes` response."""
+
+    def __init__(self, session: Any, store: FixtureStore) -> None:
+        self._session = session
+        self.store = store
+
+    def get(self, url: str, params: dict[str, Any] | None = None, **kwargs: Any) -> Any:
+        response = self._session.get(url, params=params, **kwargs)
+        if response.ok and params and params.get("q"):
+            self.store.put(str(params["q"]), response.json())
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+
+def record_client(client: Any, store: FixtureStore) -> Any:
+    """Route a GoogleBooksClient's HTTP calls through a recording session."""
+    client.session = RecordingSession(client.session, store)
+    return client
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Serves fixture responses at `/books/v1/volumes` with injected latency and errors."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        store: FixtureStore,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__((host, port), _StandInHandler)
+        self.store = store
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{VOLUMES_PATH}"
+
+    def start(self) -> str:
+        """Serve from a daemon thread and return the URL to use as `GoogleBooksClient` base URL."""
+        self._thread = threading.Thread(target=self.serve_forever, name="google-books-stand-in", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StandInServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _draw_delay_and_error(self) -> tuple[float, bool]:
+        with self._random_lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+            failed = self._random.random() < self.error_rate
+        return max(0.0, self.latency_ms + jitter) / 1000, failed
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    server: StandInServer
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        parsed = urlparse(self.path)
+        if parsed.path.rstrip("/") != VOLUMES_PATH:
+            self._send_json(404, {"error": {"code": 404, "message": "Not Found"}})
+            return
+
+        self.server._count("requests")
+        delay_s, failed = self.server._draw_delay_and_error()
+        if delay_s:
+            time.sleep(delay_s)
+        if failed:
+            self.server._count("errors")
+            status = self.server.error_status
+            self._send_json(status, {"error": {"code": status, "message": "Injected error"}})
+            return
+
+        params = parse_qs(parsed.query)
+        query = (params.get("q") or [""])[0]
+        try:
+            max_results = max(1, min(40, int((params.get("maxResults") or ["10"])[0])))
+        except ValueError:
+            max_results = 10
+
+        payload = self.server.store.get(query)
+        if payload is None:
+            self.server._count("misses")
+            payload = {"kind": "books#volumes", "totalItems": 0}
+        else:
+            self.server._count("hits")
+            payload = dict(payload)
+            if payload.get("items"):
+                payload["items"] = payload["items"][:max_results]
+        self._send_json(200, payload)
+
+    def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+        body = jsonutil.dumps_bytes(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - base signature
+        logger.debug("stand-in %s", format % args)
+
+
+def _fixture_key(query: str) -> str:
+    return " ".join((query or "").split())
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Record/replay Google Books responses for offline benchmarks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import-csv", help="Import lookup.py output CSV rows into a fixture store.")
+    import_parser.add_argument("input", type=Path, help="CSV written by `python -m bookshelf_scanner.lookup`.")
+    import_parser.add_argument("--fixtures", type=Path, required=True, help="Fixture store JSON path.")
+
+    serve_parser = subparsers.add_parser("serve", help="Serve fixtures as a local Google Books stand-in.")
+    serve_parser.add_argument("--fixtures", type=Path, default=None, help="Fixture store JSON path.")
+    serve_parser.add_argument(
+        "--lookup-csv",
+        type=Path,
+        action="append",
+        default=[],
+        help="lookup.py output CSV to load on startup (repeatable).",
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request.")
+    serve_parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the latency.")
+    serve_parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error.")
+    serve_parser.add_argument("--error-status", type=int, default=503, help="HTTP status for injected errors.")
+    serve_parser.add_argument("--seed", type=int, default=None, help="Random seed for latency/error injection.")
+    return parser
+
+
+def _run_cli() -> int:
+    args = _build_arg_parser().parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "import-csv":
+        store = FixtureStore(args.fixtures)
+        count = store.import_lookup_csv(args.input)
+        store.save()
+        print(f"Imported {count} query response(s) into {args.fixtures} ({len(store)} total)")
+        return 0
+
+    store = FixtureStore(args.fixtures)
+    for path in args.lookup_csv:
+        store.import_lookup_csv(path)
+    server = StandInServer(
+        store,
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    print(f"Serving {len(store)} fixture response(s) at {server.base_url}")
+    print("Point GOOGLE_BOOKS_BASE_URL (or lookup --base-url) at it.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_run_cli())
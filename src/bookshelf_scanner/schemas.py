@@ -1,10 +1,26 @@
 """Pydantic data models for the bookshelf scanner pipeline."""
 
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
+_set_attribute = object.__setattr__
+
+
+def _construct_trusted(cls: type[BaseModel], values: dict[str, Any]) -> Any:
+    """Instance of `cls` from already-clean values for every field, without validation.
+
+    `model_construct` also skips validation, but its per-field default and alias
+    handling costs more than validating these small models in pydantic 2.
+    """
+    instance = cls.__new__(cls)
+    _set_attribute(instance, "__dict__", values)
+    _set_attribute(instance, "__pydantic_fields_set__", set(values))
+    _set_attribute(instance, "__pydantic_extra__", None)
+    _set_attribute(instance, "__pydantic_private__", None)
+    return instance
+
 
 class SpineExtraction(BaseModel):
     """Structured text extracted from a single book spine image."""
@@ -30,6 +46,19 @@ class SpineExtraction(BaseModel):
         cleaned = " ".join(value.split())
         return cleaned or None
 
+    @classmethod
+    def trusted(
+        cls,
+        title: str,
+        author: str | None = None,
+        confidence: float = 0.0,
+        raw_response: str | None = None,
+    ) -> "SpineExtraction":
+        """Build from values produced internally (placeholders, cached results) without revalidating."""
+        return _construct_trusted(
+            cls, {"title": title, "author": author, "confidence": confidence, "raw_response": raw_response}
+        )
+
 
 class SpineExtractionResult(BaseModel):
     """Extraction payload tied to an individual segmented spine image."""
@@ -46,6 +75,11 @@ class DetectedSpine(BaseModel):
     confidence: float = Field(ge=0.0, le=1.0)
     index: int
 
+    @classmethod
+    def trusted(cls, bbox: tuple[int, int, int, int], confidence: float, index: int) -> "DetectedSpine":
+        """Build from detector output that is already typed and in range, without revalidating."""
+        return _construct_trusted(cls, {"bbox": bbox, "confidence": confidence, "index": index})
+
     @property
     def width(self) -> int:
         return self.bbox[2] - self.bbox[0]
@@ -57,3 +91,11 @@ class DetectedSpine(BaseModel):
     @property
     def area(self) -> int:
         return self.width * self.height
+
+
+class CatalogMatch(BaseModel):
+    """A confident local catalog hit standing in for a Google Books lookup."""
+
+    item: dict[str, Any]
+    score: float = Field(ge=0.0, le=1.0)
+    source: str
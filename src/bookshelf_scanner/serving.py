@@ -0,0 +1,127 @@
+"""Thread-safe lazy model holders and process memory reporting for the web API."""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Generic, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LazyResource(Generic[T]):
+    """Build a shared object once, even when several threads ask for it at the same time."""
+
+    def __init__(self, factory: Callable[[], T], name: str) -> None:
+        self.factory = factory
+        self.name = name
+        self.load_seconds: float | None = None
+        self._value: T | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not None
+
+    def get(self) -> T:
+        value = self._value
+        if value is not None:
+            return value
+        with self._lock:
+            if self._value is None:
+                started = time.perf_counter()
+                self._value = self.factory()
+                self.load_seconds = time.perf_counter() - started
+                logger.info("%s initialized in %.2fs", self.name, self.load_seconds)
+            return self._value
+
+
+class ModelPool(Generic[T]):
+    """Up to `size` lazily built model instances, each used by one caller at a time.
+
+    With the default size of 1 this is a lazily initialized model guarded by a
+    lock; larger pools trade memory for concurrent inference.
+    """
+
+    def __init__(self, factory: Callable[[], T], size: int = 1, name: str = "model") -> None:
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.name = name
+        self.load_seconds: list[float] = []
+        self._instances: list[T] = []
+        self._idle: queue.SimpleQueue[T] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> int:
+        return len(self._instances)
+
+    def preload(self) -> None:
+        """Build every instance now (e.g. before a pre-forking server starts workers)."""
+        while self._create() is not None:
+            pass
+
+    def get(self) -> T:
+        """Return an instance for non-inference access (attributes, versions); loads one if needed."""
+        if not self._instances:
+            self._create()
+        return self._instances[0]
+
+    @contextmanager
+    def acquire(self, timeout: float | None = None) -> Iterator[T]:
+        """Borrow an instance exclusively for one inference call."""
+        try:
+            instance = self._idle.get_nowait()
+        except queue.Empty:
+            instance = self._create(enqueue=False)
+            if instance is None:
+                instance = self._idle.get(timeout=timeout)
+        try:
+            yield instance
+        finally:
+            self._idle.put(instance)
+
+    def _create(self, enqueue: bool = True) -> T | None:
+        with self._lock:
+            if len(self._instances) >= self.size:
+                return None
+            started = time.perf_counter()
+            instance = self.factory()
+            elapsed = time.perf_counter() - started
+            self.load_seconds.append(elapsed)
+            self._instances.append(instance)
+            if enqueue:
+                self._idle.put(instance)
+            logger.info("%s instance %s/%s initialized in %.2fs", self.name, len(self._instances), self.size, elapsed)
+            return instance
+
+
+def process_memory() -> dict[str, int]:
+    """RSS/PSS/shared bytes for this process (Linux smaps_rollup; RSS only elsewhere)."""
+    rollup = Path("/proc/self/smaps_rollup")
+    if rollup.exists():
+        fields = {
+            "Rss": "rssBytes",
+            "Pss": "pssBytes",
+            "Shared_Clean": "sharedCleanBytes",
+            "Shared_Dirty": "sharedDirtyBytes",
+        }
+        usage: dict[str, int] = {}
+        for line in rollup.read_text(encoding="utf-8").splitlines():
+            key, _, rest = line.partition(":")
+            if key in fields:
+                usage[fields[key]] = int(rest.split()[0]) * 1024
+        return usage
+
+    import resource
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return {"maxRssBytes": int(max_rss if os.uname().sysname == "Darwin" else max_rss * 1024)}
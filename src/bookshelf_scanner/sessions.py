@@ -0,0 +1,213 @@
+"""Shelf sessions: several overlapping captures of one shelf merged into one spine list."""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+import uuid
+from typing import Any
+
+from .dedupe import hamming_distance, similar_size
+
+
+class SessionSpine:
+    """One physical spine resolved once per session, however many captures show it."""
+
+    def __init__(self, spine_id: int, extraction: dict[str, Any], lookup: dict[str, Any]) -> None:
+        self.id = spine_id
+        self.extraction = extraction
+        self.lookup = lookup
+        title_key = " ".join(str(extraction.get("title") or "").lower().split())
+        # Placeholder titles such as "[Extraction Failed]" must never match another spine.
+        self.title_key = "" if title_key.startswith("[") else title_key
+        # (dHash, (width, height)) for every crop of this spine seen so far.
+        self.signatures: list[tuple[int, tuple[int, int]]] = []
+        self.captures: list[int] = []
+
+    @property
+    def lookup_failed(self) -> bool:
+        """A failed lookup is retried by the next capture that matches this spine instead of being reused."""
+        return self.lookup.get("error") is not None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "sessionSpineId": self.id,
+            "extraction": self.extraction,
+            "lookup": self.lookup,
+            "captures": list(self.captures),
+        }
+
+
+class ShelfSession:
+    """Resolved spines for one shelf plus their merged left-to-right order."""
+
+    def __init__(self, hash_distance: int = 6, match_window: int = 2) -> None:
+        self.id = uuid.uuid4().hex
+        self.hash_distance = hash_distance
+        self.match_window = max(1, match_window)
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.capture_count = 0
+        self._spines: dict[int, SessionSpine] = {}
+        self._order: list[int] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start_capture(self) -> "SessionCapture":
+        with self._lock:
+            self.capture_count += 1
+            self.updated_at = time.time()
+            return SessionCapture(self, self.capture_count)
+
+    def match_title(self, title: str) -> SessionSpine | None:
+        title_key = " ".join((title or "").lower().split())
+        if not title_key:
+            return None
+        with self._lock:
+            for spine in self._spines.values():
+                if spine.title_key == title_key:
+                    return spine
+        return None
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            spines = [self._spines[spine_id].to_dict() for spine_id in self._order]
+            return {
+                "sessionId": self.id,
+                "captures": self.capture_count,
+                "count": len(spines),
+                "createdAt": round(self.created_at, 3),
+                "updatedAt": round(self.updated_at, 3),
+                "spines": spines,
+            }
+
+
+class SessionCapture:
+    """Places one capture's spines into the session order as they are resolved.
+
+    Spines must be reported in the capture's reading order. Each spine already
+    in the session is an anchor: new spines seen before the first anchor go
+    just before it, and new spines after an anchor go right after it. A capture
+    that shares no spine with the session is appended at the end.
+
+    Matching runs ahead of placement, since spines are matched as they are
+    extracted but placed once their lookups finish. `match_title` and
+    `match_crop` therefore keep their own anchor: the last known spine this
+    capture matched.
+    """
+
+    def __init__(self, session: ShelfSession, index: int) -> None:
+        self.session = session
+        self.index = index
+        self.new_spines = 0
+        self.reused_spines = 0
+        self._cursor: int | None = None
+        self._leading: list[int] = []
+        self._anchor: int | None = None
+        self._matched: set[int] = set()
+
+    def _matched_spine(self, spine: SessionSpine | None) -> SessionSpine | None:
+        if spine is not None:
+            self._matched.add(spine.id)
+            with self.session._lock:
+                if spine.id in self.session._order:
+                    self._anchor = spine.id
+        return spine
+
+    def match_title(self, title: str) -> SessionSpine | None:
+        return self._matched_spine(self.session.match_title(title))
+
+    def match_crop(self, signature: int | None, size: tuple[int, int]) -> SessionSpine | None:
+        """The known spine just right of this capture's anchor, if its crop hash matches.
+
+        A series shares one spine design, so a hash alone cannot tell its
+        volumes apart. Only the next `match_window` known spines after the
+        anchor are candidates, and a crop that matches several of them is left
+        to extraction. Before this capture has an anchor, nothing is matched.
+        """
+        session = self.session
+        if signature is None or self._anchor is None:
+            return None
+        with session._lock:
+            start = session._order.index(self._anchor) + 1
+            candidates = [
+                session._spines[spine_id]
+                for spine_id in session._order[start:]
+                if spine_id not in self._matched and self.index not in session._spines[spine_id].captures
+            ][: session.match_window]
+            matches = [
+                spine
+                for spine in candidates
+                if any(
+                    hamming_distance(signature, known_hash) <= session.hash_distance
+                    and similar_size(size, known_size, tolerance=0.25)
+                    for known_hash, known_size in spine.signatures
+                )
+            ]
+        return self._matched_spine(matches[0]) if len(matches) == 1 else None
+
+    def reuse(
+        self,
+        spine: SessionSpine,
+        signature: int | None,
+        size: tuple[int, int],
+        lookup: dict[str, Any] | None = None,
+    ) -> None:
+        """Record `spine` in this capture; `lookup` replaces its stored lookup after a retry."""
+        session = self.session
+        with session._lock:
+            if lookup is not None:
+                spine.lookup = lookup
+            if self.index not in spine.captures:
+                spine.captures.append(self.index)
+            if signature is not None:
+                spine.signatures.append((signature, size))
+            self.reused_spines += 1
+            session.updated_at = time.time()
+            if spine.id not in session._order:
+                # Added earlier by a capture that has not placed it yet, so it cannot anchor.
+                return
+            if self._cursor is None and self._leading:
+                position = session._order.index(spine.id)
+                session._order[position:position] = self._leading
+                self._leading = []
+            self._cursor = spine.id
+
+    def add(
+        self,
+        extraction: dict[str, Any],
+        lookup: dict[str, Any],
+        signature: int | None,
+        size: tuple[int, int],
+    ) -> SessionSpine:
+        session = self.session
+        with session._lock:
+            spine = SessionSpine(next(session._ids), extraction, lookup)
+            spine.captures.append(self.index)
+            if signature is not None:
+                spine.signatures.append((signature, size))
+            session._spines[spine.id] = spine
+            if self._cursor is None:
+                self._leading.append(spine.id)
+            else:
+                position = session._order.index(self._cursor) + 1
+                session._order.insert(position, spine.id)
+                self._cursor = spine.id
+            self.new_spines += 1
+            session.updated_at = time.time()
+            return spine
+
+    def finish(self) -> dict[str, Any]:
+        session = self.session
+        with session._lock:
+            session._order.extend(self._leading)
+            self._leading = []
+            total = len(session._order)
+        return {
+            "sessionId": session.id,
+            "captureIndex": self.index,
+            "newSpines": self.new_spines,
+            "reusedSpines": self.reused_spines,
+            "totalSpines": total,
+        }
@@ -0,0 +1,175 @@
+"""Stand-in models and Google Books client with configurable latency, for offline benchmarks and load tests.
+
+They implement the interfaces `web_api.create_app` expects from its factories,
+so a full `/scan/capture` request runs without weights or network access:
+
+    create_app(**stub_factories(detect_ms=40, extract_ms=120, lookup_ms=80))
+
+Latencies are slept, so concurrent requests overlap the way real model and
+network waits do.
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+import threading
+import time
+from typing import Any, Callable, Sequence
+
+from PIL import Image
+
+from .detections import SpineDetections
+from .schemas import DetectedSpine, SpineExtraction
+
+
+class _Latency:
+    def __init__(self, latency_ms: float, jitter_ms: float, seed: int | None) -> None:
+        self.latency_ms = max(0.0, float(latency_ms))
+        self.jitter_ms = max(0.0, float(jitter_ms))
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.latency_ms and not self.jitter_ms:
+            return
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+
+class StubDetector:
+    """Splits every frame into `rows` shelves of `spines_per_row` evenly spaced spines."""
+
+    def __init__(
+        self,
+        spines_per_row: int = 12,
+        rows: int = 2,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        self.spines_per_row = max(1, int(spines_per_row))
+        self.rows = max(1, int(rows))
+        self._latency = _Latency(latency_ms, jitter_ms, seed)
+
+    def detect_all(
+        self, image: Image.Image, min_area: int = 0, max_detections: int = 50
+    ) -> tuple[list[Image.Image], list[DetectedSpine]]:
+        self._latency.wait()
+        detections = self._detections(image.width, image.height).filter_min_area(min_area).head(max_detections)
+        return detections.crops(image), detections.renumbered().to_spines()
+
+    def detect_batch(
+        self, images: Sequence[Image.Image], min_area: int = 0, max_detections: int = 50
+    ) -> list[tuple[list[Image.Image], list[DetectedSpine]]]:
+        return [
+            (detections.crops(image), detections.to_spines())
+            for detections, image in zip(self.detect_columnar_batch(images, min_area, max_detections), images)
+        ]
+
+    def detect_columnar(self, image: Image.Image, min_area: int = 0, max_detections: int = 50) -> SpineDetections:
+        self._latency.wait()
+        return self._detections(image.width, image.height).filter_min_area(min_area).head(max_detections).renumbered()
+
+    def detect_columnar_batch(
+        self, images: Sequence[Image.Image], min_area: int = 0, max_detections: int = 50
+    ) -> list[SpineDetections]:
+        # One latency per batch, like a batched forward pass.
+        self._latency.wait()
+        return [
+            self._detections(image.width, image.height).filter_min_area(min_area).head(max_detections).renumbered()
+            for image in images
+        ]
+
+    def _detections(self, width: int, height: int) -> SpineDetections:
+        spine_width = max(1, width // self.spines_per_row)
+        row_height = max(1, height // self.rows)
+        boxes = [
+            (column * spine_width, row * row_height, (column + 1) * spine_width, (row + 1) * row_height)
+            for row in range(self.rows)
+            for column in range(self.spines_per_row)
+        ]
+        return SpineDetections(boxes, [0.9] * len(boxes))
+
+
+class StubExtractor:
+    """Returns a distinct `Stub Book N` title per call, so title dedupe never merges spines."""
+
+    _counter = itertools.count(1)
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int | None = None) -> None:
+        self._latency = _Latency(latency_ms, jitter_ms, seed)
+
+    def extract(self, spine_image: Image.Image) -> SpineExtraction:
+        self._latency.wait()
+        number = next(self._counter)
+        return SpineExtraction.trusted(f"Stub Book {number}", f"Author {number % 97}", 0.8)
+
+
+def stub_volume(title: str, author: str | None, number: int = 0) -> dict[str, Any]:
+    """A Google Books `volumes` item shaped like a real response."""
+    return {
+        "kind": "books#volume",
+        "id": f"stub-{abs(hash((title, number))) % 10**10:010d}",
+        "volumeInfo": {
+            "title": title,
+            "authors": [author] if author else [],
+            "publisher": "Stub Press",
+            "publishedDate": "2001-01-01",
+            "description": f"Offline stand-in volume for {title}. " * 8,
+            "industryIdentifiers": [{"type": "ISBN_13", "identifier": f"978{number:010d}"}],
+            "pageCount": 300,
+            "categories": ["Fiction"],
+            "averageRating": 4.0,
+            "ratingsCount": 100,
+            "imageLinks": {"thumbnail": "http://books.google.com/books/content?id=stub&zoom=1"},
+            "infoLink": "https://books.google.com/books?id=stub",
+        },
+    }
+
+
+class StubBooksClient:
+    """`GoogleBooksClient` stand-in answering every lookup with `items` synthetic volumes."""
+
+    api_key = "stub"
+
+    def __init__(self, items: int = 3, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int | None = None) -> None:
+        self.items = max(0, int(items))
+        self._latency = _Latency(latency_ms, jitter_ms, seed)
+
+    def lookup(self, title: str, author: str | None = None) -> dict[str, Any]:
+        self._latency.wait()
+        items = [stub_volume(title, author, number) for number in range(self.items)]
+        return {"totalItems": len(items), "items": items, "query": f"intitle:{title}"}
+
+    def search(self, query: str, max_results: int | None = None) -> dict[str, Any]:
+        self._latency.wait()
+        count = self.items if max_results is None else min(self.items, max_results)
+        items = [stub_volume(query, None, number) for number in range(count)]
+        return {"totalItems": len(items), "items": items}
+
+
+def stub_factories(
+    *,
+    detect_ms: float = 0.0,
+    extract_ms: float = 0.0,
+    lookup_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    spines_per_row: int = 12,
+    rows: int = 2,
+    lookup_items: int = 3,
+    with_books_client: bool = True,
+) -> dict[str, Callable[[], Any]]:
+    """`create_app` keyword arguments wiring in the stubs.
+
+    With `with_books_client=False` the app builds its real `GoogleBooksClient`,
+    e.g. pointed at a `replay serve` stand-in via `GOOGLE_BOOKS_BASE_URL`.
+    """
+    factories: dict[str, Callable[[], Any]] = {
+        "detector_factory": lambda: StubDetector(spines_per_row, rows, detect_ms, jitter_ms),
+        "extractor_factory": lambda: StubExtractor(extract_ms, jitter_ms),
+    }
+    if with_books_client:
+        factories["books_client_factory"] = lambda: StubBooksClient(lookup_items, lookup_ms, jitter_ms)
+    return factories
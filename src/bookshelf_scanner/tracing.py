@@ -0,0 +1,269 @@
+"""Per-request tracing: nested timed spans kept in memory and exported as OTLP/JSON.
+
+A `Trace` holds the spans of one request. `Trace.span()` opens a child of the
+span that is current in the calling context, so nesting follows `with` blocks.
+Work handed to another thread (the lookup pool) passes its parent explicitly:
+
+    with trace.span("lookup", parent=spine_span):
+        with trace.span("catalog.match") as span:   # child of "lookup"
+            span.set(hit=True)
+
+`NULL_TRACE` has the same interface and records nothing, so untraced requests
+run the same code for almost no cost. `TraceExporter` appends finished traces,
+one OTLP `ExportTraceServiceRequest` JSON document per line, which the
+OpenTelemetry Collector's file receiver and most trace viewers import.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator
+
+from .jsonutil import dumps
+
+SERVICE_NAME = "bookshelf-scanner"
+SCOPE_NAME = "bookshelf_scanner.tracing"
+
+# OTLP span kinds and status codes.
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_ERROR = 2
+
+_TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current_span: ContextVar[Span | None] = ContextVar("bookshelf_current_span", default=None)
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str] | None:
+    """(trace id, parent span id) from a W3C `traceparent` header, or None when absent or malformed."""
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if match is None or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return match.group(1), match.group(2)
+
+
+class Span:
+    """One timed operation; `end()` is idempotent so early exits can close a span safely."""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(
+        self,
+        trace: Trace,
+        name: str,
+        parent_id: str | None,
+        attributes: dict[str, Any],
+        kind: int = SPAN_KIND_INTERNAL,
+    ) -> None:
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+
+class Trace:
+    """The spans of one request, rooted at a server span named after the route."""
+
+    enabled = True
+
+    def __init__(
+        self,
+        name: str,
+        attributes: dict[str, Any] | None = None,
+        traceparent: str | None = None,
+    ) -> None:
+        remote = parse_traceparent(traceparent)
+        self.trace_id = remote[0] if remote else os.urandom(16).hex()
+        self._lock = threading.Lock()
+        self._spans: list[Span] = []
+        self.root = self._start(name, remote[1] if remote else None, dict(attributes or {}), SPAN_KIND_SERVER)
+
+    def _start(self, name: str, parent_id: str | None, attributes: dict[str, Any], kind: int) -> Span:
+        span = Span(self, name, parent_id, attributes, kind)
+        with self._lock:
+            self._spans.append(span)
+        return span
+
+    def start_span(self, name: str, parent: Span | None = None, **attributes: Any) -> Span:
+        """Open a span the caller ends itself, for work that outlives one `with` block."""
+        if parent is None:
+            current = _current_span.get()
+            parent = current if current is not None and current.trace is self else self.root
+        return self._start(name, parent.span_id, attributes, SPAN_KIND_INTERNAL)
+
+    @contextmanager
+    def span(self, name: str, parent: Span | None = None, **attributes: Any) -> Iterator[Span]:
+        """Time the block as a child of `parent` (default: the current span); it becomes current inside."""
+        span = self.start_span(name, parent, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            span.end()
+            _current_span.reset(token)
+
+    def finish(self) -> None:
+        """End the root span and any span left open by an abandoned request."""
+        with self._lock:
+            spans = list(self._spans)
+        for span in spans:
+            span.end()
+
+    def spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def to_tree(self) -> dict[str, Any]:
+        """The root span with nested `children`, times in ms relative to the root's start."""
+        spans = self.spans()
+        known = {span.span_id for span in spans}
+        children: dict[str, list[Span]] = {}
+        for span in spans:
+            if span is not self.root:
+                parent_id = span.parent_id if span.parent_id in known else self.root.span_id
+                children.setdefault(parent_id, []).append(span)
+
+        origin_ns = self.root.start_ns
+
+        def _node(span: Span) -> dict[str, Any]:
+            node: dict[str, Any] = {
+                "name": span.name,
+                "spanId": span.span_id,
+                "startMs": round((span.start_ns - origin_ns) / 1e6, 3),
+                "durationMs": round(span.duration_ms, 3),
+            }
+            if span.attributes:
+                node["attributes"] = dict(span.attributes)
+            if span.error is not None:
+                node["error"] = span.error
+            kids = sorted(children.get(span.span_id, []), key=lambda child: child.start_ns)
+            if kids:
+                node["children"] = [_node(child) for child in kids]
+            return node
+
+        return {"traceId": self.trace_id, **_node(self.root)}
+
+    def to_otlp(self, service_name: str = SERVICE_NAME) -> dict[str, Any]:
+        """An OTLP/JSON `ExportTraceServiceRequest` holding every span of this trace."""
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": SCOPE_NAME},
+                            "spans": [_otlp_span(self.trace_id, span) for span in self.spans()],
+                        }
+                    ],
+                }
+            ]
+        }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSON encodes 64-bit integers as strings.
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def _otlp_span(trace_id: str, span: Span) -> dict[str, Any]:
+    encoded: dict[str, Any] = {
+        "traceId": trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns if span.end_ns is not None else span.start_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": STATUS_ERROR, "message": span.error} if span.error is not None else {},
+    }
+    if span.parent_id is not None:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    def set(self, **attributes: Any) -> None:
+        return None
+
+    def end(self) -> None:
+        return None
+
+
+class NullTrace:
+    """Stand-in for untraced requests: every span is the same shared no-op."""
+
+    enabled = False
+    _span = _NullSpan()
+
+    def start_span(self, name: str, parent: Any = None, **attributes: Any) -> _NullSpan:
+        return self._span
+
+    def span(self, name: str, parent: Any = None, **attributes: Any) -> _NullSpan:
+        return self._span
+
+    def finish(self) -> None:
+        return None
+
+
+NULL_TRACE = NullTrace()
+
+
+class TraceExporter:
+    """Appends finished traces to a JSON Lines file of OTLP `ExportTraceServiceRequest` documents."""
+
+    def __init__(self, path: str | Path, service_name: str = SERVICE_NAME) -> None:
+        self.path = Path(path)
+        self.service_name = service_name
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, trace: Trace) -> None:
+        line = dumps(trace.to_otlp(self.service_name)) + "\n"
+        with self._lock, self.path.open("a", encoding="utf-8") as handle:
+            handle.write(line)
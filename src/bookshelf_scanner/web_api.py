@@ -3,23 +3,61 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import itertools
 import logging
 import os
+import random
 import time
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor
 from io import BytesIO
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from PIL import Image
 
+from .admission import ADMITTED, REJECTED, SUPERSEDED, PreviewAdmission
+from .artifacts import DebugArtifactWriter
+from .batching import DetectionBatcher
+from .cache import BoundedCache
+from .catalog import CatalogIndex, build_catalog, goodreads_book_id, normalize_text, score_candidate
+from .cropstore import CropStoreWriter
+from .dedupe import crop_signature, dedupe_spines
+from .detections import SpineDetections
 from .detector import SpineDetector
-from .extractor import BookExtractor
+from .extractor import EXTRACTION_FAILED_TITLE, BookExtractor
+from .jobs import JobQueueFull, ScanJobManager
+from .jsonutil import JSONCodec, get_codec
 from .lookup import GoogleBooksClient
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import MetricsRegistry
+from .profiling import ProfileSession, RequestProfiler
+from .sessions import SessionSpine, ShelfSession
+from .serving import LazyResource, ModelPool, process_memory
+from .stubs import stub_factories
+from .tracing import NULL_TRACE, NullTrace, Trace, TraceExporter
+from .transport import (
+    JSON_MIMETYPE,
+    MSGPACK_MIMETYPE,
+    PACKED_MIMETYPE,
+    encode_msgpack,
+    encode_packed,
+    supported_mimetypes,
+)
 
 logger = logging.getLogger(__name__)
 
+# `/detect/spines` accepts the frame as the whole request body with one of these types.
+RAW_IMAGE_MIMETYPES = {"image/jpeg", "image/png", "application/octet-stream"}
+_DETECT_FORMAT_LABELS = {JSON_MIMETYPE: "json", MSGPACK_MIMETYPE: "msgpack", PACKED_MIMETYPE: "packed"}
+# With BOOKSHELF_PROFILING enabled, a `/scan/capture` carrying this header may run under cProfile.
+PROFILE_HEADER = "X-Bookshelf-Profile"
+
 
 def _repo_model_path() -> str:
     return str(Path(__file__).resolve().parents[2] / "yolov8n.pt")
@@ -29,6 +67,24 @@ def _repo_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
 
+def describe_model_version(
+    *,
+    model_path: str,
+    confidence: float,
+    iou_threshold: float,
+    classes: list[int] | None,
+    extract_model: str,
+) -> str:
+    """Identify the detector/extractor setup so cached captures never outlive a model change."""
+    weights = Path(model_path)
+    fingerprint = weights.name
+    if weights.exists():
+        stat = weights.stat()
+        fingerprint = f"{weights.name}:{stat.st_size}:{int(stat.st_mtime)}"
+    class_list = ",".join(str(value) for value in classes or [])
+    return f"yolo={fingerprint};conf={confidence};iou={iou_threshold};classes={class_list};extract={extract_model}"
+
+
 def _load_env_file(path: Path) -> None:
     if not path.exists():
         return
@@ -43,6 +99,36 @@ def _load_env_file(path: Path) -> None:
             os.environ.setdefault(key, value)
 
 
+class FastJSONProvider(DefaultJSONProvider):
+    """`jsonify` through a `JSONCodec` (orjson when available).
+
+    Keys keep the order handlers build them in instead of being sorted, and
+    response bodies are encoded straight to bytes. Debug-mode pretty printing
+    still goes through the standard library.
+    """
+
+    sort_keys = False
+
+    def __init__(self, app: Flask, codec: JSONCodec) -> None:
+        super().__init__(app)
+        self.codec = codec
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.codec.dumps(obj, default=self.default)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return super().loads(s, **kwargs) if kwargs else self.codec.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(obj)
+        body = self.codec.dumps_bytes(obj, default=self.default) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
 def _read_bool_env(name: str, default: bool) -> bool:
     raw = os.getenv(name)
     if raw is None:
@@ -86,32 +172,89 @@ def build_extractor_factory(
     return _factory
 
 
+def _loaded_extractor_factory(factory: Callable[[], BookExtractor]) -> Callable[[], BookExtractor]:
+    # BookExtractor defers weight loading to the first extraction; pool instances load up front.
+    def _factory() -> BookExtractor:
+        extractor = factory()
+        load = getattr(extractor, "load", None)
+        if callable(load):
+            load()
+        return extractor
+
+    return _factory
+
+
 def build_books_client_factory(
     *,
     api_key: str | None,
     timeout: int,
     max_results: int,
+    base_url: str | None = None,
 ) -> Callable[[], GoogleBooksClient]:
     def _factory() -> GoogleBooksClient:
         return GoogleBooksClient(
             api_key=api_key,
             timeout=timeout,
             max_results=max_results,
+            base_url=base_url,
         )
 
     return _factory
 
 
+def build_catalog_factory(
+    *,
+    paths: list[str],
+    min_score: float,
+) -> Callable[[], CatalogIndex]:
+    def _factory() -> CatalogIndex:
+        return build_catalog(paths, min_score=min_score)
+
+    return _factory
+
+
 def create_app(
     detector_factory: Callable[[], SpineDetector] | None = None,
     extractor_factory: Callable[[], BookExtractor] | None = None,
     books_client_factory: Callable[[], GoogleBooksClient] | None = None,
+    catalog_factory: Callable[[], CatalogIndex] | None = None,
+    preload_models: bool = False,
+    model_version: str | None = None,
 ) -> Flask:
     app = Flask(__name__)
     CORS(app)
 
     _load_env_file(_repo_root() / "secrets" / ".env")
 
+    json_codec = get_codec(os.getenv("BOOKSHELF_JSON_BACKEND", "auto"))
+    app.json = FastJSONProvider(app, json_codec)
+
+    if _read_bool_env("BOOKSHELF_STUB_MODELS", False):
+        # Capacity testing without weights: latency-injecting stand-ins for the models, and for
+        # Google Books unless GOOGLE_BOOKS_BASE_URL points at a stand-in server.
+        stub_spines = max(1, int(os.getenv("BOOKSHELF_STUB_SPINES", "24")))
+        stubs = stub_factories(
+            detect_ms=float(os.getenv("BOOKSHELF_STUB_DETECT_MS", "0")),
+            extract_ms=float(os.getenv("BOOKSHELF_STUB_EXTRACT_MS", "0")),
+            lookup_ms=float(os.getenv("BOOKSHELF_STUB_LOOKUP_MS", "0")),
+            spines_per_row=(stub_spines + 1) // 2,
+            rows=2 if stub_spines > 1 else 1,
+            with_books_client=not os.getenv("GOOGLE_BOOKS_BASE_URL"),
+        )
+        detector_factory = detector_factory or stubs["detector_factory"]
+        extractor_factory = extractor_factory or stubs["extractor_factory"]
+        books_client_factory = books_client_factory or stubs.get("books_client_factory")
+        model_version = model_version or "stub"
+
+    if model_version is None:
+        model_version = os.getenv("BOOKSHELF_MODEL_VERSION") or describe_model_version(
+            model_path=os.getenv("BOOKSHELF_MODEL_PATH", _repo_model_path()),
+            confidence=float(os.getenv("BOOKSHELF_DETECT_CONFIDENCE", "0.15")),
+            iou_threshold=float(os.getenv("BOOKSHELF_DETECT_IOU", "0.45")),
+            classes=[SpineDetector.BOOK_CLASS_ID],
+            extract_model=os.getenv("BOOKSHELF_EXTRACT_MODEL", "moondream-0.5b"),
+        )
+
     if detector_factory is None:
         detector_factory = build_detector_factory(
             model_path=os.getenv("BOOKSHELF_MODEL_PATH", _repo_model_path()),
@@ -135,43 +278,298 @@ def create_app(
             api_key=os.getenv("GOOGLE_BOOKS_API_KEY"),
             timeout=int(os.getenv("BOOKSHELF_LOOKUP_TIMEOUT", "10")),
             max_results=int(os.getenv("BOOKSHELF_LOOKUP_MAX_RESULTS", "5")),
+            base_url=os.getenv("GOOGLE_BOOKS_BASE_URL") or None,
+        )
+    if catalog_factory is None:
+        catalog_factory = build_catalog_factory(
+            paths=[path for path in os.getenv("BOOKSHELF_CATALOG_PATHS", "").split(os.pathsep) if path.strip()],
+            min_score=float(os.getenv("BOOKSHELF_CATALOG_MIN_SCORE", str(CatalogIndex.DEFAULT_MIN_SCORE))),
         )
+    catalog_learns = _read_bool_env("BOOKSHELF_CATALOG_LEARN", True)
+    dedupe_crops = _read_bool_env("BOOKSHELF_DEDUPE_CROPS", True)
+    # Multi-capture shelf sessions; idle sessions expire after the TTL.
+    shelf_sessions = BoundedCache(
+        max_entries=int(os.getenv("BOOKSHELF_SESSION_MAX", "256")),
+        ttl_seconds=float(os.getenv("BOOKSHELF_SESSION_TTL", "3600")),
+    )
+    session_hash_distance = int(os.getenv("BOOKSHELF_SESSION_HASH_DISTANCE", "6"))
+    # Retried uploads of the same JPEG replay the finished capture instead of rerunning models.
+    capture_cache_entries = int(os.getenv("BOOKSHELF_CAPTURE_CACHE_ENTRIES", "64"))
+    capture_cache = (
+        BoundedCache(
+            max_entries=capture_cache_entries,
+            ttl_seconds=float(os.getenv("BOOKSHELF_CAPTURE_CACHE_TTL", "600")),
+            max_bytes=int(os.getenv("BOOKSHELF_CAPTURE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+        )
+        if capture_cache_entries > 0
+        else None
+    )
+    batch_max_queries = int(os.getenv("BOOKSHELF_BATCH_MAX_QUERIES", "25"))
+    # Shared I/O pool for concurrent Google Books calls; threads start lazily on first use.
+    lookup_executor = ThreadPoolExecutor(
+        max_workers=max(1, int(os.getenv("BOOKSHELF_LOOKUP_WORKERS", "8"))),
+        thread_name_prefix="books-lookup",
+    )
 
-    detector_cache: dict[str, SpineDetector] = {}
-    extractor_cache: dict[str, BookExtractor] = {}
-    books_client_cache: dict[str, GoogleBooksClient] = {}
-    request_counter = {"count": 0}
-
-    def get_detector() -> SpineDetector:
-        # Lazy init keeps startup fast and avoids loading YOLO unless needed.
-        detector = detector_cache.get("detector")
-        if detector is None:
-            detector = detector_factory()
-            detector_cache["detector"] = detector
-            logger.info("Detector initialized for web API")
-        return detector
-
-    def get_extractor() -> BookExtractor:
-        # Extraction model is heavy; load once and reuse across capture requests.
-        extractor = extractor_cache.get("extractor")
-        if extractor is None:
-            extractor = extractor_factory()
-            extractor_cache["extractor"] = extractor
-            logger.info("Extractor initialized for web API")
-        return extractor
+    detector_pool: ModelPool[SpineDetector] = ModelPool(
+        detector_factory,
+        size=int(os.getenv("BOOKSHELF_DETECT_POOL_SIZE", "1")),
+        name="detector",
+    )
+    extractor_pool: ModelPool[BookExtractor] = ModelPool(
+        _loaded_extractor_factory(extractor_factory),
+        size=int(os.getenv("BOOKSHELF_EXTRACT_POOL_SIZE", "1")),
+        name="extractor",
+    )
+    # Reuse a session-backed client for repeated Google Books calls.
+    books_client_resource = LazyResource(books_client_factory, name="Google Books client")
+    # Local catalog is consulted before Google Books and grows with confident remote hits.
+    catalog_resource = LazyResource(catalog_factory, name="local catalog")
+    request_ids = itertools.count(1)
+
+    metrics = MetricsRegistry()
+    request_seconds = metrics.histogram(
+        "bookshelf_request_seconds", "Wall time per HTTP request, including streamed bodies.", ("route", "status")
+    )
+    decode_seconds = metrics.histogram("bookshelf_decode_seconds", "Time to decode an uploaded image.")
+    detect_seconds = metrics.histogram("bookshelf_detect_seconds", "Spine detection time per frame.")
+    extract_seconds = metrics.histogram("bookshelf_extract_seconds", "Extraction time per spine.")
+    lookup_seconds = metrics.histogram(
+        "bookshelf_lookup_seconds", "Catalog/Google Books lookup time per spine.", ("source",)
+    )
+    spines_detected = metrics.counter("bookshelf_spines_detected_total", "Spine boxes returned by the detector.")
+    extractions_avoided = metrics.counter(
+        "bookshelf_extractions_avoided_total", "Spines merged by dedupe before extraction."
+    )
+    extraction_failures = metrics.counter(
+        "bookshelf_extraction_failures_total", "Spines whose extraction backend raised."
+    )
+    lookup_errors = metrics.counter("bookshelf_lookup_errors_total", "Spine lookups that returned an error.")
+    detect_serialize_seconds = metrics.histogram(
+        "bookshelf_detect_serialize_seconds",
+        "Time to encode a /detect/spines response.",
+        ("format",),
+        buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025),
+    )
+    detect_response_bytes = metrics.histogram(
+        "bookshelf_detect_response_bytes",
+        "Encoded /detect/spines response size.",
+        ("format",),
+        buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384),
+    )
 
     def get_books_client() -> GoogleBooksClient:
-        # Reuse a session-backed client for repeated Google Books calls.
-        books_client = books_client_cache.get("books_client")
-        if books_client is None:
-            books_client = books_client_factory()
-            books_client_cache["books_client"] = books_client
-            logger.info("Google Books client initialized for web API")
-        return books_client
+        return books_client_resource.get()
+
+    def get_catalog() -> CatalogIndex:
+        return catalog_resource.get()
+
+    def _cache_samples() -> Iterator[tuple[dict[str, str], float]]:
+        # Read existing cache counters at scrape time; never load the client just to report on it.
+        books_client = books_client_resource.get() if books_client_resource.loaded else None
+        for cache_name in ("search_cache", "step_cache", "no_match_cache"):
+            cache = getattr(books_client, cache_name, None)
+            if cache is None:
+                continue
+            yield {"cache": cache_name, "result": "hit"}, float(cache.hits)
+            yield {"cache": cache_name, "result": "miss"}, float(cache.misses)
+        if capture_cache is not None:
+            yield {"cache": "capture_cache", "result": "hit"}, float(capture_cache.hits)
+            yield {"cache": "capture_cache", "result": "miss"}, float(capture_cache.misses)
+
+    def _model_load_samples() -> Iterator[tuple[dict[str, str], float]]:
+        for pool in (detector_pool, extractor_pool):
+            for instance, seconds in enumerate(pool.load_seconds):
+                yield {"model": pool.name, "instance": str(instance)}, seconds
+        for resource in (books_client_resource, catalog_resource):
+            if resource.load_seconds is not None:
+                yield {"model": resource.name, "instance": "0"}, resource.load_seconds
+
+    metrics.callback(
+        "bookshelf_cache_requests_total",
+        "Cache lookups by cache (Google Books search_cache/step_cache/no_match_cache, capture_cache) and result.",
+        _cache_samples,
+        type_name="counter",
+    )
+    metrics.callback("bookshelf_model_load_seconds", "Time taken to load each model instance.", _model_load_samples)
+
+    # Preview frames: one in flight per client, newest frame waits, global cap answers 429.
+    preview_admission = PreviewAdmission(
+        max_in_flight=int(os.getenv("BOOKSHELF_PREVIEW_MAX_IN_FLIGHT", "4")),
+        wait_timeout=float(os.getenv("BOOKSHELF_PREVIEW_WAIT_TIMEOUT", "2.0")),
+    )
+    preview_retry_after = os.getenv("BOOKSHELF_PREVIEW_RETRY_AFTER", "1")
+    app.extensions["preview_admission"] = preview_admission
+
+    detect_batch_size = metrics.histogram(
+        "bookshelf_detect_batch_size",
+        "Preview frames per batched detector call.",
+        buckets=(1, 2, 3, 4, 6, 8, 12, 16, 32),
+    )
+    detect_batch_wait_seconds = metrics.histogram(
+        "bookshelf_detect_batch_wait_seconds",
+        "Latency added per preview frame while waiting to join a detection batch.",
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+    )
+    detect_batch_run_seconds = metrics.histogram(
+        "bookshelf_detect_batch_run_seconds", "Model time per batched detector call."
+    )
+
+    def _observe_detect_batch(size: int, waits: list[float], run_seconds: float) -> None:
+        detect_batch_size.observe(size)
+        detect_batch_run_seconds.observe(run_seconds)
+        for wait in waits:
+            detect_batch_wait_seconds.observe(wait)
+
+    def _detect_boxes(detector: Any, image: Image.Image, min_area: int, max_detections: int) -> SpineDetections:
+        # Previews only need boxes: skip the crops and per-box objects when the detector can.
+        detect_columnar = getattr(detector, "detect_columnar", None)
+        if detect_columnar is not None:
+            return detect_columnar(image, min_area=min_area, max_detections=max_detections)
+        _, spines = detector.detect_all(image=image, min_area=min_area, max_detections=max_detections)
+        return SpineDetections.from_spines(spines)
+
+    def _run_detect_batch(images: list[Image.Image], min_area: int, max_detections: int) -> list[SpineDetections]:
+        with detector_pool.acquire() as detector:
+            detect_columnar_batch = getattr(detector, "detect_columnar_batch", None)
+            if detect_columnar_batch is None:
+                # Detectors without batch support still benefit from the shared queue.
+                return [_detect_boxes(detector, image, min_area, max_detections) for image in images]
+            return detect_columnar_batch(images, min_area=min_area, max_detections=max_detections)
+
+    # Concurrent /detect/spines frames share batched detector calls; size 1 turns batching off.
+    max_detect_batch = int(os.getenv("BOOKSHELF_DETECT_BATCH_SIZE", "8"))
+    detect_batcher = (
+        DetectionBatcher(
+            _run_detect_batch,
+            max_batch_size=max_detect_batch,
+            max_wait_ms=float(os.getenv("BOOKSHELF_DETECT_BATCH_WINDOW_MS", "5")),
+            concurrency=detector_pool.size,
+            on_batch=_observe_detect_batch,
+        )
+        if max_detect_batch > 1
+        else None
+    )
+    app.extensions["detect_batcher"] = detect_batcher
+    metrics.callback(
+        "bookshelf_preview_frames_total",
+        "/detect/spines frames by admission outcome (admitted, rejected, superseded, dropped).",
+        lambda: [({"outcome": outcome}, count) for outcome, count in preview_admission.counts.items()],
+        type_name="counter",
+    )
+    metrics.callback(
+        "bookshelf_preview_in_flight",
+        "/detect/spines frames currently being processed.",
+        lambda: [({}, preview_admission.in_flight)],
+    )
+    debug_artifact_encode_seconds = metrics.histogram(
+        "bookshelf_debug_artifact_encode_seconds", "Annotation drawing and JPEG encoding time per capture's debug images."
+    )
+    debug_artifact_write_seconds = metrics.histogram(
+        "bookshelf_debug_artifact_write_seconds", "File write time per capture's debug images."
+    )
+
+    def _observe_debug_artifact(encode: float, write: float) -> None:
+        debug_artifact_encode_seconds.observe(encode)
+        debug_artifact_write_seconds.observe(write)
+
+    # Annotated captures and crops for debugging; written on a background thread, dropped when it falls behind.
+    debug_artifacts_dir = os.getenv("BOOKSHELF_DEBUG_ARTIFACTS_DIR", "").strip()
+    debug_artifacts = (
+        DebugArtifactWriter(
+            debug_artifacts_dir,
+            max_queue=int(os.getenv("BOOKSHELF_DEBUG_ARTIFACTS_QUEUE", "32")),
+            on_artifact=_observe_debug_artifact,
+            crop_store=(
+                CropStoreWriter(Path(debug_artifacts_dir) / "crops")
+                if _read_bool_env("BOOKSHELF_DEBUG_ARTIFACTS_PACKED", True)
+                else None
+            ),
+        )
+        if debug_artifacts_dir
+        else None
+    )
+    debug_artifact_ids = itertools.count(1)
+    app.extensions["debug_artifacts"] = debug_artifacts
+    if debug_artifacts is not None:
+        metrics.callback(
+            "bookshelf_debug_artifacts_total",
+            "Capture debug image sets by outcome (written, dropped, failed).",
+            lambda: [
+                ({"outcome": outcome}, getattr(debug_artifacts, outcome)) for outcome in ("written", "dropped", "failed")
+            ],
+            type_name="counter",
+        )
+    app.extensions["metrics"] = metrics
+
+    # `?trace=1` returns a capture's span tree; sampled and requested traces go to the OTLP/JSON file.
+    trace_export_path = os.getenv("BOOKSHELF_TRACE_EXPORT_PATH", "").strip()
+    trace_exporter = TraceExporter(trace_export_path) if trace_export_path else None
+    trace_sample_rate = max(0.0, min(1.0, float(os.getenv("BOOKSHELF_TRACE_SAMPLE_RATE", "0"))))
+    app.extensions["trace_exporter"] = trace_exporter
+
+    # Flagged captures run under cProfile, within limits strict enough to leave enabled in production.
+    profiler = (
+        RequestProfiler(
+            max_concurrent=int(os.getenv("BOOKSHELF_PROFILE_MAX_CONCURRENT", "1")),
+            min_interval=float(os.getenv("BOOKSHELF_PROFILE_MIN_INTERVAL", "10")),
+            probability=float(os.getenv("BOOKSHELF_PROFILE_PROBABILITY", "1.0")),
+            top_n=int(os.getenv("BOOKSHELF_PROFILE_TOP_N", "25")),
+            output_dir=os.getenv("BOOKSHELF_PROFILE_DIR", "").strip() or None,
+            keep=int(os.getenv("BOOKSHELF_PROFILE_KEEP", "20")),
+            torch_ops=_read_bool_env("BOOKSHELF_PROFILE_TORCH", False),
+            token=os.getenv("BOOKSHELF_PROFILE_TOKEN") or None,
+        )
+        if _read_bool_env("BOOKSHELF_PROFILING", False)
+        else None
+    )
+    app.extensions["profiler"] = profiler
+    if profiler is not None:
+        metrics.callback(
+            "bookshelf_profiles_total",
+            "Profile-flagged captures by outcome (profiled, busy, rate_limited, not_sampled, forbidden).",
+            lambda: [({"outcome": outcome}, count) for outcome, count in profiler.counts.items()],
+            type_name="counter",
+        )
+
+    @app.before_request
+    def _start_request_timer() -> None:
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response: Response) -> Response:
+        started = g.get("request_started")
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            status = str(response.status_code)
+            # Streamed bodies finish after this hook, so observe when the response closes.
+            response.call_on_close(
+                lambda: request_seconds.observe(time.perf_counter() - started, route=route, status=status)
+            )
+        return response
+
+    if preload_models:
+        # Load weights in the parent so pre-forked workers share them copy-on-write.
+        detector_pool.preload()
+        extractor_pool.preload()
+        catalog_resource.get()
 
     @app.get("/health")
-    def health() -> tuple[dict[str, str], int]:
-        return {"status": "ok"}, 200
+    def health() -> tuple[dict[str, Any], int]:
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "models": {
+                "detector": detector_pool.loaded,
+                "extractor": extractor_pool.loaded,
+                "catalog": catalog_resource.loaded,
+            },
+            "memory": process_memory(),
+        }, 200
+
+    @app.get("/metrics")
+    def metrics_endpoint() -> Response:
+        return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
 
     @app.get("/")
     def index() -> tuple[dict[str, str], int]:
@@ -179,8 +577,11 @@ def create_app(
 
     def _compact_lookup_item(item: dict[str, Any]) -> dict[str, Any]:
         volume_info = item.get("volumeInfo") or {}
+        # Clients store `id` as the Google Books volume id, so Goodreads catalog rows get their own field.
+        goodreads_id = goodreads_book_id(item.get("id"))
         return {
-            "id": item.get("id"),
+            "id": None if goodreads_id is not None else item.get("id"),
+            **({"goodreadsId": goodreads_id} if goodreads_id is not None else {}),
             "title": volume_info.get("title"),
             "authors": volume_info.get("authors") or [],
             "publishedDate": volume_info.get("publishedDate"),
@@ -209,6 +610,18 @@ def create_app(
     def _missing_api_key_message() -> str:
         return "Google Books API key is not configured. Set GOOGLE_BOOKS_API_KEY in secrets/.env."
 
+    def _learn_catalog_volume(catalog: CatalogIndex, item: dict[str, Any], *, title: str, author: str | None) -> None:
+        # Only remember remote hits that themselves look like a confident match for the query.
+        volume_info = item.get("volumeInfo") or {}
+        score = score_candidate(
+            normalize_text(title),
+            normalize_text(author),
+            [normalize_text(str(volume_info.get("title") or ""))],
+            [normalize_text(name) for name in volume_info.get("authors") or []],
+        )
+        if score >= catalog.min_score:
+            catalog.add_volume(item, source="google_books")
+
     def _normalized_extracted_title(title: str) -> str:
         return " ".join((title or "").strip().lower().split())
 
@@ -236,63 +649,133 @@ def create_app(
             }
         )
 
-    @app.post("/detect/spines")
-    def detect_spines():
-        if "image" not in request.files:
-            return jsonify({"error": "missing_image_file"}), 400
+    @app.post("/books/search/batch")
+    def books_search_batch():
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or not isinstance(body.get("queries"), list):
+            return jsonify({"error": "invalid_batch"}), 400
 
-        uploaded = request.files["image"]
-        if not uploaded or uploaded.filename == "":
-            return jsonify({"error": "empty_image_file"}), 400
+        try:
+            default_max_results = max(1, min(40, int(body.get("maxResults", 20))))
+            entries: list[tuple[str, int]] = []
+            for raw in body["queries"]:
+                if isinstance(raw, dict):
+                    query = str(raw.get("q") or "").strip()
+                    max_results = max(1, min(40, int(raw.get("maxResults", default_max_results))))
+                else:
+                    query = str(raw or "").strip()
+                    max_results = default_max_results
+                entries.append((query, max_results))
+        except (TypeError, ValueError):
+            return jsonify({"error": "invalid_max_results"}), 400
+        if not entries:
+            return jsonify({"error": "missing_queries"}), 400
+        if len(entries) > batch_max_queries:
+            return jsonify({"error": "too_many_queries", "maxQueries": batch_max_queries}), 400
 
+        books_client = get_books_client()
+        if not _has_books_api_key(books_client):
+            return jsonify({"error": "missing_api_key", "message": _missing_api_key_message()}), 503
+
+        def _search_one(entry: tuple[str, int]) -> dict[str, Any]:
+            query, max_results = entry
+            if not query:
+                return {"totalItems": 0, "items": [], "error": "missing_query"}
+            try:
+                payload = books_client.search(query=query, max_results=max_results)
+            except Exception as exc:  # pragma: no cover - network/runtime dependent
+                return {"totalItems": 0, "items": [], "error": f"{type(exc).__name__}: {exc}"}
+            return {
+                "totalItems": int(payload.get("totalItems") or 0),
+                "items": [_compact_lookup_item(item) for item in payload.get("items") or []],
+                "error": None,
+            }
+
+        # Identical queries in one batch share a single upstream call.
+        unique_entries = list(dict.fromkeys(entries))
+        resolved = dict(zip(unique_entries, lookup_executor.map(_search_one, unique_entries)))
+        return jsonify(
+            {
+                "count": len(entries),
+                "results": [
+                    {"query": query, "maxResults": max_results, **resolved[(query, max_results)]}
+                    for query, max_results in entries
+                ],
+            }
+        )
+
+    def _preview_client_id() -> str:
+        return (
+            request.headers.get("X-Client-Id")
+            or request.args.get("clientId")
+            or request.remote_addr
+            or "anonymous"
+        ).strip()
+
+    @app.post("/detect/spines")
+    def detect_spines():
+        with preview_admission.admit(_preview_client_id()) as outcome:
+            if outcome == ADMITTED:
+                return _detect_spines()
+
+        if outcome == SUPERSEDED:
+            # A newer frame from the same client replaced this one while it waited.
+            return jsonify({"error": "frame_superseded"}), 409
+        error = "preview_saturated" if outcome == REJECTED else "frame_dropped"
+        response = jsonify({"error": error, **preview_admission.stats()})
+        response.headers["Retry-After"] = preview_retry_after
+        return response, 429
+
+    def _detect_spines():
+        if request.mimetype in RAW_IMAGE_MIMETYPES:
+            # Raw body skips multipart framing; options travel in the query string.
+            image_bytes = request.get_data(cache=False)
+            if not image_bytes:
+                return jsonify({"error": "empty_image_body"}), 400
+            options = request.args
+        else:
+            if "image" not in request.files:
+                return jsonify({"error": "missing_image_file"}), 400
+
+            uploaded = request.files["image"]
+            if not uploaded or uploaded.filename == "":
+                return jsonify({"error": "empty_image_file"}), 400
+            image_bytes = uploaded.read()
+            options = request.form
+
+        started_decode = time.perf_counter()
         try:
-            image = Image.open(BytesIO(uploaded.read())).convert("RGB")
+            image = Image.open(BytesIO(image_bytes)).convert("RGB")
         except Exception as exc:  # pragma: no cover - PIL internals vary by input
             return jsonify({"error": f"invalid_image:{exc}"}), 400
+        decode_seconds.observe(time.perf_counter() - started_decode)
 
-        min_area = int(request.form.get("minArea", "250"))
-        max_detections = int(request.form.get("maxDetections", "50"))
+        min_area = int(options.get("minArea", "250"))
+        max_detections = int(options.get("maxDetections", "50"))
 
-        detector = get_detector()
         started_at = time.perf_counter()
-        _, spines = detector.detect_all(
-            image=image,
-            min_area=min_area,
-            max_detections=max_detections,
-        )
+        if detect_batcher is not None:
+            detections = detect_batcher.detect(image, min_area=min_area, max_detections=max_detections)
+        else:
+            with detector_pool.acquire() as detector:
+                detections = _detect_boxes(detector, image, min_area, max_detections)
         inference_ms = (time.perf_counter() - started_at) * 1000
+        detect_seconds.observe(inference_ms / 1000)
+        spines_detected.inc(len(detections))
 
-        boxes = []
-        for spine in spines:
-            x1, y1, x2, y2 = spine.bbox
-            boxes.append(
-                {
-                    "index": spine.index,
-                    "bbox": [x1, y1, x2, y2],
-                    "x1": x1,
-                    "y1": y1,
-                    "x2": x2,
-                    "y2": y2,
-                    "x": x1,
-                    "y": y1,
-                    "w": max(0, x2 - x1),
-                    "h": max(0, y2 - y1),
-                    "confidence": spine.confidence,
-                }
-            )
+        rows = detections.rows()
 
-        request_counter["count"] += 1
-        req_id = request_counter["count"]
-        log_sample = req_id % 20 == 0 or len(boxes) == 0
+        req_id = next(request_ids)
+        log_sample = req_id % 20 == 0 or len(rows) == 0
         if log_sample:
             top_conf = sorted(
-                [round(float(box["confidence"]), 3) for box in boxes],
+                [round(row[4], 3) for row in rows],
                 reverse=True,
             )[:3]
             logger.info(
                 "detect/spines req=%s count=%s min_area=%s max_det=%s size=%sx%s inference_ms=%.1f top_conf=%s",
                 req_id,
-                len(boxes),
+                len(rows),
                 min_area,
                 max_detections,
                 image.width,
@@ -301,60 +784,320 @@ def create_app(
                 top_conf,
             )
 
-        return jsonify(
-            {
-                "boxes": boxes,
-                "count": len(boxes),
-                "frameWidth": image.width,
-                "frameHeight": image.height,
-                "inferenceMs": round(inference_ms, 2),
-            }
-        )
-
-    @app.post("/scan/capture")
-    def scan_capture():
+        # Preview clients can ask for a compact encoding via Accept; JSON stays the default.
+        response_format = request.accept_mimetypes.best_match(supported_mimetypes(), default=JSON_MIMETYPE)
+        started_serialize = time.perf_counter()
+        if response_format == MSGPACK_MIMETYPE:
+            response = Response(
+                encode_msgpack(rows, image.width, image.height, inference_ms), mimetype=MSGPACK_MIMETYPE
+            )
+        elif response_format == PACKED_MIMETYPE:
+            response = Response(
+                encode_packed(rows, image.width, image.height, inference_ms), mimetype=PACKED_MIMETYPE
+            )
+        else:
+            boxes = []
+            for index, (x1, y1, x2, y2, confidence) in zip(detections.indices.tolist(), rows):
+                boxes.append(
+                    {
+                        "index": index,
+                        "bbox": [x1, y1, x2, y2],
+                        "x1": x1,
+                        "y1": y1,
+                        "x2": x2,
+                        "y2": y2,
+                        "x": x1,
+                        "y": y1,
+                        "w": max(0, x2 - x1),
+                        "h": max(0, y2 - y1),
+                        "confidence": confidence,
+                    }
+                )
+            response = jsonify(
+                {
+                    "boxes": boxes,
+                    "count": len(boxes),
+                    "frameWidth": image.width,
+                    "frameHeight": image.height,
+                    "inferenceMs": round(inference_ms, 2),
+                }
+            )
+        serialize_s = time.perf_counter() - started_serialize
+        format_label = _DETECT_FORMAT_LABELS[response_format]
+        detect_serialize_seconds.observe(serialize_s, format=format_label)
+        detect_response_bytes.observe(response.content_length or 0, format=format_label)
+        response.headers["X-Serialize-Ms"] = f"{serialize_s * 1000:.3f}"
+        response.vary.add("Accept")
+        return response
+
+    def _read_upload_bytes() -> tuple[bytes | None, Any]:
         if "image" not in request.files:
-            return jsonify({"error": "missing_image_file"}), 400
+            return None, (jsonify({"error": "missing_image_file"}), 400)
 
         uploaded = request.files["image"]
         if not uploaded or uploaded.filename == "":
-            return jsonify({"error": "empty_image_file"}), 400
-
+            return None, (jsonify({"error": "empty_image_file"}), 400)
+        return uploaded.read(), None
+
+    def _open_image(image_bytes: bytes) -> Image.Image:
+        started_decode = time.perf_counter()
+        image = Image.open(BytesIO(image_bytes)).convert("RGB")
+        decode_seconds.observe(time.perf_counter() - started_decode)
+        return image
+
+    def _decode_upload(
+        image_bytes: bytes, trace: Trace | NullTrace = NULL_TRACE
+    ) -> tuple[Image.Image | None, Any]:
+        with trace.span("decode", bytes=len(image_bytes)) as span:
+            try:
+                image = _open_image(image_bytes)
+            except Exception as exc:  # pragma: no cover - PIL internals vary by input
+                span.set(error=str(exc))
+                return None, (jsonify({"error": f"invalid_image:{exc}"}), 400)
+            span.set(width=image.width, height=image.height)
+        return image, None
+
+    def _check_upload_header(image_bytes: bytes) -> Any:
+        """400 response when the bytes are not a readable image; reads only the header, no pixels."""
         try:
-            image = Image.open(BytesIO(uploaded.read())).convert("RGB")
+            with Image.open(BytesIO(image_bytes)):
+                return None
         except Exception as exc:  # pragma: no cover - PIL internals vary by input
             return jsonify({"error": f"invalid_image:{exc}"}), 400
 
-        min_area = int(request.form.get("minArea", "250"))
-        max_detections = int(request.form.get("maxDetections", "50"))
-        max_lookup_results = max(1, min(10, int(request.form.get("maxLookupResults", "3"))))
+    def _read_capture_params() -> dict[str, int]:
+        return {
+            "min_area": int(request.form.get("minArea", "250")),
+            "max_detections": int(request.form.get("maxDetections", "50")),
+            "max_lookup_results": max(1, min(10, int(request.form.get("maxLookupResults", "3")))),
+        }
+
+    def _read_capture_session() -> tuple[ShelfSession | None, Any]:
+        session_id = (request.form.get("sessionId") or request.args.get("sessionId") or "").strip()
+        if not session_id:
+            return None, None
+        session = shelf_sessions.get(session_id)
+        if session is None:
+            return None, (jsonify({"error": "session_not_found", "sessionId": session_id}), 404)
+        # Re-store on every capture so the TTL counts from the session's last activity.
+        shelf_sessions.set(session_id, session)
+        return session, None
+
+    def _iter_capture_events(
+        image: Image.Image,
+        *,
+        min_area: int,
+        max_detections: int,
+        max_lookup_results: int,
+        on_progress: Callable[..., None] | None = None,
+        session: ShelfSession | None = None,
+        trace: Trace | NullTrace = NULL_TRACE,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield `detections`, then one `spine` per kept spine, then `done` with timings.
+
+        With a shelf `session`, spines already resolved by an earlier capture
+        (same crop hash, or same extracted title) reuse that result instead of
+        being extracted and looked up again.
+
+        Spans never stay open across a `yield`; a `spine` span is started when
+        its extraction begins and ended when the spine is emitted.
+        """
+
+        def _progress(**fields: Any) -> None:
+            if on_progress is not None:
+                on_progress(**fields)
 
-        detector = get_detector()
-        extractor = get_extractor()
         books_client = get_books_client()
+        catalog = get_catalog()
         has_books_api_key = _has_books_api_key(books_client)
 
         started_total = time.perf_counter()
         started_detect = time.perf_counter()
+        _progress(stage="detect")
         # Stage 1: detect candidate spines from full-frame capture.
-        spine_images, spines = detector.detect_all(
-            image=image,
-            min_area=min_area,
-            max_detections=max_detections,
-        )
+        with trace.span("detect", minArea=min_area, maxDetections=max_detections) as span:
+            with detector_pool.acquire() as detector:
+                span.set(poolWaitMs=round((time.perf_counter() - started_detect) * 1000, 3))
+                spine_images, spines = detector.detect_all(
+                    image=image,
+                    min_area=min_area,
+                    max_detections=max_detections,
+                )
+            span.set(spines=len(spines))
         detect_ms = (time.perf_counter() - started_detect) * 1000
+        detected_count = len(spines)
+        detect_seconds.observe(detect_ms / 1000)
+        spines_detected.inc(detected_count)
+
+        # Stage 1b: collapse overlapping boxes and identical crops so each pays one extraction.
+        dedupe_stats = {"mergedBoxes": 0, "duplicateCrops": 0}
+        if dedupe_crops:
+            with trace.span("dedupe") as span:
+                spine_images, spines, dedupe_stats = dedupe_spines(spine_images, spines)
+                span.set(**dedupe_stats)
+        dedupe_stats["extractionsAvoided"] = detected_count - len(spines)
+        extractions_avoided.inc(dedupe_stats["extractionsAvoided"])
+        if debug_artifacts is not None:
+            debug_artifacts.submit(
+                f"capture_{time.strftime('%Y%m%d_%H%M%S')}_{next(debug_artifact_ids):04d}", image, spines
+            )
+
+        _progress(stage="extract_lookup", spinesDetected=len(spines), spinesProcessed=0)
+        yield {
+            "type": "detections",
+            "count": len(spines),
+            "detectedCount": detected_count,
+            "dedupe": dedupe_stats,
+            "frameWidth": image.width,
+            "frameHeight": image.height,
+            "boxes": [
+                {
+                    "spineIndex": spine.index,
+                    "bbox": list(spine.bbox),
+                    "confidence": float(spine.confidence),
+                }
+                for spine in spines
+            ],
+            "timingsMs": {"detect": round(detect_ms, 2)},
+        }
+
+        def _resolve_lookup(title: str, author: str | None, parent: Any) -> tuple[dict[str, Any], float]:
+            # Runs on the lookup pool so network waits overlap with the next extraction.
+            with trace.span("lookup", parent=parent) as span:
+                lookup, elapsed_ms = _lookup_spine(title, author)
+                span.set(source=lookup["source"] or "none", totalItems=lookup["totalItems"], error=lookup["error"])
+            return lookup, elapsed_ms
+
+        def _lookup_spine(title: str, author: str | None) -> tuple[dict[str, Any], float]:
+            started_lookup = time.perf_counter()
+            lookup: dict[str, Any] = {"totalItems": 0, "items": [], "error": None, "source": None}
+            # Stage 3a: resolve against the local catalog before any network call.
+            with trace.span("catalog.match") as span:
+                local_match = catalog.match(title=title, author=author)
+                span.set(hit=local_match is not None)
+            if local_match is not None:
+                lookup.update(totalItems=1, items=[_compact_lookup_item(local_match.item)], source="catalog")
+            elif not has_books_api_key:
+                lookup["error"] = f"missing_api_key: {_missing_api_key_message()}"
+            else:
+                try:
+                    # Stage 3b: lookup best metadata candidates for extracted text.
+                    with trace.span("google_books.lookup"):
+                        lookup_payload = books_client.lookup(title=title, author=author)
+                    raw_items = lookup_payload.get("items") or []
+                    lookup.update(
+                        totalItems=int(lookup_payload.get("totalItems") or 0),
+                        items=[_compact_lookup_item(item) for item in raw_items[:max_lookup_results]],
+                        source="google_books",
+                    )
+                    if catalog_learns and raw_items:
+                        _learn_catalog_volume(catalog, raw_items[0], title=title, author=author)
+                except Exception as exc:  # pragma: no cover - network/runtime dependent
+                    lookup["error"] = f"{type(exc).__name__}: {exc}"
+            elapsed_s = time.perf_counter() - started_lookup
+            lookup_seconds.observe(elapsed_s, source=lookup["source"] or "none")
+            if lookup["error"]:
+                lookup_errors.inc()
+            return lookup, elapsed_s * 1000
+
+        def _spine_event(spine: Any, extraction: dict[str, Any], lookup: dict[str, Any]) -> dict[str, Any]:
+            x1, y1, x2, y2 = spine.bbox
+            return {
+                "type": "spine",
+                "spineIndex": spine.index,
+                "bbox": [x1, y1, x2, y2],
+                "confidence": float(spine.confidence),
+                "extraction": extraction,
+                "lookup": lookup,
+            }
+
+        session_capture = session.start_capture() if session is not None else None
 
         started_extract_lookup = time.perf_counter()
-        spine_results: list[dict[str, Any]] = []
+        extract_busy_ms = 0.0
+        lookup_busy_ms = 0.0
+        kept_spines = 0
+        resolved_locally = 0
+        resolved_remotely = 0
         seen_extracted_titles: set[str] = set()
-        for crop_image, spine in zip(spine_images, spines):
-            # Stage 2: run OCR/extraction per cropped spine.
-            extraction = extractor.extract(crop_image)
-            lookup_error: str | None = None
-            lookup_total_items = 0
-            lookup_items: list[dict[str, Any]] = []
+        # Spines in reading order whose lookup may still be in flight on the I/O pool, as
+        # (spine, extraction, lookup future, session spine reused, crop signature, crop size, span).
+        pending: deque[
+            tuple[Any, dict[str, Any], Future | None, SessionSpine | None, int | None, tuple[int, int], Any]
+        ] = deque()
+
+        def _retry_session_lookup(reused: SessionSpine, spine_span: Any) -> Future | None:
+            # A transient Google Books failure must not stick to the spine for the session's lifetime.
+            if not reused.lookup_failed:
+                return None
+            title = str(reused.extraction.get("title") or "").strip()
+            author = (reused.extraction.get("author") or "").strip() or None
+            return lookup_executor.submit(_resolve_lookup, title, author, spine_span)
+
+        def _drain(block: bool) -> Iterator[dict[str, Any]]:
+            nonlocal kept_spines, lookup_busy_ms, resolved_locally, resolved_remotely
+            while pending and (block or pending[0][2] is None or pending[0][2].done()):
+                spine, extraction, future, reused, signature, size, spine_span = pending.popleft()
+                if future is None and reused is not None:
+                    lookup = reused.lookup
+                elif future is None:
+                    lookup = {"totalItems": 0, "items": [], "error": None, "source": None}
+                else:
+                    # Also a reused session spine whose earlier lookup failed and is being retried.
+                    lookup, elapsed_ms = future.result()
+                    lookup_busy_ms += elapsed_ms
+                    if lookup["source"] == "catalog":
+                        resolved_locally += 1
+                    elif lookup["source"] == "google_books":
+                        resolved_remotely += 1
+                kept_spines += 1
+                event = _spine_event(spine, extraction, lookup)
+                if session_capture is not None:
+                    # Session order is updated here because spines drain in reading order.
+                    if reused is not None:
+                        session_capture.reuse(reused, signature, size, lookup if future is not None else None)
+                        session_spine = reused
+                    else:
+                        session_spine = session_capture.add(extraction, lookup, signature, size)
+                    event["sessionSpineId"] = session_spine.id
+                    event["reused"] = reused is not None
+                spine_span.set(reused=reused is not None, source=lookup["source"] or "none")
+                spine_span.end()
+                yield event
+
+        for position, (crop_image, spine) in enumerate(zip(spine_images, spines), start=1):
+            signature: int | None = None
+            spine_span = trace.start_span("spine", spineIndex=spine.index)
+            if session_capture is not None:
+                # Stage 2a: the known spine next to the last one matched, recognised by its crop
+                # hash, skips extraction and lookup.
+                with trace.span("session.match_crop", parent=spine_span) as span:
+                    signature = crop_signature(crop_image)
+                    known = session_capture.match_crop(signature, crop_image.size)
+                    span.set(hit=known is not None)
+                if known is not None:
+                    _progress(spinesProcessed=position)
+                    future = _retry_session_lookup(known, spine_span)
+                    pending.append((spine, known.extraction, future, known, signature, crop_image.size, spine_span))
+                    yield from _drain(block=False)
+                    continue
+
+            # Stage 2: run OCR/extraction per cropped spine; the model never waits on the network.
+            started_extract = time.perf_counter()
+            # Hold the extractor only for this call so it is never borrowed across a yield.
+            with trace.span("extract", parent=spine_span) as span:
+                with extractor_pool.acquire() as extractor:
+                    span.set(poolWaitMs=round((time.perf_counter() - started_extract) * 1000, 3))
+                    extraction = extractor.extract(crop_image)
+                span.set(title=extraction.title, confidence=float(extraction.confidence))
+            extract_elapsed_s = time.perf_counter() - started_extract
+            extract_busy_ms += extract_elapsed_s * 1000
+            extract_seconds.observe(extract_elapsed_s)
+            _progress(spinesProcessed=position)
 
             title = extraction.title.strip()
+            if title == EXTRACTION_FAILED_TITLE:
+                extraction_failures.inc()
             author = (extraction.author or "").strip() or None
             normalized_title = _normalized_extracted_title(title)
 
@@ -365,74 +1108,375 @@ def create_app(
                         spine.index,
                         title,
                     )
+                    spine_span.set(droppedDuplicateTitle=True)
+                    spine_span.end()
                     continue
                 seen_extracted_titles.add(normalized_title)
 
+            extraction_fields = {
+                "title": extraction.title,
+                "author": extraction.author,
+                "confidence": float(extraction.confidence),
+            }
+            future = None
+            reused = None
             if title and not title.startswith("["):
-                if not has_books_api_key:
-                    lookup_error = f"missing_api_key: {_missing_api_key_message()}"
+                # Stage 2b: a title already resolved earlier in the session skips the lookup.
+                if session_capture is not None:
+                    with trace.span("session.match_title", parent=spine_span) as span:
+                        reused = session_capture.match_title(title)
+                        span.set(hit=reused is not None)
+                if reused is None:
+                    future = lookup_executor.submit(_resolve_lookup, title, author, spine_span)
                 else:
-                    try:
-                        # Stage 3: lookup best metadata candidates for extracted text.
-                        lookup_payload = books_client.lookup(title=title, author=author)
-                        lookup_total_items = int(lookup_payload.get("totalItems") or 0)
-                        raw_items = lookup_payload.get("items") or []
-                        lookup_items = [
-                            _compact_lookup_item(item) for item in raw_items[:max_lookup_results]
-                        ]
-                    except Exception as exc:  # pragma: no cover - network/runtime dependent
-                        lookup_error = f"{type(exc).__name__}: {exc}"
+                    future = _retry_session_lookup(reused, spine_span)
+            pending.append((spine, extraction_fields, future, reused, signature, crop_image.size, spine_span))
+            yield from _drain(block=False)
 
-            x1, y1, x2, y2 = spine.bbox
-            spine_results.append(
-                {
-                    "spineIndex": spine.index,
-                    "bbox": [x1, y1, x2, y2],
-                    "confidence": float(spine.confidence),
-                    "extraction": {
-                        "title": extraction.title,
-                        "author": extraction.author,
-                        "confidence": float(extraction.confidence),
-                    },
-                    "lookup": {
-                        "totalItems": lookup_total_items,
-                        "items": lookup_items,
-                        "error": lookup_error,
-                    },
-                }
-            )
+        yield from _drain(block=True)
+        session_stats = session_capture.finish() if session_capture is not None else None
 
         extract_lookup_ms = (time.perf_counter() - started_extract_lookup) * 1000
         total_ms = (time.perf_counter() - started_total) * 1000
 
-        request_counter["count"] += 1
-        req_id = request_counter["count"]
+        req_id = next(request_ids)
         logger.info(
-            "scan/capture req=%s count=%s min_area=%s max_det=%s max_lookup_results=%s detect_ms=%.1f extract_lookup_ms=%.1f total_ms=%.1f",
+            "scan/capture req=%s count=%s extractions_avoided=%s min_area=%s max_det=%s max_lookup_results=%s detect_ms=%.1f extract_ms=%.1f lookup_ms=%.1f extract_lookup_wall_ms=%.1f total_ms=%.1f",
             req_id,
-            len(spine_results),
+            kept_spines,
+            dedupe_stats["extractionsAvoided"],
             min_area,
             max_detections,
             max_lookup_results,
             detect_ms,
+            extract_busy_ms,
+            lookup_busy_ms,
             extract_lookup_ms,
             total_ms,
         )
 
-        return jsonify(
-            {
-                "count": len(spine_results),
-                "frameWidth": image.width,
-                "frameHeight": image.height,
-                "spines": spine_results,
-                "timingsMs": {
-                    "detect": round(detect_ms, 2),
-                    "extractLookup": round(extract_lookup_ms, 2),
-                    "total": round(total_ms, 2),
-                },
-            }
+        done: dict[str, Any] = {
+            "type": "done",
+            "count": kept_spines,
+            "dedupe": dedupe_stats,
+            "lookupStats": {
+                "local": resolved_locally,
+                "remote": resolved_remotely,
+                "localFraction": (
+                    round(resolved_locally / (resolved_locally + resolved_remotely), 4)
+                    if resolved_locally + resolved_remotely
+                    else 0.0
+                ),
+            },
+            "timingsMs": {
+                "detect": round(detect_ms, 2),
+                "extract": round(extract_busy_ms, 2),
+                "lookup": round(lookup_busy_ms, 2),
+                "total": round(total_ms, 2),
+            },
+        }
+        if session_stats is not None:
+            done["session"] = session_stats
+        yield done
+
+    def _capture_cache_key(image_bytes: bytes, options: dict[str, int]) -> tuple[Any, ...]:
+        return (
+            hashlib.sha256(image_bytes).hexdigest(),
+            options["min_area"],
+            options["max_detections"],
+            options["max_lookup_results"],
+            dedupe_crops,
+            model_version,
+        )
+
+    def _has_transient_failure(event: dict[str, Any]) -> bool:
+        # A retry should run these spines again, not replay the failure for the whole TTL. Other
+        # placeholders such as "[No Text Detected]" are the model's answer and come back the same.
+        if event["type"] != "spine":
+            return False
+        return event["lookup"].get("error") is not None or event["extraction"].get("title") == EXTRACTION_FAILED_TITLE
+
+    def _caching_capture_events(
+        events: Iterator[dict[str, Any]], cache_key: tuple[Any, ...] | None
+    ) -> Iterator[dict[str, Any]]:
+        """Pass events through and cache them once the capture has completed without failed spines."""
+        collected: list[dict[str, Any]] = []
+        cacheable = True
+        for event in events:
+            collected.append(event)
+            cacheable = cacheable and not _has_transient_failure(event)
+            yield event
+        if capture_cache is not None and cache_key is not None and cacheable:
+            size = len(json_codec.dumps_bytes(collected))
+            capture_cache.set(cache_key, collected, size=size)
+
+    def _capture_events(
+        image_bytes: bytes, options: dict[str, Any], trace: Trace | NullTrace = NULL_TRACE
+    ) -> tuple[Iterator[dict[str, Any]] | None, bool, Any]:
+        """Return (events, cache_hit, error_response) for one uploaded capture."""
+        # Session captures depend on what the session already holds, so they are never cached.
+        cacheable = capture_cache is not None and options.get("session") is None
+        cached = None
+        cache_key = None
+        if cacheable:
+            with trace.span("capture_cache.get") as span:
+                cache_key = _capture_cache_key(image_bytes, options)
+                cached = capture_cache.get(cache_key)
+                span.set(hit=cached is not None)
+        if cached is not None:
+            return iter(cached), True, None
+        image, error_response = _decode_upload(image_bytes, trace)
+        if image is None:
+            return None, False, error_response
+        events = _iter_capture_events(image, trace=trace, **options)
+        return _caching_capture_events(events, cache_key), False, None
+
+    def _assemble_capture(events: Iterator[dict[str, Any]]) -> dict[str, Any]:
+        # Events may be shared with the capture cache, so read them without mutating.
+        payload: dict[str, Any] = {"spines": []}
+        for event in events:
+            event_type = event["type"]
+            fields = {key: value for key, value in event.items() if key != "type"}
+            if event_type == "detections":
+                payload["frameWidth"] = event["frameWidth"]
+                payload["frameHeight"] = event["frameHeight"]
+            elif event_type == "spine":
+                payload["spines"].append(fields)
+            else:
+                payload.update(fields)
+        return {
+            "count": payload["count"],
+            "frameWidth": payload["frameWidth"],
+            "frameHeight": payload["frameHeight"],
+            "spines": payload["spines"],
+            "dedupe": payload["dedupe"],
+            "lookupStats": payload["lookupStats"],
+            "timingsMs": payload["timingsMs"],
+            **({"session": payload["session"]} if "session" in payload else {}),
+        }
+
+    def _requested_stream_format() -> str | None:
+        explicit = (request.args.get("stream") or "").strip().lower()
+        if explicit in {"ndjson", "sse"}:
+            return explicit
+        best = request.accept_mimetypes.best_match(
+            ["application/json", "application/x-ndjson", "text/event-stream"]
+        )
+        if best == "application/x-ndjson":
+            return "ndjson"
+        if best == "text/event-stream":
+            return "sse"
+        return None
+
+    def _start_capture_trace() -> tuple[Trace | NullTrace, bool]:
+        """(trace, include it in the response) for this request; `NULL_TRACE` unless requested or sampled."""
+        requested = (request.args.get("trace") or "").strip().lower() in {"1", "true", "yes"}
+        sampled = trace_exporter is not None and trace_sample_rate > 0 and random.random() < trace_sample_rate
+        if not (requested or sampled):
+            return NULL_TRACE, False
+        trace = Trace(
+            f"{request.method} {request.path}",
+            {"http.request.method": request.method, "http.route": request.path, "sampled": not requested},
+            traceparent=request.headers.get("traceparent"),
+        )
+        return trace, requested
+
+    def _finish_trace(trace: Trace | NullTrace) -> None:
+        trace.finish()
+        if trace_exporter is None or not trace.enabled:
+            return
+        try:
+            trace_exporter.export(trace)
+        except OSError:  # pragma: no cover - disk/runtime dependent
+            logger.exception("trace export failed")
+
+    def _start_capture_profile() -> tuple[ProfileSession | None, str | None]:
+        """(session, outcome) when this request asks to be profiled; (None, None) otherwise."""
+        flag = request.headers.get(PROFILE_HEADER, "").strip()
+        if profiler is None or not flag:
+            return None, None
+        return profiler.start(flag)
+
+    def _stream_capture(
+        events: Iterator[dict[str, Any]],
+        stream_format: str,
+        trace: Trace | NullTrace = NULL_TRACE,
+        include_trace: bool = False,
+        profile: ProfileSession | None = None,
+    ) -> Response:
+        def _encode(event: dict[str, Any]) -> str:
+            body = json_codec.dumps(event)
+            if stream_format == "sse":
+                return f"event: {event['type']}\ndata: {body}\n\n"
+            return body + "\n"
+
+        def _generate() -> Iterator[str]:
+            try:
+                for event in events:
+                    yield _encode(event)
+            except Exception as exc:  # pragma: no cover - model/runtime dependent
+                logger.exception("scan/capture stream failed")
+                yield _encode({"type": "error", "error": f"{type(exc).__name__}: {exc}"})
+            finally:
+                _finish_trace(trace)
+            if include_trace:
+                yield _encode({"type": "trace", **trace.to_tree()})
+            if profile is not None:
+                yield _encode({"type": "profile", **profile.finish()})
+
+        mimetype = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+        response = Response(_generate(), mimetype=mimetype)
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
+    @app.post("/scan/sessions")
+    def scan_session_create():
+        session = ShelfSession(hash_distance=session_hash_distance)
+        shelf_sessions.set(session.id, session)
+        return jsonify({"sessionId": session.id, "summaryUrl": f"/scan/sessions/{session.id}"}), 201
+
+    @app.get("/scan/sessions/<session_id>")
+    def scan_session_summary(session_id: str):
+        session = shelf_sessions.get(session_id)
+        if session is None:
+            return jsonify({"error": "session_not_found", "sessionId": session_id}), 404
+        return jsonify(session.summary())
+
+    @app.delete("/scan/sessions/<session_id>")
+    def scan_session_delete(session_id: str):
+        if shelf_sessions.pop(session_id) is None:
+            return jsonify({"error": "session_not_found", "sessionId": session_id}), 404
+        return "", 204
+
+    @app.post("/scan/capture")
+    def scan_capture():
+        image_bytes, error_response = _read_upload_bytes()
+        if image_bytes is None:
+            return error_response
+
+        session, error_response = _read_capture_session()
+        if error_response is not None:
+            return error_response
+
+        trace, include_trace = _start_capture_trace()
+        profile, profile_outcome = _start_capture_profile()
+        with profile.active() if profile is not None else nullcontext():
+            events, cache_hit, error_response = _capture_events(
+                image_bytes, {**_read_capture_params(), "session": session}, trace
+            )
+        if events is None:
+            _finish_trace(trace)
+            if profile is not None:
+                profile.finish()
+            return error_response
+        if trace.enabled:
+            trace.root.set(captureCache="hit" if cache_hit else "miss")
+        if profile is not None:
+            # Only pipeline work is profiled, not response encoding or the client's reads.
+            events = profile.wrap(events)
+
+        # Streaming mode emits detections first, then each spine as soon as it is resolved.
+        stream_format = _requested_stream_format()
+        if stream_format is not None:
+            response = _stream_capture(events, stream_format, trace, include_trace, profile)
+        else:
+            payload = _assemble_capture(events)
+            _finish_trace(trace)
+            if include_trace:
+                payload["trace"] = trace.to_tree()
+            if profile is not None:
+                payload["profile"] = profile.finish()
+            response = jsonify(payload)
+        response.headers["X-Capture-Cache"] = "hit" if cache_hit else "miss"
+        if trace.enabled:
+            response.headers["X-Trace-Id"] = trace.trace_id
+        if profile is not None:
+            response.headers["X-Profile-Id"] = profile.id
+        elif profile_outcome is not None:
+            response.headers["X-Profile-Skipped"] = profile_outcome
+        return response
+
+    def _run_capture_job(params: dict[str, Any], progress: Callable[..., None]) -> dict[str, Any]:
+        image_bytes = params.pop("image_bytes")
+        cache_key = params.pop("cache_key", None)
+        cached = capture_cache.get(cache_key) if capture_cache is not None and cache_key is not None else None
+        if cached is not None:
+            return _assemble_capture(iter(cached))
+        # Decoded on the worker so queued jobs hold compressed bytes, not full RGB frames.
+        image = _open_image(image_bytes)
+        return _assemble_capture(
+            _caching_capture_events(_iter_capture_events(image, on_progress=progress, **params), cache_key)
         )
 
+    job_manager = ScanJobManager(
+        runner=_run_capture_job,
+        max_workers=int(os.getenv("BOOKSHELF_SCAN_JOB_WORKERS", "1")),
+        max_queue=int(os.getenv("BOOKSHELF_SCAN_JOB_QUEUE", "16")),
+        ttl_seconds=float(os.getenv("BOOKSHELF_SCAN_JOB_TTL", "600")),
+        max_jobs=int(os.getenv("BOOKSHELF_SCAN_JOB_MAX", "256")),
+    )
+    app.extensions["scan_jobs"] = job_manager
+
+    @app.post("/scan/jobs")
+    def scan_job_submit():
+        image_bytes, error_response = _read_upload_bytes()
+        if image_bytes is None:
+            return error_response
+
+        session, error_response = _read_capture_session()
+        if error_response is not None:
+            return error_response
+        error_response = _check_upload_header(image_bytes)
+        if error_response is not None:
+            return error_response
+
+        options = _read_capture_params()
+        cacheable = capture_cache is not None and session is None
+        cache_key = _capture_cache_key(image_bytes, options) if cacheable else None
+        try:
+            job = job_manager.submit(
+                {"image_bytes": image_bytes, "cache_key": cache_key, "session": session, **options}
+            )
+        except JobQueueFull:
+            response = jsonify({"error": "queue_full", **job_manager.stats()})
+            response.headers["Retry-After"] = "2"
+            return response, 429
+
+        return (
+            jsonify(
+                {
+                    **job.to_dict(),
+                    "queueDepth": job_manager.stats()["queueDepth"],
+                    "statusUrl": f"/scan/jobs/{job.id}",
+                    "resultUrl": f"/scan/jobs/{job.id}/result",
+                }
+            ),
+            202,
+        )
+
+    @app.get("/scan/jobs")
+    def scan_job_stats():
+        return jsonify(job_manager.stats())
+
+    @app.get("/scan/jobs/<job_id>")
+    def scan_job_status(job_id: str):
+        job = job_manager.get(job_id)
+        if job is None:
+            return jsonify({"error": "job_not_found"}), 404
+        return jsonify(job.to_dict())
+
+    @app.get("/scan/jobs/<job_id>/result")
+    def scan_job_result(job_id: str):
+        job = job_manager.get(job_id)
+        if job is None:
+            return jsonify({"error": "job_not_found"}), 404
+        if job.status == "failed":
+            return jsonify({**job.to_dict(), "error": "job_failed", "message": job.error}), 500
+        if job.status != "succeeded":
+            return jsonify(job.to_dict()), 202
+        return jsonify({**job.to_dict(), "result": job.result})
+
     return app
 
 
@@ -445,12 +1489,21 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--iou-threshold", default=0.45, type=float)
     parser.add_argument("--device", default="auto")
     parser.add_argument("--classes", default=str(SpineDetector.BOOK_CLASS_ID))
+    parser.add_argument(
+        "--stub-models",
+        action="store_true",
+        help="Serve with latency-injecting stub models (BOOKSHELF_STUB_*) instead of loading weights.",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     logging.basicConfig(level=logging.INFO)
     args = parse_args()
+    if args.stub_models:
+        os.environ["BOOKSHELF_STUB_MODELS"] = "true"
+        create_app().run(host=args.host, port=args.port, debug=False)
+        return
 
     classes = [int(value.strip()) for value in args.classes.split(",") if value.strip()]
     detector_factory = build_detector_factory(
@@ -461,7 +1514,14 @@ def main() -> None:
         classes=classes or None,
     )
 
-    app = create_app(detector_factory=detector_factory)
+    model_version = os.getenv("BOOKSHELF_MODEL_VERSION") or describe_model_version(
+        model_path=args.model_path,
+        confidence=args.confidence,
+        iou_threshold=args.iou_threshold,
+        classes=classes or None,
+        extract_model=os.getenv("BOOKSHELF_EXTRACT_MODEL", "moondream-0.5b"),
+    )
+    app = create_app(detector_factory=detector_factory, model_version=model_version)
     app.run(host=args.host, port=args.port, debug=False)
 
 
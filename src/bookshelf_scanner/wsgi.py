@@ -0,0 +1,23 @@
+"""Production WSGI entry point that loads models before workers fork.
+
+Run with a pre-forking server so every worker shares the parent's model weights
+copy-on-write, e.g.::
+
+    gunicorn --preload -w 2 --threads 4 -b 0.0.0.0:5000 bookshelf_scanner.wsgi:app
+
+Each worker reports its pid and RSS/PSS under `GET /health`; PSS divides shared
+pages between workers, so summing it across workers gives the real footprint.
+"""
+
+from __future__ import annotations
+
+import gc
+
+from .web_api import _read_bool_env, create_app
+
+app = create_app(preload_models=_read_bool_env("BOOKSHELF_PRELOAD_MODELS", True))
+
+# Move everything allocated so far out of the collector's generations so the
+# first collections in each worker do not touch (and un-share) those pages.
+if _read_bool_env("BOOKSHELF_GC_FREEZE", True):
+    gc.freeze()
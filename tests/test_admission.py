@@ -0,0 +1,57 @@
+"""Tests for per-client preview admission control."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from bookshelf_scanner.admission import ADMITTED, DROPPED, REJECTED, SUPERSEDED, PreviewAdmission
+
+
+def _acquire_in_thread(admission: PreviewAdmission, client_id: str, outcomes: list[str]) -> threading.Thread:
+    thread = threading.Thread(target=lambda: outcomes.append(admission.acquire(client_id)))
+    thread.start()
+    return thread
+
+
+def _wait_for_waiter(admission: PreviewAdmission, client_id: str) -> None:
+    deadline = time.monotonic() + 2
+    while admission._clients[client_id].waiting is None and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_newer_frame_supersedes_waiting_frame_and_takes_the_slot():
+    admission = PreviewAdmission(max_in_flight=2, wait_timeout=5)
+    assert admission.acquire("phone") == ADMITTED
+
+    older: list[str] = []
+    newer: list[str] = []
+    older_thread = _acquire_in_thread(admission, "phone", older)
+    _wait_for_waiter(admission, "phone")
+    waiting = admission._clients["phone"].waiting
+    newer_thread = _acquire_in_thread(admission, "phone", newer)
+    older_thread.join(timeout=2)
+    deadline = time.monotonic() + 2
+    while admission._clients["phone"].waiting is waiting and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+    admission.release("phone")
+    newer_thread.join(timeout=2)
+    admission.release("phone")
+
+    assert older == [SUPERSEDED]
+    assert newer == [ADMITTED]
+    assert admission.in_flight == 0
+    assert admission.counts[SUPERSEDED] == 1
+
+
+def test_global_cap_rejects_and_stale_waiters_are_dropped():
+    admission = PreviewAdmission(max_in_flight=1, wait_timeout=0.01)
+    assert admission.acquire("a") == ADMITTED
+
+    assert admission.acquire("b") == REJECTED
+    assert admission.acquire("a") == DROPPED
+
+    admission.release("a")
+    assert admission.acquire("b") == ADMITTED
+    assert admission.stats()["inFlight"] == 1
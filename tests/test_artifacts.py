@@ -0,0 +1,72 @@
+"""Tests for the background debug artifact writer."""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+from bookshelf_scanner.artifacts import DebugArtifactWriter, annotate
+from bookshelf_scanner.schemas import DetectedSpine
+
+
+def _frame() -> tuple[Image.Image, list[DetectedSpine]]:
+    image = Image.new("RGB", (60, 40), color=(255, 255, 255))
+    spines = [
+        DetectedSpine(bbox=(0, 0, 20, 40), confidence=0.9, index=0),
+        DetectedSpine(bbox=(20, 0, 45, 40), confidence=0.8, index=1),
+    ]
+    return image, spines
+
+
+def test_annotate_draws_on_a_copy():
+    image, spines = _frame()
+
+    annotated = annotate(image, spines)
+
+    assert annotated is not image
+    assert image.getpixel((0, 0)) == (255, 255, 255)
+    assert annotated.getpixel((0, 0)) != (255, 255, 255)
+
+
+def test_writer_writes_annotated_frame_and_crops(tmp_path: Path):
+    image, spines = _frame()
+    timings: list[tuple[float, float]] = []
+
+    with DebugArtifactWriter(tmp_path, on_artifact=lambda encode, write: timings.append((encode, write))) as writer:
+        assert writer.submit("shelf", image, spines)
+
+    assert (tmp_path / "shelf_annotated.jpg").exists()
+    crops = sorted((tmp_path / "shelf_crops").glob("spine_*.jpg"))
+    assert [path.name for path in crops] == ["spine_00.jpg", "spine_01.jpg"]
+    with Image.open(crops[1]) as crop:
+        assert crop.size == (25, 40)
+    stats = writer.stats()
+    assert stats["written"] == 1 and stats["dropped"] == 0
+    assert len(timings) == 1 and all(value >= 0 for value in timings[0])
+
+
+def test_writer_drops_artifacts_instead_of_blocking_when_queue_is_full(tmp_path: Path):
+    image, spines = _frame()
+    release = threading.Event()
+    busy = threading.Event()
+
+    def _block(encode: float, write: float) -> None:
+        busy.set()
+        release.wait(5)
+
+    writer = DebugArtifactWriter(tmp_path, max_queue=1, on_artifact=_block)
+    assert writer.submit("first", image, spines)
+    assert busy.wait(5)
+    # The worker is stuck on "first": one more fits in the queue, the rest are dropped immediately.
+    assert writer.submit("second", image, spines)
+    assert not writer.submit("third", image, spines)
+    assert not writer.submit("fourth", image, spines)
+    release.set()
+    writer.close()
+
+    stats = writer.stats()
+    assert stats["written"] == 2
+    assert stats["dropped"] == 2
+    assert not (tmp_path / "third_annotated.jpg").exists()
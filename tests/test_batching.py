@@ -0,0 +1,54 @@
+"""Tests for the detection micro-batcher."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+from PIL import Image
+
+from bookshelf_scanner.batching import DetectionBatcher
+
+
+def test_concurrent_frames_share_one_batched_call():
+    calls: list[int] = []
+    observed: list[int] = []
+
+    def _runner(images, min_area, max_detections):
+        calls.append(len(images))
+        return [([image], [image.width]) for image in images]
+
+    batcher = DetectionBatcher(
+        _runner,
+        max_batch_size=4,
+        max_wait_ms=200,
+        on_batch=lambda size, waits, run_s: observed.append(size),
+    )
+    results: dict[int, tuple] = {}
+    barrier = threading.Barrier(4)
+
+    def _submit(width: int) -> None:
+        barrier.wait()
+        results[width] = batcher.detect(Image.new("RGB", (width, 10)), min_area=0, max_detections=5)
+
+    threads = [threading.Thread(target=_submit, args=(width,)) for width in (10, 11, 12, 13)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    batcher.shutdown()
+
+    assert calls == [4]
+    assert observed == [4]
+    assert {width: result[1] for width, result in results.items()} == {10: [10], 11: [11], 12: [12], 13: [13]}
+
+
+def test_runner_errors_reach_every_waiting_frame():
+    def _runner(images, min_area, max_detections):
+        raise RuntimeError("model crashed")
+
+    batcher = DetectionBatcher(_runner, max_batch_size=2, max_wait_ms=0)
+
+    with pytest.raises(RuntimeError, match="model crashed"):
+        batcher.detect(Image.new("RGB", (4, 4)), min_area=0, max_detections=5)
+    batcher.shutdown()
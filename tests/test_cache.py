@@ -0,0 +1,48 @@
+"""Tests for the bounded LRU/TTL cache."""
+
+from __future__ import annotations
+
+import pytest
+
+from bookshelf_scanner.cache import BoundedCache
+
+
+def test_bounded_cache_evicts_least_recently_used():
+    cache = BoundedCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.hits == 3
+
+
+def test_bounded_cache_expires_entries_after_ttl(monkeypatch: pytest.MonkeyPatch):
+    now = {"t": 100.0}
+    monkeypatch.setattr("bookshelf_scanner.cache.time.monotonic", lambda: now["t"])
+    cache = BoundedCache(max_entries=4, ttl_seconds=5)
+    cache.set("key", "value")
+
+    now["t"] += 4
+    assert cache.get("key") == "value"
+    now["t"] += 2
+    assert cache.get("key", "expired") == "expired"
+    assert len(cache) == 0
+
+
+def test_bounded_cache_evicts_to_fit_byte_budget():
+    cache = BoundedCache(max_entries=10, max_bytes=100)
+    cache.set("a", "first", size=60)
+    cache.set("b", "second", size=30)
+    cache.set("c", "third", size=40)
+    cache.set("huge", "skipped", size=101)
+
+    assert "a" not in cache
+    assert cache.get("b") == "second"
+    assert cache.get("c") == "third"
+    assert "huge" not in cache
+    assert cache.total_bytes == 70
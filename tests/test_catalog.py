@@ -0,0 +1,65 @@
+"""Tests for the local fuzzy catalog index."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from bookshelf_scanner.catalog import CatalogIndex, normalize_isbn, normalize_text
+
+
+def _write_goodreads_export(path: Path) -> None:
+    path.write_text(
+        "Book Id,Title,Author,Additional Authors,ISBN,ISBN13,Publisher,Year Published,Original Publication Year\n"
+        '4406,East of Eden,John Steinbeck,,"=""0142000655""","=""9780142000656""",Penguin Books,2002,1952\n'
+        "213,Nexus: A Brief History of Information Networks,Yuval Noah  Harari,,,,Random House,2024,\n",
+        encoding="utf-8",
+    )
+
+
+def test_normalize_helpers_strip_quoting_and_accents():
+    assert normalize_isbn('="9780142000656"') == "9780142000656"
+    assert normalize_text("  Gödel, Escher,  Bach! ") == "godel escher bach"
+
+
+def test_match_goodreads_row_by_main_title_despite_author_ocr_noise(tmp_path: Path):
+    export = tmp_path / "goodreads.csv"
+    _write_goodreads_export(export)
+    catalog = CatalogIndex()
+
+    assert catalog.load_path(export) == 2
+    match = catalog.match("Nexus", "Yuvraj Noah Harari")
+
+    assert match is not None
+    assert match.source == "goodreads"
+    assert match.item["id"] == "goodreads:213"
+    assert match.item["volumeInfo"]["authors"] == ["Yuval Noah Harari"]
+
+
+def test_match_rejects_weak_candidates(tmp_path: Path):
+    export = tmp_path / "goodreads.csv"
+    _write_goodreads_export(export)
+    catalog = CatalogIndex()
+    catalog.load_goodreads_csv(export)
+
+    assert catalog.match("East") is None
+    assert catalog.match("The Grapes of Wrath", "John Steinbeck") is None
+
+
+def test_load_lookup_csv_indexes_raw_items_once(tmp_path: Path):
+    lookup_csv = tmp_path / "lookup_outputs.csv"
+    item = {"id": "dune-id", "volumeInfo": {"title": "Dune", "authors": ["Frank Herbert"]}}
+    raw = json.dumps(item).replace('"', '""')
+    lookup_csv.write_text(
+        "input_title,match_found,raw_item_json\n"
+        f'Dune,true,"{raw}"\n'
+        f'Dune,true,"{raw}"\n'
+        "Hyperion,false,\n",
+        encoding="utf-8",
+    )
+    catalog = CatalogIndex()
+
+    assert catalog.load_path(lookup_csv) == 1
+    match = catalog.match("Dune", "F. Herbert")
+    assert match is not None
+    assert match.item["id"] == "dune-id"
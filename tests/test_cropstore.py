@@ -0,0 +1,68 @@
+"""Tests for the packed crop store."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from PIL import Image
+
+from bookshelf_scanner.cropstore import CropStore, CropStoreWriter, is_crop_store, pack_crop_directories
+
+
+def _crop(shade: int, width: int = 12, height: int = 40) -> Image.Image:
+    return Image.new("RGB", (width, height), color=(shade, shade, shade))
+
+
+def test_writer_appends_crops_and_store_reads_them_back(tmp_path: Path):
+    with CropStoreWriter(tmp_path / "crops") as writer:
+        first = writer.add("shelf-a", 0, _crop(10), bbox=(0, 0, 12, 40))
+        second = writer.add("shelf-a", 1, _crop(200, width=20), bbox=(12, 0, 32, 40))
+        writer.add("shelf-b", 0, _crop(90))
+
+    assert second.offset == first.offset + first.length
+    assert is_crop_store(tmp_path / "crops")
+    with CropStore(tmp_path / "crops") as store:
+        assert len(store) == 3
+        assert store.capture_ids() == ["shelf-a", "shelf-b"]
+        records = store.records(capture_id="shelf-a")
+        assert [record.bbox for record in records] == [(0, 0, 12, 40), (12, 0, 32, 40)]
+        image = store.open_image(records[1])
+        assert image.size == (20, 40)
+        assert image.getpixel((5, 5))[0] > 150
+        assert records[1].name == "shelf-a_crops/spine_01.jpg"
+
+
+def test_writer_rolls_segments_and_reader_remaps_growing_segments(tmp_path: Path):
+    writer = CropStoreWriter(tmp_path, max_segment_bytes=1)
+    writer.add("one", 0, b"first")
+    writer.add("one", 1, b"second")
+
+    store = CropStore(tmp_path)
+    assert len({record.segment for record in store}) == 2
+    assert store.read_bytes(store.records()[1]) == b"second"
+
+    # A reader opened mid-run can still slice crops appended to a segment it already mapped.
+    growing = CropStoreWriter(tmp_path / "growing")
+    growing.add("two", 0, b"abc")
+    reader = CropStore(tmp_path / "growing")
+    reader.read_bytes(reader.records()[0])
+    growing.add("two", 1, b"defgh")
+    reader = CropStore(tmp_path / "growing")
+    assert reader.read_bytes(reader.records()[1]) == b"defgh"
+    for handle in (writer, growing):
+        handle.close()
+    store.close()
+    reader.close()
+
+
+def test_pack_crop_directories_converts_old_layout(tmp_path: Path):
+    crops_dir = tmp_path / "detections" / "IMG_1_crops"
+    crops_dir.mkdir(parents=True)
+    for index in range(3):
+        _crop(index * 60).save(crops_dir / f"spine_{index:02d}.jpg")
+
+    assert pack_crop_directories(tmp_path / "detections", tmp_path / "store") == 3
+
+    with CropStore(tmp_path / "store") as store:
+        assert [(record.capture_id, record.spine_index) for record in store] == [("IMG_1", 0), ("IMG_1", 1), ("IMG_1", 2)]
+        assert store.read_bytes(store.records()[2]) == (crops_dir / "spine_02.jpg").read_bytes()
@@ -0,0 +1,68 @@
+"""Tests for pre-extraction box merging and crop hashing."""
+
+from __future__ import annotations
+
+from PIL import Image, ImageDraw
+
+from bookshelf_scanner.dedupe import box_overlap, dedupe_spines, difference_hash
+from bookshelf_scanner.schemas import DetectedSpine
+
+
+def _striped_spine(offset: int, size: tuple[int, int] = (40, 200)) -> Image.Image:
+    image = Image.new("RGB", size, color="white")
+    draw = ImageDraw.Draw(image)
+    for y in range(offset, size[1], 30):
+        draw.rectangle((0, y, size[0], y + 12), fill=(20, 20, 120))
+    return image
+
+
+def test_box_overlap_reports_iou_and_containment():
+    iou, containment = box_overlap((0, 0, 100, 100), (10, 10, 60, 60))
+    assert round(iou, 2) == 0.25
+    assert containment == 1.0
+    assert box_overlap((0, 0, 10, 10), (20, 20, 30, 30)) == (0.0, 0.0)
+
+
+def test_dedupe_merges_contained_boxes_and_identical_crops():
+    crops = [_striped_spine(0), _striped_spine(0), _striped_spine(0), _striped_spine(15)]
+    spines = [
+        DetectedSpine(bbox=(0, 0, 40, 200), confidence=0.9, index=0),
+        DetectedSpine(bbox=(5, 20, 35, 180), confidence=0.8, index=1),
+        DetectedSpine(bbox=(20, 0, 60, 200), confidence=0.9, index=2),
+        DetectedSpine(bbox=(100, 0, 140, 200), confidence=0.9, index=3),
+    ]
+
+    kept_crops, kept_spines, stats = dedupe_spines(crops, spines)
+
+    assert [spine.index for spine in kept_spines] == [0, 3]
+    assert len(kept_crops) == 2
+    assert stats == {"mergedBoxes": 1, "duplicateCrops": 1}
+
+
+def test_dedupe_never_hash_matches_plain_spines():
+    crops = [Image.new("RGB", (40, 200), "black"), Image.new("RGB", (40, 200), "black")]
+    spines = [
+        DetectedSpine(bbox=(0, 0, 40, 200), confidence=0.9, index=0),
+        DetectedSpine(bbox=(50, 0, 90, 200), confidence=0.9, index=1),
+    ]
+
+    _, kept_spines, stats = dedupe_spines(crops, spines)
+
+    assert len(kept_spines) == 2
+    assert stats["duplicateCrops"] == 0
+    assert difference_hash(_striped_spine(0)) != difference_hash(_striped_spine(15))
+
+
+def test_dedupe_keeps_similar_spines_of_neighbouring_books():
+    # One series design: every volume's spine hashes within a bit or two of the others.
+    crops = [_striped_spine(0), _striped_spine(0), _striped_spine(1)]
+    spines = [
+        DetectedSpine(bbox=(0, 0, 40, 200), confidence=0.9, index=0),
+        DetectedSpine(bbox=(38, 0, 78, 200), confidence=0.9, index=1),
+        DetectedSpine(bbox=(78, 0, 118, 200), confidence=0.9, index=2),
+    ]
+
+    _, kept_spines, stats = dedupe_spines(crops, spines)
+
+    assert [spine.index for spine in kept_spines] == [0, 1, 2]
+    assert stats == {"mergedBoxes": 0, "duplicateCrops": 0}
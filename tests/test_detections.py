@@ -0,0 +1,88 @@
+"""Tests for columnar detection results."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import torch
+from PIL import Image
+from ultralytics.engine.results import Boxes
+
+from bookshelf_scanner.detections import SpineDetections
+from bookshelf_scanner.detector import SpineDetector
+from bookshelf_scanner.schemas import DetectedSpine
+
+
+def _reference_order(detections: list[DetectedSpine]) -> list[DetectedSpine]:
+    """The original per-object reading-order sort, kept as the behavioral reference."""
+    detections = sorted(detections, key=lambda d: d.bbox[0])
+    rows: list[list[DetectedSpine]] = []
+    for det in detections:
+        center = (det.bbox[1] + det.bbox[3]) / 2
+        for row in rows:
+            if min(d.bbox[1] for d in row) <= center <= max(d.bbox[3] for d in row):
+                row.append(det)
+                break
+        else:
+            rows.append([det])
+    rows.sort(key=lambda row: min(d.bbox[1] for d in row))
+    for row in rows:
+        row.sort(key=lambda d: d.bbox[0])
+    return [det for row in rows for det in row]
+
+
+def _random_shelf(seed: int, count: int) -> list[DetectedSpine]:
+    rng = random.Random(seed)
+    spines = []
+    for index in range(count):
+        shelf = rng.randrange(3)
+        x1 = rng.randrange(0, 1500)
+        y1 = shelf * 400 + rng.randrange(-30, 30)
+        spines.append(
+            DetectedSpine(
+                bbox=(x1, max(0, y1), x1 + rng.randrange(10, 80), max(0, y1) + rng.randrange(150, 380)),
+                confidence=rng.random(),
+                index=index,
+            )
+        )
+    return spines
+
+
+def test_reading_order_matches_reference_sort():
+    for seed in range(25):
+        spines = _random_shelf(seed, 60)
+        expected = [spine.index for spine in _reference_order(spines)]
+        assert [spine.index for spine in SpineDetector._sort_reading_order(spines)] == expected
+
+
+def test_from_boxes_filters_orders_and_materializes_spines():
+    data = torch.tensor(
+        [
+            [100.7, 0.0, 150.2, 50.0, 0.9, 73.0],
+            [10.0, 0.0, 60.0, 50.0, 0.8, 73.0],
+            [10.0, 100.0, 12.0, 101.0, 0.7, 73.0],
+            [12.0, 110.0, 70.0, 160.0, 0.6, 73.0],
+        ]
+    )
+    boxes = Boxes(data, orig_shape=(200, 200))
+
+    detections = SpineDetector._select(type("Result", (), {"boxes": boxes})(), min_area=100, max_detections=10)
+
+    assert detections.boxes.tolist() == [[10, 0, 60, 50], [100, 0, 150, 50], [12, 110, 70, 160]]
+    assert detections.indices.tolist() == [0, 1, 2]
+    spines = detections.to_spines()
+    assert isinstance(spines[0], DetectedSpine)
+    assert spines[1].bbox == (100, 0, 150, 50)
+    assert spines[1].confidence == float(np.float32(0.9))
+    assert spines[2].area == 58 * 50
+    crops = detections.crops(Image.new("RGB", (200, 200)))
+    assert [crop.size for crop in crops] == [(50, 50), (50, 50), (58, 50)]
+    assert detections.head(1).rows() == [(10, 0, 60, 50, float(np.float32(0.8)))]
+
+
+def test_empty_detections():
+    empty = SpineDetections.from_boxes(Boxes(torch.zeros((0, 6)), orig_shape=(10, 10)))
+    assert len(empty) == 0
+    assert len(empty.filter_min_area(10).sorted()) == 0
+    assert empty.to_spines() == []
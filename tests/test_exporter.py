@@ -0,0 +1,114 @@
+"""Tests for the streaming Goodreads/StoryGraph exporter."""
+
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from bookshelf_scanner.exporter import GOODREADS_COLUMNS, BookExporter, book_from_volume, book_keys, isbn13
+
+
+def _volume(title: str, author: str, isbn_13: str | None = None, isbn_10: str | None = None) -> dict:
+    identifiers = []
+    if isbn_13:
+        identifiers.append({"type": "ISBN_13", "identifier": isbn_13})
+    if isbn_10:
+        identifiers.append({"type": "ISBN_10", "identifier": isbn_10})
+    return {"id": f"gb-{title}", "volumeInfo": {"title": title, "authors": [author], "industryIdentifiers": identifiers}}
+
+
+def _write_library(path: Path) -> None:
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=GOODREADS_COLUMNS)
+        writer.writeheader()
+        writer.writerow(
+            {
+                "Book Id": "24724602",
+                "Title": "Flash Boys: A Wall Street Revolt",
+                "Author": "Michael   Lewis",
+                "ISBN": '="0393351599"',
+                "ISBN13": '="9780393351590"',
+                "Exclusive Shelf": "to-read",
+            }
+        )
+        writer.writerow(
+            {"Book Id": "234225", "Title": "Dune (Dune, #1)", "Author": "Frank Herbert", "ISBN": '=""', "ISBN13": '=""'}
+        )
+
+
+def _read_rows(path: Path) -> list[dict[str, str]]:
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_isbn13_handles_goodreads_quoting_and_isbn10():
+    assert isbn13('="9780393351590"') == "9780393351590"
+    assert isbn13("0393351599") == "9780393351590"
+    assert isbn13('=""') == ""
+
+
+def test_book_from_volume_uses_goodreads_columns():
+    book = book_from_volume(_volume("Hamlet", "William Shakespeare", isbn_13="9780143128540"), date_added="2026/01/02")
+
+    assert set(book) == set(GOODREADS_COLUMNS)
+    assert book["Author l-f"] == "Shakespeare, William"
+    assert book["ISBN13"] == '="9780143128540"'
+    assert book["Exclusive Shelf"] == "to-read"
+    assert book["Date Added"] == "2026/01/02"
+    assert book_keys(book)[0] == "isbn:9780143128540"
+
+
+def test_exporter_writes_only_books_missing_from_existing_export(tmp_path: Path):
+    library = tmp_path / "goodreads_library_export.csv"
+    _write_library(library)
+    output = tmp_path / "import.csv"
+
+    with BookExporter(output, existing=library) as exporter:
+        # Same ISBN as an ISBN-10, same title/author with a series suffix, then a genuinely new book.
+        assert not exporter.add_volume(_volume("Flash Boys", "Michael Lewis", isbn_10="0393351599"))
+        assert not exporter.add_volume(_volume("Dune", "Frank Herbert", isbn_13="9780441013593"))
+        assert exporter.add_volume(_volume("Hamlet", "William Shakespeare", isbn_13="9780143128540"))
+        # A spine seen twice in one scan is exported once.
+        assert not exporter.add_volume(_volume("Hamlet", "W. Shakespeare", isbn_13="9780143128540"))
+
+    rows = _read_rows(output)
+    assert [row["Title"] for row in rows] == ["Hamlet"]
+    assert exporter.written == 1
+    assert exporter.skipped == 3
+
+
+def test_exporter_merge_copies_existing_rows_then_new_books(tmp_path: Path):
+    library = tmp_path / "library.csv"
+    _write_library(library)
+    output = tmp_path / "merged.csv"
+
+    with BookExporter(output, existing=library, merge=True) as exporter:
+        exporter.add_volume(_volume("Hamlet", "William Shakespeare"))
+
+    rows = _read_rows(output)
+    assert [row["Title"] for row in rows] == ["Flash Boys: A Wall Street Revolt", "Dune (Dune, #1)", "Hamlet"]
+    assert rows[0]["ISBN13"] == '="9780393351590"'
+    assert exporter.copied == 2
+    with pytest.raises(ValueError):
+        BookExporter(library, existing=library, merge=True)
+
+
+def test_exporter_reads_lookup_rows_and_skips_placeholders(tmp_path: Path):
+    output = tmp_path / "import.csv"
+    rows = [
+        {"input_title": "Hamlet", "result_index": "0", "raw_item_json": json.dumps(_volume("Hamlet", "William Shakespeare"))},
+        {"input_title": "Hamlet", "result_index": "1", "raw_item_json": json.dumps(_volume("Hamlet Notes", "Anon"))},
+        {"input_title": "Unknown Zine", "input_author": "A. Writer", "result_index": "", "raw_item_json": ""},
+        {"input_title": "[Extraction Failed]", "result_index": "", "raw_item_json": ""},
+    ]
+
+    with BookExporter(output) as exporter:
+        assert exporter.add_lookup_rows(rows) == 2
+
+    assert [row["Title"] for row in _read_rows(output)] == ["Hamlet", "Unknown Zine"]
+
+    with BookExporter(tmp_path / "matched_only.csv", include_unmatched=False) as exporter:
+        assert exporter.add_lookup_rows(rows) == 1
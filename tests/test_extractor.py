@@ -4,7 +4,9 @@ from pathlib import Path
 
 from PIL import Image
 
+from bookshelf_scanner.cropstore import CropStoreWriter
 from bookshelf_scanner.extractor import BookExtractor
+from bookshelf_scanner.schemas import SpineExtraction
 
 
 class FakeBackend:
@@ -50,6 +52,18 @@ def test_extract_falls_back_to_first_line():
     assert result.author is None
 
 
+def test_placeholder_extractions_match_validated_models():
+    extractor = BookExtractor(backend=FakeBackend("   "))
+
+    result = extractor.extract(_blank_spine())
+
+    assert result == SpineExtraction(title="[No Text Detected]", raw_response="", confidence=0.0)
+    assert result.model_dump() == {"title": "[No Text Detected]", "author": None, "confidence": 0.0, "raw_response": ""}
+    assert SpineExtraction.trusted("Dune", "Frank Herbert", 0.5) == SpineExtraction(
+        title="Dune", author="Frank Herbert", confidence=0.5
+    )
+
+
 def test_extract_from_paths_returns_indexed_results(tmp_path: Path):
     image_paths = []
     for i in range(2):
@@ -66,3 +80,20 @@ def test_extract_from_paths_returns_indexed_results(tmp_path: Path):
     assert results[1].spine_index == 1
     assert results[0].image_path == image_paths[0]
     assert results[0].extraction.title == "Snow Crash"
+
+
+def test_extract_from_paths_reads_crop_store_directly(tmp_path: Path):
+    store_path = tmp_path / "crops"
+    with CropStoreWriter(store_path) as writer:
+        writer.add("shelf", 0, _blank_spine())
+        writer.add("shelf", 1, _blank_spine())
+    single = tmp_path / "single.jpg"
+    _blank_spine().save(single)
+    extractor = BookExtractor(backend=FakeBackend('{"title":"Dune","author":"Frank Herbert"}'))
+
+    results = extractor.extract_from_paths([store_path, single])
+
+    assert [row.spine_index for row in results] == [0, 1, 2]
+    assert results[1].image_path == store_path / "shelf_crops" / "spine_01.jpg"
+    assert results[2].image_path == single
+    assert all(row.extraction.title == "Dune" for row in results)
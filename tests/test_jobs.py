@@ -0,0 +1,71 @@
+"""Tests for the bounded scan job manager."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from bookshelf_scanner.jobs import JobQueueFull, ScanJobManager
+
+
+def _wait_finished(manager: ScanJobManager, job_id: str, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job is not None and job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish in time")
+
+
+def test_job_reports_progress_and_result():
+    def runner(params, progress):
+        progress(stage="extract_lookup", spinesDetected=2, spinesProcessed=2)
+        return {"count": params["value"]}
+
+    manager = ScanJobManager(runner=runner)
+    job = manager.submit({"value": 3})
+    finished = _wait_finished(manager, job.id)
+
+    assert finished.status == "succeeded"
+    assert finished.result == {"count": 3}
+    assert finished.progress == {"stage": "done", "spinesDetected": 2, "spinesProcessed": 2}
+    assert finished.params is None
+    manager.shutdown()
+
+
+def test_submit_rejects_when_queue_is_full_and_failures_are_recorded():
+    release = threading.Event()
+
+    def runner(params, progress):
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    manager = ScanJobManager(runner=runner, max_workers=1, max_queue=1)
+    running = manager.submit({})
+    deadline = time.monotonic() + 5
+    while manager.stats()["running"] != 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    queued = manager.submit({})
+
+    with pytest.raises(JobQueueFull):
+        manager.submit({})
+    assert manager.stats()["queueDepth"] == 1
+
+    release.set()
+    assert _wait_finished(manager, running.id).error == "RuntimeError: boom"
+    assert _wait_finished(manager, queued.id).status == "failed"
+    manager.shutdown()
+
+
+def test_finished_jobs_are_evicted_after_ttl():
+    manager = ScanJobManager(runner=lambda params, progress: {}, ttl_seconds=0.0)
+    job = manager.submit({})
+    deadline = time.monotonic() + 5
+    while manager.get(job.id) is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert manager.get(job.id) is None
+    manager.shutdown()
@@ -0,0 +1,37 @@
+"""Tests for the pluggable JSON codec."""
+
+from __future__ import annotations
+
+import pytest
+
+from bookshelf_scanner.jsonutil import JSONCodec, get_codec, orjson_available
+
+_CODECS = ["json"] + (["orjson"] if orjson_available() else [])
+
+
+@pytest.mark.parametrize("backend", _CODECS)
+def test_codec_writes_compact_utf8_and_round_trips(backend: str):
+    codec = get_codec(backend)
+    payload = {"title": "Cien años de soledad", "authors": ["Gabriel García Márquez"], "rating": 4.5, "n": None}
+
+    text = codec.dumps(payload)
+
+    assert text == '{"title":"Cien años de soledad","authors":["Gabriel García Márquez"],"rating":4.5,"n":null}'
+    assert codec.dumps_bytes(payload) == text.encode("utf-8")
+    assert codec.loads(text) == payload
+    assert codec.loads(text.encode("utf-8")) == payload
+
+
+@pytest.mark.parametrize("backend", _CODECS)
+def test_codec_falls_back_for_payloads_orjson_rejects(backend: str):
+    codec = get_codec(backend)
+
+    assert codec.dumps({1: "one"}) == '{"1":"one"}'
+    assert codec.dumps({"big": 2**70}) == f'{{"big":{2**70}}}'
+
+
+def test_get_codec_validates_backend_name():
+    assert type(get_codec("json")) is JSONCodec
+    assert get_codec("auto").name == ("orjson" if orjson_available() else "json")
+    with pytest.raises(ValueError):
+        get_codec("simplejson")
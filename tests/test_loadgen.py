@@ -0,0 +1,74 @@
+"""Tests for the web API load generator."""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+from PIL import Image
+from werkzeug.serving import make_server
+
+from bookshelf_scanner.loadgen import LoadGenerator, RequestResult, load_photos, percentile, summarize
+from bookshelf_scanner.stubs import stub_factories
+from bookshelf_scanner.web_api import create_app
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_summarize_reports_error_rate_and_server_timings():
+    results = [
+        RequestResult("capture", 200, 100.0, {"total": 80.0}, cache="miss"),
+        RequestResult("capture", 200, 300.0, {"total": 240.0}, cache="hit"),
+        RequestResult("capture", 503, 10.0),
+        RequestResult("capture", 0, 5000.0, error="ReadTimeout"),
+    ]
+
+    summary = summarize(results, wall_seconds=2.0)["endpoints"]["capture"]
+
+    assert summary["requests"] == 4
+    assert summary["ok"] == 2
+    assert summary["errorRate"] == 0.5
+    assert summary["errors"] == {"503": 1, "ReadTimeout": 1}
+    assert summary["throughputPerSecond"] == 1.0
+    assert summary["latencyMs"]["p50"] == 100.0
+    assert summary["latencyMs"]["max"] == 300.0
+    assert summary["serverTimingsMs"]["total"]["mean"] == 160.0
+    assert summary["captureCache"] == {"miss": 1, "hit": 1}
+
+
+def test_load_generator_drives_both_endpoints_on_stub_server(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("BOOKSHELF_DETECT_BATCH_SIZE", "1")
+    for index in range(2):
+        Image.new("RGB", (80, 60), color=(index * 90, 40, 200)).save(tmp_path / f"shelf_{index}.jpg")
+    app = create_app(**stub_factories(spines_per_row=2, rows=1), model_version="stub")
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        generator = LoadGenerator(
+            f"http://127.0.0.1:{server.server_port}",
+            load_photos(tmp_path),
+            endpoints=["detect", "capture"],
+            concurrency=2,
+            total=6,
+            form={"minArea": "0"},
+        )
+        results = generator.run()
+    finally:
+        server.shutdown()
+        thread.join(timeout=5)
+
+    summary = summarize(results, generator.wall_seconds)["endpoints"]
+    assert summary["detect"]["ok"] == 3
+    assert summary["capture"]["ok"] == 3
+    assert "inference" in summary["detect"]["serverTimingsMs"]
+    assert {"detect", "extract", "lookup", "total"} <= set(summary["capture"]["serverTimingsMs"])
+    # Each upload is made unique, so repeated photos never hit the capture cache.
+    assert summary["capture"]["captureCache"] == {"miss": 3}
@@ -4,10 +4,12 @@ from __future__ import annotations
 
 import csv
 import os
+import time
 from pathlib import Path
 
 import pytest
 
+from bookshelf_scanner.catalog import CatalogIndex
 from bookshelf_scanner.lookup import (
     GoogleBooksClient,
     _load_env_file,
@@ -133,3 +135,142 @@ def test_write_output_csv_handles_empty_rows(tmp_path: Path):
     with out_csv.open("r", encoding="utf-8", newline="") as handle:
         rows = list(csv.reader(handle))
     assert rows[0][0] == "input_spine_index"
+
+
+def test_lookup_rows_uses_catalog_match_before_api(monkeypatch: pytest.MonkeyPatch):
+    rows = [
+        {"spine_index": "0", "image_path": "a.jpg", "title": "Dune", "author": "Frank Herbert"},
+        {"spine_index": "1", "image_path": "b.jpg", "title": "Hyperion", "author": "Dan Simmons"},
+    ]
+    catalog = CatalogIndex()
+    catalog.add_volume({"id": "dune-id", "volumeInfo": {"title": "Dune", "authors": ["Frank Herbert"]}})
+    client = GoogleBooksClient(api_key="abc")
+    queries: list[str] = []
+
+    def fake_get(url: str, params: dict, timeout: int):
+        queries.append(params["q"])
+        return _FakeResponse({"totalItems": 0, "items": []})
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+    stats: dict[str, int] = {}
+    out = _lookup_rows(rows, client, catalog=catalog, stats=stats)
+
+    assert out[0]["match_source"] == "catalog"
+    assert out[0]["item.id"] == "dune-id"
+    assert out[0]["query"] == ""
+    assert out[1]["match_found"] == "false"
+    assert out[1]["query"]
+    assert all("Dune" not in query for query in queries)
+    assert stats == {"local": 1, "remote": 1}
+
+
+def test_lookup_falls_back_to_title_query_and_caches_step(monkeypatch: pytest.MonkeyPatch):
+    client = GoogleBooksClient(api_key="abc")
+    queries: list[str] = []
+
+    def fake_get(url: str, params: dict, timeout: int):
+        queries.append(params["q"])
+        if "inauthor" in params["q"]:
+            return _FakeResponse({"totalItems": 0, "items": []})
+        return _FakeResponse(
+            {
+                "totalItems": 1,
+                "items": [{"id": "nexus-id", "volumeInfo": {"title": "Nexus", "authors": ["Yuval Noah Harari"]}}],
+            }
+        )
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+
+    payload = client.lookup("Nexus", "Yuvraj Noah Harari")
+    assert payload["queryStep"] == "title"
+    assert payload["items"][0]["id"] == "nexus-id"
+    assert queries == ['intitle:"Nexus" inauthor:"Yuvraj Noah Harari"', 'intitle:"Nexus"']
+
+    queries.clear()
+    repeat = client.lookup("  nexus ", "Yuvraj Noah Harari")
+    assert repeat["queryStep"] == "title"
+    assert queries == ['intitle:"nexus"']
+
+
+def test_lookup_negatively_caches_keys_without_matches(monkeypatch: pytest.MonkeyPatch):
+    client = GoogleBooksClient(api_key="abc")
+    queries: list[str] = []
+
+    def fake_get(url: str, params: dict, timeout: int):
+        queries.append(params["q"])
+        return _FakeResponse({"totalItems": 0, "items": []})
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+
+    first = client.lookup("Unreadable Spine", "Nobody")
+    assert first["items"] == []
+    assert [q.startswith("intitle") for q in queries] == [True, True, False]
+
+    queries.clear()
+    second = client.lookup("Unreadable Spine", "Nobody")
+    assert second["items"] == []
+    assert second["queryStep"] is None
+    assert queries == []
+
+
+def test_lookup_negative_cache_expires(monkeypatch: pytest.MonkeyPatch):
+    client = GoogleBooksClient(api_key="abc", no_match_ttl=0.01, search_cache_ttl=0.01)
+    answers = [{"totalItems": 0, "items": []}] * 3 + [
+        {"totalItems": 1, "items": [{"id": "new-id", "volumeInfo": {"title": "New Book", "authors": ["A. Writer"]}}]}
+    ]
+    queries: list[str] = []
+
+    def fake_get(url: str, params: dict, timeout: int):
+        queries.append(params["q"])
+        return _FakeResponse(answers[min(len(queries), len(answers)) - 1])
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+
+    assert client.lookup("New Book", "A. Writer")["items"] == []
+    time.sleep(0.02)
+    # The volume appears later; an expired negative entry lets the next lookup find it.
+    assert client.lookup("New Book", "A. Writer")["items"][0]["id"] == "new-id"
+
+
+def test_lookup_falls_through_ladder_when_cached_step_stops_answering(monkeypatch: pytest.MonkeyPatch):
+    client = GoogleBooksClient(api_key="abc", search_cache_ttl=0.01)
+    title_answers = True
+    queries: list[str] = []
+    item = {"id": "nexus-id", "volumeInfo": {"title": "Nexus", "authors": ["Yuval Noah Harari"]}}
+
+    def fake_get(url: str, params: dict, timeout: int):
+        queries.append(params["q"])
+        if params["q"] == 'intitle:"Nexus"' and title_answers:
+            return _FakeResponse({"totalItems": 1, "items": [item]})
+        if params["q"] == "Nexus Somebody Else" and not title_answers:
+            return _FakeResponse({"totalItems": 1, "items": [item]})
+        return _FakeResponse({"totalItems": 0, "items": []})
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+    assert client.lookup("Nexus", "Somebody Else")["queryStep"] == "title"
+
+    title_answers = False
+    time.sleep(0.02)
+    queries.clear()
+    payload = client.lookup("Nexus", "Somebody Else")
+
+    assert payload["items"][0]["id"] == "nexus-id"
+    assert queries[0] == 'intitle:"Nexus"'
+    assert payload["queryStep"] == "keywords"
+
+
+def test_search_reuses_cached_response_for_same_query(monkeypatch: pytest.MonkeyPatch):
+    client = GoogleBooksClient(api_key="abc")
+    calls: list[tuple[str, int]] = []
+
+    def fake_get(url: str, params: dict, timeout: int):
+        calls.append((params["q"], params["maxResults"]))
+        return _FakeResponse({"totalItems": 1, "items": [{"id": "x"}]})
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+
+    client.search("dune", max_results=5)
+    client.search(" dune ", max_results=5)
+    client.search("dune", max_results=10)
+
+    assert calls == [("dune", 5), ("dune", 10)]
@@ -0,0 +1,35 @@
+"""Tests for the Prometheus text-format metrics registry."""
+
+from __future__ import annotations
+
+from bookshelf_scanner.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage time.", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="detect")
+    histogram.observe(0.1, stage="detect")
+    histogram.observe(2.0, stage="detect")
+
+    text = registry.render()
+
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="detect",le="0.1"} 2' in text
+    assert 'stage_seconds_bucket{stage="detect",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="detect",le="+Inf"} 3' in text
+    assert 'stage_seconds_sum{stage="detect"} 2.15' in text
+    assert 'stage_seconds_count{stage="detect"} 3' in text
+
+
+def test_counter_and_callback_metrics_render_samples():
+    registry = MetricsRegistry()
+    counter = registry.counter("spines_total", "Spines seen.")
+    counter.inc(3)
+    registry.callback("cache_hits", "Cache hits.", lambda: [({"cache": "search"}, 4.0)], type_name="counter")
+
+    text = registry.render()
+
+    assert "# TYPE spines_total counter" in text
+    assert "spines_total 3" in text
+    assert 'cache_hits{cache="search"} 4' in text
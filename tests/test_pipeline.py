@@ -0,0 +1,198 @@
+"""Tests for the streaming scan pipeline and config loading."""
+
+from __future__ import annotations
+
+import csv
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from bookshelf_scanner.config import load_config
+from bookshelf_scanner.exporter import BookExporter
+from bookshelf_scanner.pipeline import ScanResultWriter, Stage, StreamingPipeline, build_scan_pipeline
+from bookshelf_scanner.schemas import DetectedSpine, SpineExtraction
+from bookshelf_scanner.serving import ModelPool
+
+
+class _StripeDetector:
+    """Splits a photo into `count` vertical spines."""
+
+    def __init__(self, count: int = 3) -> None:
+        self.count = count
+
+    def detect_all(self, image: Image.Image, min_area: int, max_detections: int):
+        width = image.width // self.count
+        spines = [
+            DetectedSpine(bbox=(index * width, 0, (index + 1) * width, image.height), confidence=0.9, index=index)
+            for index in range(self.count)
+        ]
+        return [image.crop(spine.bbox) for spine in spines], spines
+
+
+class _TitleExtractor:
+    def __init__(self) -> None:
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def extract(self, spine_image: Image.Image) -> SpineExtraction:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        return SpineExtraction(title=f"Book {call}", author="Some Author", confidence=0.8)
+
+
+class _BooksClient:
+    def __init__(self, fail_on: str | None = None) -> None:
+        self.fail_on = fail_on
+        self.titles: list[str] = []
+
+    def lookup(self, title: str, author: str | None = None):
+        self.titles.append(title)
+        if title == self.fail_on:
+            raise RuntimeError("quota exceeded")
+        item = {"id": f"id-{title}", "volumeInfo": {"title": title, "authors": [author]}}
+        return {"totalItems": 1, "items": [item], "query": f"intitle:{title}"}
+
+
+def _write_photos(directory: Path, count: int) -> list[Path]:
+    paths = []
+    for index in range(count):
+        path = directory / f"shelf_{index}.jpg"
+        Image.new("RGB", (60, 40), color=(index * 40, 120, 200)).save(path)
+        paths.append(path)
+    return paths
+
+
+def _read_rows(path: Path) -> list[dict[str, str]]:
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_streaming_pipeline_fans_out_and_counts_each_stage():
+    seen: list[int] = []
+    lock = threading.Lock()
+
+    def _split(value: int):
+        yield from (value * 10 + offset for offset in range(3))
+
+    def _sink(value: int):
+        with lock:
+            seen.append(value)
+        return ()
+
+    pipeline = StreamingPipeline([Stage("split", _split, workers=2), Stage("sink", _sink, workers=3)], queue_size=2)
+    stats = pipeline.run(range(5))
+
+    assert sorted(seen) == sorted(value * 10 + offset for value in range(5) for offset in range(3))
+    assert stats["stages"]["split"] == {**stats["stages"]["split"], "processed": 5, "emitted": 15, "errors": 0}
+    assert stats["stages"]["sink"]["processed"] == 15
+
+
+def test_streaming_pipeline_bounded_queue_applies_backpressure():
+    produced: list[float] = []
+    consumed: list[float] = []
+
+    def _produce(value: int):
+        produced.append(time.perf_counter())
+        yield value
+
+    def _consume(value: int):
+        time.sleep(0.02)
+        consumed.append(time.perf_counter())
+        return ()
+
+    pipeline = StreamingPipeline([Stage("produce", _produce), Stage("consume", _consume)], queue_size=1)
+    pipeline.run(range(8))
+
+    # With one queue slot the producer can run at most a couple of items ahead.
+    assert produced[-1] > consumed[3]
+
+
+def test_streaming_pipeline_counts_errors_and_keeps_going():
+    def _maybe_fail(value: int):
+        if value == 2:
+            raise ValueError("bad item")
+        yield value
+
+    results: list[int] = []
+    pipeline = StreamingPipeline([Stage("check", _maybe_fail), Stage("collect", lambda value: results.append(value))])
+    stats = pipeline.run(range(4))
+
+    assert sorted(results) == [0, 1, 3]
+    assert stats["stages"]["check"]["errors"] == 1
+    assert stats["stages"]["check"]["processed"] == 4
+
+
+def test_scan_pipeline_writes_a_row_per_spine(tmp_path: Path):
+    photos = _write_photos(tmp_path, 2)
+    extractor = _TitleExtractor()
+    client = _BooksClient()
+    progress: list[tuple[str, int]] = []
+    output = tmp_path / "out" / "scan.csv"
+    books_output = tmp_path / "out" / "goodreads_import.csv"
+
+    with ScanResultWriter(output) as writer, BookExporter(books_output) as exporter:
+        pipeline = build_scan_pipeline(
+            detector_pool=ModelPool(_StripeDetector, size=2),
+            extractor_pool=ModelPool(lambda: extractor, size=1),
+            writer=writer,
+            exporter=exporter,
+            books_client=client,  # type: ignore[arg-type]
+            lookup_workers=2,
+            on_progress=lambda stage, emitted: progress.append((stage, emitted)),
+        )
+        stats = pipeline.run(photos)
+
+    rows = _read_rows(output)
+    assert len(rows) == 6
+    assert {row["input_image_path"] for row in rows} == {str(path) for path in photos}
+    assert all(row["match_found"] == "true" and row["match_source"] == "google_books" for row in rows)
+    assert {row["input_bbox"] for row in rows} == {"0 0 20 40", "20 0 40 40", "40 0 60 40"}
+    assert extractor.calls == 6
+    assert stats["stages"]["detect"]["emitted"] == 6
+    assert stats["stages"]["export"]["processed"] == 6
+    assert sum(emitted for stage, emitted in progress if stage == "detect") == 6
+    assert exporter.written == 6
+    assert len(_read_rows(books_output)) == 6
+
+
+def test_scan_pipeline_keeps_spines_when_lookup_fails_or_is_disabled(tmp_path: Path):
+    photos = _write_photos(tmp_path, 1)
+
+    failing_output = tmp_path / "failing.csv"
+    with ScanResultWriter(failing_output) as writer:
+        build_scan_pipeline(
+            detector_pool=ModelPool(_StripeDetector),
+            extractor_pool=ModelPool(_TitleExtractor),
+            writer=writer,
+            books_client=_BooksClient(fail_on="Book 2"),  # type: ignore[arg-type]
+        ).run(photos)
+    rows = {row["input_title"]: row for row in _read_rows(failing_output)}
+    assert rows["Book 2"]["match_found"] == "false"
+    assert rows["Book 1"]["match_found"] == "true"
+
+    offline_output = tmp_path / "offline.csv"
+    with ScanResultWriter(offline_output, include_unmatched=False) as writer:
+        build_scan_pipeline(
+            detector_pool=ModelPool(_StripeDetector),
+            extractor_pool=ModelPool(_TitleExtractor),
+            writer=writer,
+        ).run(photos)
+    assert _read_rows(offline_output) == []
+
+
+def test_load_config_merges_file_over_defaults(tmp_path: Path):
+    path = tmp_path / "config.yaml"
+    path.write_text("pipeline:\n  lookup_workers: 8\nlookup:\n  enabled: false\n", encoding="utf-8")
+
+    config = load_config(path)
+
+    assert config["pipeline"]["lookup_workers"] == 8
+    assert config["pipeline"]["queue_size"] == 16
+    assert config["lookup"]["enabled"] is False
+    assert config["detection"]["model"] == "yolov8n.pt"
+    with pytest.raises(FileNotFoundError):
+        load_config(tmp_path / "missing.yaml")
@@ -0,0 +1,163 @@
+"""Tests for the sampled on-demand request profiler."""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import threading
+
+import pytest
+
+from bookshelf_scanner import profiling
+from bookshelf_scanner.profiling import BUSY, FORBIDDEN, NOT_SAMPLED, PROFILED, RATE_LIMITED, RequestProfiler
+
+
+def _busy_work(n: int = 20000) -> int:
+    return sum(index * index for index in range(n))
+
+
+def test_session_reports_hot_functions_only_while_active():
+    profiler = RequestProfiler(min_interval=0, top_n=5)
+    session, outcome = profiler.start("1")
+    assert outcome == PROFILED and profiler.active == 1
+
+    _busy_work()  # not profiled: outside active()
+    with session.active():
+        _busy_work()
+    summary = session.finish()
+
+    assert profiler.active == 0
+    assert summary["profileId"] == session.id
+    assert len(summary["functions"]["self"]) <= 5
+    busy = [row for row in summary["functions"]["cumulative"] if row["function"].endswith("(_busy_work)")]
+    assert busy and busy[0]["calls"] == 1
+    assert session.finish() is summary
+
+
+def test_wrap_profiles_each_step_and_finishes_when_exhausted():
+    profiler = RequestProfiler(min_interval=0)
+    session, _ = profiler.start("1")
+
+    def _events():
+        for step in range(3):
+            yield _busy_work(1000 + step)
+
+    assert len(list(session.wrap(_events()))) == 3
+    assert profiler.active == 0
+    calls = {row["function"]: row["calls"] for row in session.finish()["functions"]["cumulative"]}
+    assert any(name.endswith("(_busy_work)") and count == 3 for name, count in calls.items())
+
+
+def test_limits_reject_concurrent_rate_limited_unsampled_and_bad_token():
+    profiler = RequestProfiler(max_concurrent=1, min_interval=60)
+    session, _ = profiler.start("1")
+    assert profiler.start("1") == (None, BUSY)
+    session.finish()
+    assert profiler.start("1") == (None, RATE_LIMITED)
+
+    assert RequestProfiler(min_interval=0, probability=0.0).start("1") == (None, NOT_SAMPLED)
+    guarded = RequestProfiler(min_interval=0, token="s3cret")
+    assert guarded.start("1") == (None, FORBIDDEN)
+    assert guarded.start("s3cret")[1] == PROFILED
+
+    assert profiler.counts == {PROFILED: 1, BUSY: 1, RATE_LIMITED: 1, NOT_SAMPLED: 0, FORBIDDEN: 0}
+
+
+def test_profiles_are_written_and_rotated(tmp_path):
+    profiler = RequestProfiler(min_interval=0, output_dir=tmp_path, keep=2)
+    ids = []
+    for _ in range(3):
+        session, _ = profiler.start("1")
+        with session.active():
+            _busy_work(100)
+        summary = session.finish()
+        ids.append(session.id)
+
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == [".json", ".json", ".prof", ".prof"]
+    assert not list(tmp_path.glob(f"*-{ids[0]}.*"))
+    written = json.loads((tmp_path / summary["files"]["summary"]).read_text(encoding="utf-8"))
+    assert written["profileId"] == ids[-1]
+
+
+def test_torch_operators_are_reported_when_enabled():
+    torch = pytest.importorskip("torch")
+    profiler = RequestProfiler(min_interval=0, torch_ops=True, top_n=3)
+    session, _ = profiler.start("1")
+    with session.active():
+        torch.ones(8, 8) @ torch.ones(8, 8)
+    operators = session.finish()["operators"]
+
+    assert 0 < len(operators) <= 3
+    assert any(row["operator"] in {"aten::matmul", "aten::mm", "aten::ones", "aten::fill_"} for row in operators)
+
+
+def _left_work() -> int:
+    return _busy_work(5000)
+
+
+def _right_work() -> int:
+    return _busy_work(5000)
+
+
+def test_two_concurrent_sessions():
+    profiler = RequestProfiler(max_concurrent=2, min_interval=0)
+    first, _ = profiler.start("1")
+    second, outcome = profiler.start("1")
+
+    if profiling.CPROFILE_IS_GLOBAL:
+        # One interpreter-wide cProfile hook: the second flagged request is skipped, not failed.
+        assert profiler.max_concurrent == 1
+        assert (second, outcome) == (None, BUSY)
+        first.finish()
+        return
+
+    assert outcome == PROFILED and profiler.active == 2
+    barrier = threading.Barrier(2)
+
+    def _run(session, work) -> None:
+        with session.active():
+            barrier.wait()
+            work()
+            barrier.wait()
+
+    threads = [
+        threading.Thread(target=_run, args=(first, _left_work)),
+        threading.Thread(target=_run, args=(second, _right_work)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    left = [row["function"] for row in first.finish()["functions"]["cumulative"]]
+    right = [row["function"] for row in second.finish()["functions"]["cumulative"]]
+    assert any(name.endswith("(_left_work)") for name in left)
+    assert not any(name.endswith("(_right_work)") for name in left)
+    assert any(name.endswith("(_right_work)") for name in right)
+    assert profiler.active == 0
+
+
+class _TakenProfile(cProfile.Profile):
+    """Behaves like 3.12+ cProfile while another profiling tool holds the hook."""
+
+    def enable(self, *args, **kwargs):
+        raise ValueError("Another profiling tool is already active")
+
+
+def test_profiler_held_elsewhere_means_busy_or_unprofiled(monkeypatch):
+    # Two slots, so the second start is refused by the probe rather than the concurrency limit.
+    profiler = RequestProfiler(max_concurrent=2, min_interval=0)
+    session, _ = profiler.start("1")
+    monkeypatch.setattr(profiling, "CPROFILE_IS_GLOBAL", True)
+    monkeypatch.setattr(profiling.cProfile, "Profile", _TakenProfile)
+
+    assert profiler.start("1") == (None, BUSY)
+
+    # Taken between start() and active(): the request still runs, just unprofiled.
+    session._profile = _TakenProfile()
+    with session.active():
+        assert _busy_work(100) >= 0
+    summary = session.finish()
+    assert summary["profilerUnavailable"] is True
+    assert summary["functions"]["cumulative"] == []
+    assert profiler.active == 0
@@ -0,0 +1,71 @@
+"""Tests for Google Books record/replay fixtures and the local stand-in server."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+import requests
+
+from bookshelf_scanner.lookup import GoogleBooksClient
+from bookshelf_scanner.replay import FixtureStore, StandInServer, record_client
+
+
+def _write_lookup_csv(path: Path) -> None:
+    items = [
+        {"id": "dune-1", "volumeInfo": {"title": "Dune", "authors": ["Frank Herbert"]}},
+        {"id": "dune-2", "volumeInfo": {"title": "Dune Messiah", "authors": ["Frank Herbert"]}},
+    ]
+    lines = ["query,response_total_items,match_found,result_index,raw_item_json"]
+    for index in (1, 0):
+        raw = json.dumps(items[index]).replace('"', '""')
+        lines.append(f'"intitle:""Dune"" inauthor:""Frank Herbert""",2,true,{index},"{raw}"')
+    lines.append('"intitle:""Hyperion""",0,false,,')
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_import_lookup_csv_rebuilds_ordered_responses(tmp_path: Path):
+    lookup_csv = tmp_path / "lookup_outputs.csv"
+    _write_lookup_csv(lookup_csv)
+    store = FixtureStore(tmp_path / "fixtures.json")
+
+    assert store.import_lookup_csv(lookup_csv) == 2
+    store.save()
+
+    reloaded = FixtureStore(tmp_path / "fixtures.json")
+    payload = reloaded.get('intitle:"Dune" inauthor:"Frank Herbert"')
+    assert payload["totalItems"] == 2
+    assert [item["id"] for item in payload["items"]] == ["dune-1", "dune-2"]
+    assert reloaded.get('intitle:"Hyperion"') == {"kind": "books#volumes", "totalItems": 0}
+
+
+def test_client_replays_fixtures_through_stand_in_server(tmp_path: Path):
+    lookup_csv = tmp_path / "lookup_outputs.csv"
+    _write_lookup_csv(lookup_csv)
+    store = FixtureStore()
+    store.import_lookup_csv(lookup_csv)
+
+    with StandInServer(store, latency_ms=1) as server:
+        client = GoogleBooksClient(max_results=1, base_url=server.base_url)
+        payload = client.lookup("Dune", "Frank Herbert")
+        missing = client.search("intitle:\"Unknown\"")
+
+    assert payload["queryStep"] == "strict"
+    assert [item["id"] for item in payload["items"]] == ["dune-1"]
+    assert missing["totalItems"] == 0
+    assert server.stats == {"requests": 2, "hits": 1, "misses": 1, "errors": 0}
+
+
+def test_stand_in_server_injects_errors_and_recording_skips_them(tmp_path: Path):
+    store = FixtureStore()
+    store.put("q", {"totalItems": 0})
+    recorded = FixtureStore()
+
+    with StandInServer(store, error_rate=1.0, error_status=429, seed=7) as server:
+        client = record_client(GoogleBooksClient(base_url=server.base_url), recorded)
+        with pytest.raises(requests.HTTPError):
+            client.search("q")
+
+    assert server.stats["errors"] == 1
+    assert len(recorded) == 0
@@ -0,0 +1,73 @@
+"""Tests for thread-safe lazy model holders."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from bookshelf_scanner.serving import LazyResource, ModelPool, process_memory
+
+
+def test_lazy_resource_builds_once_under_concurrent_first_access():
+    calls = {"count": 0}
+
+    def _factory() -> object:
+        calls["count"] += 1
+        time.sleep(0.05)
+        return object()
+
+    resource = LazyResource(_factory, name="model")
+    barrier = threading.Barrier(8)
+    seen: list[object] = []
+
+    def _worker() -> None:
+        barrier.wait()
+        seen.append(resource.get())
+
+    threads = [threading.Thread(target=_worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls["count"] == 1
+    assert len({id(value) for value in seen}) == 1
+    assert resource.loaded
+
+
+def test_model_pool_lends_each_instance_to_one_caller_at_a_time():
+    built: list[dict[str, int]] = []
+    max_active = {"value": 0}
+    lock = threading.Lock()
+
+    def _factory() -> dict[str, int]:
+        instance = {"active": 0}
+        built.append(instance)
+        return instance
+
+    pool = ModelPool(_factory, size=2, name="model")
+
+    def _worker() -> None:
+        with pool.acquire(timeout=5) as instance:
+            with lock:
+                instance["active"] += 1
+                max_active["value"] = max(max_active["value"], instance["active"])
+            time.sleep(0.01)
+            with lock:
+                instance["active"] -= 1
+
+    threads = [threading.Thread(target=_worker) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 2
+    assert max_active["value"] == 1
+    pool.preload()
+    assert pool.loaded == 2
+
+
+def test_process_memory_reports_resident_bytes():
+    usage = process_memory()
+    assert usage.get("rssBytes", usage.get("maxRssBytes", 0)) > 0
@@ -0,0 +1,94 @@
+"""Tests for merging overlapping shelf captures into one session."""
+
+from __future__ import annotations
+
+from bookshelf_scanner.sessions import ShelfSession
+
+
+def _titles(session: ShelfSession) -> list[str]:
+    return [spine["extraction"]["title"] for spine in session.summary()["spines"]]
+
+
+def _add(capture, title: str, signature: int | None = None):
+    return capture.add({"title": title}, {"items": []}, signature, (20, 200))
+
+
+def test_overlapping_captures_merge_in_reading_order():
+    session = ShelfSession()
+    first = session.start_capture()
+    for title in ("A", "B", "C"):
+        _add(first, title)
+    first.finish()
+
+    second = session.start_capture()
+    _add(second, "Z")  # left of the overlap, i.e. before C in this capture
+    second.reuse(session.match_title("c"), None, (20, 200))
+    _add(second, "D")
+    stats = second.finish()
+
+    assert _titles(session) == ["A", "B", "Z", "C", "D"]
+    assert stats["newSpines"] == 2
+    assert stats["reusedSpines"] == 1
+    assert session.summary()["spines"][3]["captures"] == [1, 2]
+
+
+def test_crop_matching_uses_hash_distance_size_and_position():
+    session = ShelfSession(hash_distance=2)
+    capture = session.start_capture()
+    _add(capture, "Emma", signature=0b0101_0101)
+    spine = _add(capture, "Dune", signature=0b1111_0000)
+    capture.finish()
+
+    second = session.start_capture()
+    assert second.match_crop(0b1111_0000, (20, 200)) is None  # no anchor in this capture yet
+    assert second.match_title("emma").title_key == "emma"
+    assert second.match_crop(0b0000_1111, (20, 200)) is None
+    assert second.match_crop(0b1111_0000, (60, 200)) is None
+    assert second.match_crop(0b1111_0001, (21, 190)) is spine
+    assert session.match_title("[Extraction Failed]") is None
+
+
+def test_crop_matching_never_reuses_a_similar_spine_elsewhere_on_the_shelf():
+    # Volumes of one series: spines whose hashes differ by a bit.
+    session = ShelfSession(hash_distance=2)
+    first = session.start_capture()
+    _add(first, "Harry Potter and the Philosopher's Stone", signature=0b1111_0000)
+    _add(first, "Emma", signature=0b0101_0101)
+    _add(first, "Dune", signature=0b0011_0011)
+    first.finish()
+
+    second = session.start_capture()
+    second.match_title("dune")
+    assert second.match_crop(0b1111_0001, (20, 200)) is None  # a new volume right of Dune
+
+    third = session.start_capture()
+    third.match_title("emma")
+    assert third.match_crop(0b1111_0001, (20, 200)) is None  # the known volume is left of Emma
+
+
+def test_crop_matching_leaves_ambiguous_series_spines_to_extraction():
+    session = ShelfSession(hash_distance=2)
+    first = session.start_capture()
+    _add(first, "Emma")
+    _add(first, "Harry Potter and the Philosopher's Stone", signature=0b1111_0000)
+    _add(first, "Harry Potter and the Chamber of Secrets", signature=0b1111_0010)
+    first.finish()
+
+    second = session.start_capture()
+    second.match_title("emma")
+    assert second.match_crop(0b1111_0001, (20, 200)) is None
+
+
+def test_reuse_replaces_a_failed_lookup():
+    session = ShelfSession()
+    first = session.start_capture()
+    spine = first.add({"title": "Dune"}, {"items": [], "error": "TimeoutError: timed out"}, None, (20, 200))
+    first.finish()
+    assert spine.lookup_failed
+
+    second = session.start_capture()
+    second.reuse(spine, None, (20, 200), lookup={"items": [{"id": "dune"}], "error": None})
+    second.finish()
+
+    assert not spine.lookup_failed
+    assert session.summary()["spines"][0]["lookup"]["items"] == [{"id": "dune"}]
@@ -0,0 +1,77 @@
+"""Tests for the latency-injecting stub backends used by benchmarks and load tests."""
+
+from __future__ import annotations
+
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from bookshelf_scanner.stubs import StubBooksClient, StubDetector, StubExtractor, stub_factories
+from bookshelf_scanner.web_api import create_app
+
+
+def test_stub_detector_returns_reading_ordered_strips():
+    image = Image.new("RGB", (120, 80))
+
+    crops, spines = StubDetector(spines_per_row=4, rows=2).detect_all(image, min_area=0, max_detections=6)
+
+    assert [spine.bbox for spine in spines[:5]] == [
+        (0, 0, 30, 40),
+        (30, 0, 60, 40),
+        (60, 0, 90, 40),
+        (90, 0, 120, 40),
+        (0, 40, 30, 80),
+    ]
+    assert [spine.index for spine in spines] == list(range(6))
+    assert [crop.size for crop in crops] == [(30, 40)] * 6
+
+
+def test_stub_latency_is_slept_per_call():
+    extractor = StubExtractor(latency_ms=20)
+    client = StubBooksClient(items=2, latency_ms=20)
+
+    started = time.perf_counter()
+    first = extractor.extract(Image.new("RGB", (10, 10)))
+    second = extractor.extract(Image.new("RGB", (10, 10)))
+    payload = client.lookup(first.title, first.author)
+
+    assert time.perf_counter() - started >= 0.06
+    assert first.title != second.title
+    assert payload["totalItems"] == 2
+    assert payload["items"][0]["volumeInfo"]["title"] == first.title
+
+
+def test_scan_capture_runs_end_to_end_on_stubs(monkeypatch):
+    monkeypatch.setenv("BOOKSHELF_CAPTURE_CACHE_ENTRIES", "0")
+    app = create_app(**stub_factories(spines_per_row=3, rows=1, lookup_items=2))
+    app.config.update(TESTING=True)
+    buffer = BytesIO()
+    Image.new("RGB", (90, 60), color=(200, 180, 40)).save(buffer, format="JPEG")
+
+    response = app.test_client().post(
+        "/scan/capture",
+        data={"image": (BytesIO(buffer.getvalue()), "shelf.jpg"), "minArea": "0"},
+        content_type="multipart/form-data",
+    )
+    payload = response.get_json()
+
+    assert response.status_code == 200
+    assert payload["count"] == 3
+    assert all(spine["lookup"]["totalItems"] == 2 for spine in payload["spines"])
+    assert set(payload["timingsMs"]) >= {"detect", "extract", "lookup", "total"}
+
+
+def test_stub_models_env_replaces_model_factories(monkeypatch):
+    monkeypatch.setenv("BOOKSHELF_STUB_MODELS", "true")
+    monkeypatch.setenv("BOOKSHELF_STUB_SPINES", "4")
+    monkeypatch.delenv("GOOGLE_BOOKS_BASE_URL", raising=False)
+    app = create_app()
+    app.config.update(TESTING=True)
+    buffer = BytesIO()
+    Image.new("RGB", (80, 60)).save(buffer, format="JPEG")
+
+    response = app.test_client().post("/detect/spines", data=buffer.getvalue(), content_type="image/jpeg")
+
+    assert response.status_code == 200
+    assert response.get_json()["count"] == 4
@@ -0,0 +1,97 @@
+"""Tests for in-process request tracing and its OTLP/JSON export."""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bookshelf_scanner.tracing import NULL_TRACE, Trace, TraceExporter, parse_traceparent
+
+
+def test_spans_nest_by_context_and_by_explicit_parent_across_threads():
+    trace = Trace("POST /scan/capture")
+    with trace.span("detect") as detect:
+        with trace.span("model") as model:
+            model.set(spines=3)
+    spine = trace.start_span("spine", spineIndex=0)
+
+    def _lookup() -> None:
+        with trace.span("lookup", parent=spine):
+            with trace.span("catalog.match") as span:
+                span.set(hit=False)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(_lookup).result()
+    spine.end()
+    trace.finish()
+
+    tree = trace.to_tree()
+    assert tree["traceId"] == trace.trace_id
+    assert [child["name"] for child in tree["children"]] == ["detect", "spine"]
+    nested = tree["children"][0]["children"][0]
+    assert (nested["name"], nested["spanId"], nested["attributes"]) == ("model", model.span_id, {"spines": 3})
+    assert nested["startMs"] >= 0 and nested["durationMs"] == pytest.approx(model.duration_ms, abs=1e-3)
+    lookup = tree["children"][1]["children"][0]
+    assert lookup["name"] == "lookup"
+    assert lookup["children"][0]["attributes"] == {"hit": False}
+    assert detect.end_ns is not None and detect.end_ns >= detect.start_ns
+
+
+def test_span_records_exception_and_reraises():
+    trace = Trace("root")
+    with pytest.raises(RuntimeError):
+        with trace.span("extract"):
+            raise RuntimeError("model crashed")
+    trace.finish()
+
+    otlp_spans = trace.to_otlp()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    failed = next(span for span in otlp_spans if span["name"] == "extract")
+    assert failed["status"] == {"code": 2, "message": "RuntimeError: model crashed"}
+    assert trace.to_tree()["children"][0]["error"] == "RuntimeError: model crashed"
+
+
+def test_otlp_export_shape_and_remote_parent(tmp_path):
+    traceparent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    trace = Trace("POST /scan/capture", {"http.route": "/scan/capture"}, traceparent=traceparent)
+    with trace.span("decode", bytes=1024, ratio=0.5, cached=True, skip=None):
+        pass
+    trace.finish()
+
+    exporter = TraceExporter(tmp_path / "traces" / "spans.jsonl")
+    exporter.export(trace)
+    exporter.export(trace)
+
+    lines = (tmp_path / "traces" / "spans.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    resource_spans = json.loads(lines[0])["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "bookshelf-scanner"}}
+    ]
+    root, decode = resource_spans["scopeSpans"][0]["spans"]
+    assert root["traceId"] == decode["traceId"] == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert root["parentSpanId"] == "00f067aa0ba902b7"
+    assert root["kind"] == 2 and decode["kind"] == 1
+    assert decode["parentSpanId"] == root["spanId"]
+    assert int(decode["endTimeUnixNano"]) >= int(decode["startTimeUnixNano"])
+    assert decode["attributes"] == [
+        {"key": "bytes", "value": {"intValue": "1024"}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+        {"key": "cached", "value": {"boolValue": True}},
+    ]
+
+
+def test_parse_traceparent_rejects_malformed_and_zero_ids():
+    assert parse_traceparent("00-" + "a" * 32 + "-" + "b" * 16 + "-01") == ("a" * 32, "b" * 16)
+    assert parse_traceparent(None) is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent("00-" + "0" * 32 + "-" + "b" * 16 + "-01") is None
+
+
+def test_null_trace_records_nothing():
+    with NULL_TRACE.span("detect") as span:
+        span.set(spines=3)
+    NULL_TRACE.start_span("spine").end()
+    NULL_TRACE.finish()
+    assert NULL_TRACE.enabled is False
@@ -0,0 +1,36 @@
+"""Tests for compact /detect/spines response encodings."""
+
+from __future__ import annotations
+
+import pytest
+
+from bookshelf_scanner.transport import decode_packed, encode_msgpack, encode_packed
+
+
+def test_packed_boxes_round_trip_with_fixed_record_size():
+    rows = [(10, 20, 40, 300, 0.875), (50, 18, 90, 310, 0.5)]
+
+    data = encode_packed(rows, frame_width=1280, frame_height=720, inference_ms=12.5)
+    decoded = decode_packed(data)
+
+    assert len(data) == 16 + 12 * len(rows)
+    assert decoded["count"] == 2
+    assert (decoded["frameWidth"], decoded["frameHeight"]) == (1280, 720)
+    assert decoded["inferenceMs"] == pytest.approx(12.5)
+    assert decoded["boxes"][0][:4] == [10, 20, 40, 300]
+    assert decoded["boxes"][1][4] == pytest.approx(0.5)
+
+
+def test_decode_packed_rejects_foreign_payloads():
+    with pytest.raises(ValueError):
+        decode_packed(b"{}" * 8)
+
+
+def test_msgpack_encoding_uses_box_arrays():
+    msgpack = pytest.importorskip("msgpack")
+
+    payload = msgpack.unpackb(encode_msgpack([(1, 2, 3, 4, 0.25)], 32, 20, 3.456))
+
+    assert payload["boxes"] == [[1, 2, 3, 4, 0.25]]
+    assert payload["frameWidth"] == 32
+    assert payload["inferenceMs"] == pytest.approx(3.46)
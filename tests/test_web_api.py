@@ -2,10 +2,18 @@
 
 from __future__ import annotations
 
+import json
+import threading
+import time
 from io import BytesIO
 
+import pytest
 from PIL import Image
 
+from bookshelf_scanner.catalog import CatalogIndex, goodreads_row_to_volume
+from bookshelf_scanner.cropstore import CropStore
+from bookshelf_scanner.stubs import StubDetector
+from bookshelf_scanner.transport import decode_packed
 from bookshelf_scanner.web_api import create_app
 
 
@@ -38,6 +46,18 @@ class _DuplicateFakeDetector:
         return crops, spines
 
 
+class _DistinctCropsFakeDetector:
+    """Two disjoint spines of different widths, so crop dedupe keeps both."""
+
+    def detect_all(self, image: Image.Image, min_area: int, max_detections: int):
+        crops = [image.crop((0, 0, 10, image.height)), image.crop((10, 0, image.width, image.height))]
+        spines = [
+            _FakeSpine((0, 0, 10, image.height), 0.98, 0),
+            _FakeSpine((10, 0, image.width, image.height), 0.97, 1),
+        ]
+        return crops, spines
+
+
 class _FakeExtractor:
     def extract(self, spine_image: Image.Image) -> _FakeExtraction:
         return _FakeExtraction("Dune", "Frank Herbert", 0.91)
@@ -153,6 +173,17 @@ def test_books_search_returns_compact_payload():
     assert holder["client"].search_calls == [("dune", 7)]
 
 
+def test_json_responses_are_compact_and_keep_handler_key_order():
+    client, _ = _build_test_client()
+
+    response = client.get("/books/search?q=dune")
+
+    assert response.mimetype == "application/json"
+    assert response.data.startswith(b'{"totalItems":1,"items":[{')
+    assert response.data.endswith(b"}\n")
+    assert json.loads(response.data)["items"][0]["title"] == "Dune"
+
+
 def test_books_search_returns_missing_api_key_when_unset():
     client, _ = _build_test_client(books_client_factory=lambda: _NoKeyBooksClient())
 
@@ -224,9 +255,10 @@ def test_scan_capture_dedupes_duplicate_extracted_titles_before_lookup():
         books_holder["client"] = client
         return client
 
+    extractor = _DuplicateFakeExtractor()
     app = create_app(
         detector_factory=lambda: _DuplicateFakeDetector(),
-        extractor_factory=lambda: _DuplicateFakeExtractor(),
+        extractor_factory=lambda: extractor,
         books_client_factory=_books_factory,
     )
     app.config.update(TESTING=True)
@@ -250,3 +282,744 @@ def test_scan_capture_dedupes_duplicate_extracted_titles_before_lookup():
     assert len(payload["spines"]) == 1
     assert payload["spines"][0]["extraction"]["title"] == "Dune"
     assert books_holder["client"].lookup_calls == [("Dune", "Frank Herbert")]
+    assert extractor.calls == 1
+    assert payload["dedupe"]["extractionsAvoided"] == 1
+
+
+def test_scan_capture_drops_distinct_crops_with_duplicate_extracted_title():
+    books_holder: dict[str, _FakeBooksClient] = {}
+
+    def _books_factory():
+        client = _FakeBooksClient()
+        books_holder["client"] = client
+        return client
+
+    extractor = _DuplicateFakeExtractor()
+    app = create_app(
+        detector_factory=lambda: _DistinctCropsFakeDetector(),
+        extractor_factory=lambda: extractor,
+        books_client_factory=_books_factory,
+    )
+    app.config.update(TESTING=True)
+    image_file, filename = _build_image_payload()
+
+    response = app.test_client().post(
+        "/scan/capture",
+        data={"image": (image_file, filename), "minArea": "100", "maxLookupResults": "1"},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert extractor.calls == 2
+    assert payload["dedupe"]["extractionsAvoided"] == 0
+    assert payload["count"] == 1
+    assert [spine["spineIndex"] for spine in payload["spines"]] == [0]
+    assert books_holder["client"].lookup_calls == [("Dune", "Frank Herbert")]
+
+
+class _FlakyBooksClient(_FakeBooksClient):
+    """Times out on the first lookup, then answers normally."""
+
+    def lookup(self, title: str, author: str | None = None) -> dict:
+        self.lookup_calls.append((title, author))
+        if len(self.lookup_calls) == 1:
+            raise TimeoutError("google books timed out")
+        return self._payload()
+
+
+def test_scan_capture_does_not_cache_failed_lookups():
+    client, holder = _build_test_client(books_client_factory=_FlakyBooksClient)
+
+    def _post():
+        image_file, filename = _build_image_payload()
+        return client.post(
+            "/scan/capture",
+            data={"image": (image_file, filename), "minArea": "100"},
+            content_type="multipart/form-data",
+        )
+
+    failed = _post()
+    assert failed.headers["X-Capture-Cache"] == "miss"
+    assert failed.get_json()["spines"][0]["lookup"]["error"] == "TimeoutError: google books timed out"
+
+    retried = _post()
+    assert retried.headers["X-Capture-Cache"] == "miss"
+    lookup = retried.get_json()["spines"][0]["lookup"]
+    assert lookup["error"] is None
+    assert lookup["items"][0]["id"] == "dune-id"
+    assert len(holder["client"].lookup_calls) == 2
+
+    assert _post().headers["X-Capture-Cache"] == "hit"
+
+
+class _BlankFakeExtractor:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def extract(self, spine_image: Image.Image) -> _FakeExtraction:
+        self.calls += 1
+        return _FakeExtraction("[No Text Detected]", "", 0.0)
+
+
+def test_scan_capture_caches_spines_without_text():
+    extractor = _BlankFakeExtractor()
+    app = create_app(
+        detector_factory=lambda: _FakeDetector(),
+        extractor_factory=lambda: extractor,
+        books_client_factory=lambda: _FakeBooksClient(),
+    )
+    app.config.update(TESTING=True)
+    client = app.test_client()
+
+    def _post():
+        image_file, filename = _build_image_payload()
+        return client.post("/scan/capture", data={"image": (image_file, filename)}, content_type="multipart/form-data")
+
+    first = _post()
+    assert first.headers["X-Capture-Cache"] == "miss"
+    assert first.get_json()["spines"][0]["extraction"]["title"] == "[No Text Detected]"
+    assert _post().headers["X-Capture-Cache"] == "hit"
+    assert extractor.calls == 1
+
+
+def test_scan_capture_resolves_from_local_catalog_without_lookup():
+    books_holder: dict[str, _FakeBooksClient] = {}
+
+    def _books_factory():
+        client = _FakeBooksClient()
+        books_holder["client"] = client
+        return client
+
+    def _catalog_factory():
+        catalog = CatalogIndex()
+        catalog.add_volume(_FakeBooksClient._payload()["items"][0], source="goodreads")
+        return catalog
+
+    app = create_app(
+        detector_factory=lambda: _FakeDetector(),
+        extractor_factory=lambda: _FakeExtractor(),
+        books_client_factory=_books_factory,
+        catalog_factory=_catalog_factory,
+    )
+    app.config.update(TESTING=True)
+    image_file, filename = _build_image_payload()
+
+    response = app.test_client().post(
+        "/scan/capture",
+        data={"image": (image_file, filename), "minArea": "100", "maxLookupResults": "1"},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    lookup = payload["spines"][0]["lookup"]
+    assert lookup["source"] == "catalog"
+    assert lookup["items"][0]["id"] == "dune-id"
+    assert payload["lookupStats"] == {"local": 1, "remote": 0, "localFraction": 1.0}
+    assert books_holder["client"].lookup_calls == []
+
+
+def test_scan_capture_keeps_goodreads_catalog_ids_out_of_volume_id():
+    def _catalog_factory():
+        catalog = CatalogIndex()
+        catalog.add_volume(
+            goodreads_row_to_volume({"Book Id": "234225", "Title": "Dune", "Author": "Frank Herbert"}),
+            source="goodreads",
+        )
+        return catalog
+
+    app = create_app(
+        detector_factory=lambda: _FakeDetector(),
+        extractor_factory=lambda: _FakeExtractor(),
+        books_client_factory=lambda: _FakeBooksClient(),
+        catalog_factory=_catalog_factory,
+    )
+    app.config.update(TESTING=True)
+    image_file, filename = _build_image_payload()
+
+    response = app.test_client().post(
+        "/scan/capture",
+        data={"image": (image_file, filename), "minArea": "100"},
+        content_type="multipart/form-data",
+    )
+
+    item = response.get_json()["spines"][0]["lookup"]["items"][0]
+    assert item["id"] is None
+    assert item["goodreadsId"] == "234225"
+    assert item["infoLink"] == "https://www.goodreads.com/book/show/234225"
+
+
+def test_books_search_batch_returns_compact_results_per_query():
+    client, holder = _build_test_client()
+
+    response = client.post(
+        "/books/search/batch",
+        json={"queries": ["dune", {"q": "hyperion", "maxResults": 3}, "dune", ""], "maxResults": 5},
+    )
+    payload = response.get_json()
+
+    assert response.status_code == 200
+    assert payload["count"] == 4
+    assert [result["query"] for result in payload["results"]] == ["dune", "hyperion", "dune", ""]
+    assert payload["results"][0]["items"][0]["title"] == "Dune"
+    assert payload["results"][1]["maxResults"] == 3
+    assert payload["results"][3]["error"] == "missing_query"
+    assert sorted(holder["client"].search_calls) == [("dune", 5), ("hyperion", 3)]
+
+
+def test_books_search_batch_rejects_invalid_bodies():
+    client, _ = _build_test_client()
+
+    assert client.post("/books/search/batch", json={"q": "dune"}).get_json()["error"] == "invalid_batch"
+    assert client.post("/books/search/batch", json={"queries": []}).get_json()["error"] == "missing_queries"
+    too_many = client.post("/books/search/batch", json={"queries": ["x"] * 26})
+    assert too_many.status_code == 400
+    assert too_many.get_json()["error"] == "too_many_queries"
+
+
+def test_scan_job_submit_and_poll_result():
+    client, _ = _build_test_client()
+    image_file, filename = _build_image_payload()
+
+    submitted = client.post(
+        "/scan/jobs",
+        data={"image": (image_file, filename), "minArea": "100", "maxLookupResults": "1"},
+        content_type="multipart/form-data",
+    )
+    assert submitted.status_code == 202
+    job_id = submitted.get_json()["jobId"]
+
+    deadline = time.monotonic() + 5
+    result = client.get(f"/scan/jobs/{job_id}/result")
+    while result.status_code == 202 and time.monotonic() < deadline:
+        time.sleep(0.01)
+        result = client.get(f"/scan/jobs/{job_id}/result")
+
+    payload = result.get_json()
+    assert result.status_code == 200
+    assert payload["status"] == "succeeded"
+    assert payload["progress"]["spinesDetected"] == 1
+    assert payload["result"]["spines"][0]["extraction"]["title"] == "Dune"
+    assert client.get("/scan/jobs").get_json()["queueDepth"] == 0
+    assert client.get("/scan/jobs/unknown").status_code == 404
+
+
+def test_scan_job_submit_checks_session_before_decoding_image():
+    client, _ = _build_test_client()
+    job_manager = client.application.extensions["scan_jobs"]
+
+    unknown = client.post(
+        "/scan/jobs",
+        data={"image": (BytesIO(b"not an image"), "shelf.png"), "sessionId": "nope"},
+        content_type="multipart/form-data",
+    )
+    assert unknown.status_code == 404
+    assert unknown.get_json()["error"] == "session_not_found"
+
+    invalid = client.post(
+        "/scan/jobs",
+        data={"image": (BytesIO(b"not an image"), "shelf.png")},
+        content_type="multipart/form-data",
+    )
+    assert invalid.status_code == 400
+    assert job_manager.stats() == {**job_manager.stats(), "queueDepth": 0, "running": 0}
+
+
+def test_scan_capture_streams_ndjson_records_per_spine():
+    client, _ = _build_test_client()
+    image_file, filename = _build_image_payload()
+
+    response = client.post(
+        "/scan/capture?stream=ndjson",
+        data={"image": (image_file, filename), "minArea": "100", "maxLookupResults": "1"},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [record["type"] for record in records] == ["detections", "spine", "done"]
+    assert records[0]["boxes"][0]["bbox"] == [0, 0, 32, 20]
+    assert records[1]["lookup"]["items"][0]["id"] == "dune-id"
+    assert set(records[2]["timingsMs"]) >= {"detect", "total"}
+
+
+def test_scan_capture_streams_sse_when_requested_by_accept_header():
+    client, _ = _build_test_client()
+    image_file, filename = _build_image_payload()
+
+    response = client.post(
+        "/scan/capture",
+        data={"image": (image_file, filename), "minArea": "100"},
+        content_type="multipart/form-data",
+        headers={"Accept": "text/event-stream"},
+    )
+
+    body = response.get_data(as_text=True)
+    assert response.mimetype == "text/event-stream"
+    assert body.startswith("event: detections\ndata: {")
+    assert "event: spine\n" in body
+    assert body.rstrip().split("\n\n")[-1].startswith("event: done")
+
+
+class _ThreeSpineDetector:
+    def detect_all(self, image: Image.Image, min_area: int, max_detections: int):
+        spines = [_FakeSpine((i * 10, 0, i * 10 + 10, image.height), 0.9, i) for i in range(3)]
+        return [image, image, image], spines
+
+
+class _TitledFakeExtractor:
+    def __init__(self, all_extracted: threading.Event) -> None:
+        self.titles = iter(["Dune", "Hyperion", "Neuromancer"])
+        self.all_extracted = all_extracted
+        self.calls = 0
+
+    def extract(self, spine_image: Image.Image) -> _FakeExtraction:
+        self.calls += 1
+        if self.calls == 3:
+            self.all_extracted.set()
+        return _FakeExtraction(next(self.titles), "Someone", 0.9)
+
+
+class _BlockingBooksClient(_FakeBooksClient):
+    def __init__(self, all_extracted: threading.Event) -> None:
+        super().__init__()
+        self.all_extracted = all_extracted
+        self.overlapped: list[bool] = []
+
+    def lookup(self, title: str, author: str | None = None) -> dict:
+        # The first lookup only finishes once extraction has moved past its spine.
+        if title == "Dune":
+            self.overlapped.append(self.all_extracted.wait(timeout=2))
+        return super().lookup(title, author)
+
+
+def test_scan_capture_overlaps_lookups_with_extraction_and_keeps_reading_order():
+    all_extracted = threading.Event()
+    books_client = _BlockingBooksClient(all_extracted)
+    app = create_app(
+        detector_factory=lambda: _ThreeSpineDetector(),
+        extractor_factory=lambda: _TitledFakeExtractor(all_extracted),
+        books_client_factory=lambda: books_client,
+    )
+    app.config.update(TESTING=True)
+    image_file, filename = _build_image_payload()
+
+    response = app.test_client().post(
+        "/scan/capture",
+        data={"image": (image_file, filename), "minArea": "100"},
+        content_type="multipart/form-data",
+    )
+
+    payload = response.get_json()
+    assert books_client.overlapped == [True]
+    assert [spine["spineIndex"] for spine in payload["spines"]] == [0, 1, 2]
+    assert [spine["extraction"]["title"] for spine in payload["spines"]] == ["Dune", "Hyperion", "Neuromancer"]
+    assert set(payload["timingsMs"]) == {"detect", "extract", "lookup", "total"}
+
+
+def test_preload_models_loads_pools_and_reports_health():
+    calls = {"detector": 0, "extractor": 0}
+
+    def _detector_factory():
+        calls["detector"] += 1
+        return _FakeDetector()
+
+    def _extractor_factory():
+        calls["extractor"] += 1
+        return _FakeExtractor()
+
+    app = create_app(
+        detector_factory=_detector_factory,
+        extractor_factory=_extractor_factory,
+        books_client_factory=lambda: _FakeBooksClient(),
+        preload_models=True,
+    )
+    app.config.update(TESTING=True)
+    client = app.test_client()
+
+    response = client.get("/health")
+    image_bytes, filename = _build_image_payload()
+    capture = client.post(
+        "/scan/capture",
+        data={"image": (image_bytes, filename)},
+        content_type="multipart/form-data",
+    )
+
+    body = response.get_json()
+    assert body["models"] == {"detector": 1, "extractor": 1, "catalog": True}
+    assert body["pid"] > 0
+    assert body["memory"]
+    assert capture.status_code == 200
+    assert calls == {"detector": 1, "extractor": 1}
+
+
+def test_metrics_endpoint_reports_stage_histograms_and_counters():
+    client, _ = _build_test_client()
+    image_bytes, filename = _build_image_payload()
+    capture = client.post(
+        "/scan/capture",
+        data={"image": (image_bytes, filename)},
+        content_type="multipart/form-data",
+    )
+    assert capture.status_code == 200
+    # WSGI servers close the body once sent; the request histogram records on close.
+    capture.close()
+
+    response = client.get("/metrics")
+    text = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert "bookshelf_decode_seconds_count 1" in text
+    assert "bookshelf_detect_seconds_count 1" in text
+    assert "bookshelf_extract_seconds_count 1" in text
+    assert 'bookshelf_lookup_seconds_count{source="google_books"} 1' in text
+    assert 'bookshelf_request_seconds_count{route="/scan/capture",status="200"} 1' in text
+    assert "bookshelf_spines_detected_total 1" in text
+    assert "bookshelf_extraction_failures_total 0" in text
+    assert 'bookshelf_model_load_seconds{model="detector",instance="0"}' in text
+
+
+def test_detect_spines_accepts_raw_jpeg_body_and_packed_response():
+    client, _ = _build_test_client()
+    image_bytes, _ = _build_image_payload()
+
+    response = client.post(
+        "/detect/spines?minArea=10",
+        data=image_bytes.getvalue(),
+        content_type="image/jpeg",
+        headers={"Accept": "application/vnd.bookshelf.boxes"},
+    )
+    json_response = client.post(
+        "/detect/spines",
+        data={"image": (BytesIO(image_bytes.getvalue()), "frame.jpg")},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/vnd.bookshelf.boxes"
+    decoded = decode_packed(response.get_data())
+    assert decoded["count"] == 1
+    assert decoded["boxes"][0][:4] == [0, 0, 32, 20]
+    assert float(response.headers["X-Serialize-Ms"]) >= 0
+    assert json_response.mimetype == "application/json"
+    assert len(response.get_data()) < len(json_response.get_data())
+
+
+class _ColumnarOnlyDetector(StubDetector):
+    """Previews must come from the array-backed path, never from crops and per-box objects."""
+
+    def detect_all(self, image, min_area=0, max_detections=50):
+        raise AssertionError("/detect/spines should not build crops")
+
+    def detect_batch(self, images, min_area=0, max_detections=50):
+        raise AssertionError("/detect/spines should not build crops")
+
+
+def test_detect_spines_uses_columnar_detections(monkeypatch):
+    for batch_size in ("8", "1"):
+        monkeypatch.setenv("BOOKSHELF_DETECT_BATCH_SIZE", batch_size)
+        app = create_app(
+            detector_factory=lambda: _ColumnarOnlyDetector(spines_per_row=2, rows=1),
+            extractor_factory=lambda: _FakeExtractor(),
+            books_client_factory=lambda: _FakeBooksClient(),
+        )
+        image_bytes, filename = _build_image_payload()
+
+        payload = app.test_client().post(
+            "/detect/spines",
+            data={"image": (image_bytes, filename), "minArea": "0"},
+            content_type="multipart/form-data",
+        ).get_json()
+
+        assert [(box["index"], box["bbox"]) for box in payload["boxes"]] == [(0, [0, 0, 16, 20]), (1, [16, 0, 32, 20])]
+        assert payload["boxes"][0]["confidence"] == pytest.approx(0.9)
+
+
+def test_detect_spines_returns_429_with_retry_after_when_saturated(monkeypatch):
+    monkeypatch.setenv("BOOKSHELF_PREVIEW_MAX_IN_FLIGHT", "1")
+    client, _ = _build_test_client()
+    admission = client.application.extensions["preview_admission"]
+    assert admission.acquire("other-phone") == "admitted"
+
+    image_bytes, filename = _build_image_payload()
+    response = client.post(
+        "/detect/spines",
+        data={"image": (image_bytes, filename)},
+        content_type="multipart/form-data",
+        headers={"X-Client-Id": "phone"},
+    )
+    admission.release("other-phone")
+    metrics_text = client.get("/metrics").get_data(as_text=True)
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert response.get_json()["error"] == "preview_saturated"
+    assert 'bookshelf_preview_frames_total{outcome="rejected"} 1' in metrics_text
+
+
+def test_detect_spines_runs_through_the_micro_batcher():
+    client, _ = _build_test_client()
+    image_bytes, filename = _build_image_payload()
+
+    response = client.post(
+        "/detect/spines",
+        data={"image": (image_bytes, filename)},
+        content_type="multipart/form-data",
+    )
+    metrics_text = client.get("/metrics").get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.get_json()["count"] == 1
+    assert "bookshelf_detect_batch_size_count 1" in metrics_text
+    assert "bookshelf_detect_batch_wait_seconds_count 1" in metrics_text
+
+
+def test_scan_capture_replays_cached_result_for_identical_upload():
+    extractor = _DuplicateFakeExtractor()
+    app = create_app(
+        detector_factory=lambda: _FakeDetector(),
+        extractor_factory=lambda: extractor,
+        books_client_factory=lambda: _FakeBooksClient(),
+    )
+    app.config.update(TESTING=True)
+    client = app.test_client()
+    image_bytes, filename = _build_image_payload()
+    payload = image_bytes.getvalue()
+
+    def _post(**form):
+        return client.post(
+            "/scan/capture",
+            data={"image": (BytesIO(payload), filename), **form},
+            content_type="multipart/form-data",
+        )
+
+    first = _post()
+    retry = _post()
+    other_params = _post(maxLookupResults="1")
+
+    assert first.headers["X-Capture-Cache"] == "miss"
+    assert retry.headers["X-Capture-Cache"] == "hit"
+    assert retry.get_json() == first.get_json()
+    assert other_params.headers["X-Capture-Cache"] == "miss"
+    assert extractor.calls == 2
+
+
+class _TwoSpineDetector:
+    def detect_all(self, image: Image.Image, min_area: int, max_detections: int):
+        spines = [_FakeSpine((i * 16, 0, i * 16 + 16, image.height), 0.9, i) for i in range(2)]
+        return [image.crop(spine.bbox) for spine in spines], spines
+
+
+class _ScriptedExtractor:
+    def __init__(self, titles: list[str]) -> None:
+        self.titles = iter(titles)
+        self.calls = 0
+
+    def extract(self, spine_image: Image.Image) -> _FakeExtraction:
+        self.calls += 1
+        return _FakeExtraction(next(self.titles), "Someone", 0.9)
+
+
+def test_shelf_session_reuses_overlapping_spines_and_merges_summary():
+    books_client = _FakeBooksClient()
+    app = create_app(
+        detector_factory=lambda: _TwoSpineDetector(),
+        extractor_factory=lambda: _ScriptedExtractor(["Hyperion", "Neuromancer", "Neuromancer", "Foundation"]),
+        books_client_factory=lambda: books_client,
+    )
+    app.config.update(TESTING=True)
+    client = app.test_client()
+    session_id = client.post("/scan/sessions").get_json()["sessionId"]
+
+    def _capture():
+        image_bytes, filename = _build_image_payload()
+        return client.post(
+            "/scan/capture",
+            data={"image": (image_bytes, filename), "sessionId": session_id},
+            content_type="multipart/form-data",
+        ).get_json()
+
+    first = _capture()
+    second = _capture()
+    summary = client.get(f"/scan/sessions/{session_id}").get_json()
+    missing = client.post(
+        "/scan/capture",
+        data={"image": _build_image_payload(), "sessionId": "nope"},
+        content_type="multipart/form-data",
+    )
+
+    assert first["session"]["newSpines"] == 2
+    assert [spine["reused"] for spine in second["spines"]] == [True, False]
+    assert second["session"] == {
+        "sessionId": session_id,
+        "captureIndex": 2,
+        "newSpines": 1,
+        "reusedSpines": 1,
+        "totalSpines": 3,
+    }
+    assert [title for title, _ in books_client.lookup_calls] == ["Hyperion", "Neuromancer", "Foundation"]
+    assert [spine["extraction"]["title"] for spine in summary["spines"]] == ["Hyperion", "Neuromancer", "Foundation"]
+    assert summary["captures"] == 2
+    assert missing.status_code == 404
+
+
+def test_shelf_session_retries_a_reused_spine_whose_lookup_failed():
+    books_client = _FlakyBooksClient()
+    app = create_app(
+        detector_factory=lambda: _FakeDetector(),
+        extractor_factory=lambda: _FakeExtractor(),
+        books_client_factory=lambda: books_client,
+    )
+    app.config.update(TESTING=True)
+    client = app.test_client()
+    session_id = client.post("/scan/sessions").get_json()["sessionId"]
+
+    def _capture():
+        image_bytes, filename = _build_image_payload()
+        return client.post(
+            "/scan/capture",
+            data={"image": (image_bytes, filename), "minArea": "100", "sessionId": session_id},
+            content_type="multipart/form-data",
+        ).get_json()
+
+    first = _capture()
+    second = _capture()
+    third = _capture()
+    summary = client.get(f"/scan/sessions/{session_id}").get_json()
+
+    assert first["spines"][0]["lookup"]["error"] == "TimeoutError: google books timed out"
+    assert second["spines"][0]["reused"] is True
+    assert second["spines"][0]["lookup"]["error"] is None
+    assert second["spines"][0]["lookup"]["items"][0]["id"] == "dune-id"
+    assert third["spines"][0]["lookup"]["items"][0]["id"] == "dune-id"
+    assert len(books_client.lookup_calls) == 2
+    assert summary["count"] == 1
+    assert summary["spines"][0]["lookup"]["error"] is None
+
+
+def test_scan_capture_writes_debug_artifacts_in_background(monkeypatch, tmp_path):
+    monkeypatch.setenv("BOOKSHELF_DEBUG_ARTIFACTS_DIR", str(tmp_path))
+    client, _ = _build_test_client()
+    image_file, filename = _build_image_payload()
+
+    response = client.post(
+        "/scan/capture",
+        data={"image": (image_file, filename), "minArea": "100"},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200
+
+    writer = client.application.extensions["debug_artifacts"]
+    writer.close()
+    assert len(list(tmp_path.glob("capture_*_annotated.jpg"))) == 1
+    store = CropStore(tmp_path / "crops")
+    assert [record.spine_index for record in store] == [0]
+    assert store.open_image(store.records()[0]).size == (32, 20)
+    store.close()
+    metrics_text = client.get("/metrics").get_data(as_text=True)
+    assert 'bookshelf_debug_artifacts_total{outcome="written"} 1' in metrics_text
+    assert "bookshelf_debug_artifact_encode_seconds_count 1" in metrics_text
+
+
+def _span_names(node: dict) -> list[str]:
+    return [node["name"]] + [name for child in node.get("children", []) for name in _span_names(child)]
+
+
+def test_scan_capture_returns_span_tree_and_exports_otlp_when_traced(monkeypatch, tmp_path):
+    export_path = tmp_path / "traces.jsonl"
+    monkeypatch.setenv("BOOKSHELF_TRACE_EXPORT_PATH", str(export_path))
+    client, _ = _build_test_client()
+    image_file, filename = _build_image_payload()
+
+    response = client.post(
+        "/scan/capture?trace=1",
+        data={"image": (image_file, filename), "minArea": "100"},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 200
+    trace = response.get_json()["trace"]
+    assert response.headers["X-Trace-Id"] == trace["traceId"]
+    assert trace["name"] == "POST /scan/capture"
+    assert [child["name"] for child in trace["children"]] == ["capture_cache.get", "decode", "detect", "dedupe", "spine"]
+    spine = trace["children"][-1]
+    assert spine["attributes"]["spineIndex"] == 0
+    assert _span_names(spine) == ["spine", "extract", "lookup", "catalog.match", "google_books.lookup"]
+
+    exported = [json.loads(line) for line in export_path.read_text(encoding="utf-8").splitlines()]
+    spans = exported[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert {span["traceId"] for span in spans} == {trace["traceId"]}
+    assert len(spans) == len(_span_names(trace))
+
+    untraced = client.post(
+        "/scan/capture",
+        data={"image": (_build_image_payload()[0], filename), "minArea": "100"},
+        content_type="multipart/form-data",
+    )
+    assert "trace" not in untraced.get_json()
+    assert "X-Trace-Id" not in untraced.headers
+    assert len(export_path.read_text(encoding="utf-8").splitlines()) == 1
+
+
+def test_scan_capture_stream_ends_with_trace_record():
+    client, _ = _build_test_client()
+    image_file, filename = _build_image_payload()
+
+    response = client.post(
+        "/scan/capture?stream=ndjson&trace=1",
+        data={"image": (image_file, filename), "minArea": "100"},
+        content_type="multipart/form-data",
+    )
+
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [record["type"] for record in records] == ["detections", "spine", "done", "trace"]
+    assert "detect" in _span_names(records[-1])
+
+
+def test_scan_capture_profiles_flagged_requests_within_limits(monkeypatch):
+    monkeypatch.setenv("BOOKSHELF_PROFILING", "true")
+    monkeypatch.setenv("BOOKSHELF_PROFILE_MIN_INTERVAL", "60")
+    monkeypatch.setenv("BOOKSHELF_CAPTURE_CACHE_ENTRIES", "0")
+    client, _ = _build_test_client()
+
+    def _capture(headers):
+        image_file, filename = _build_image_payload()
+        return client.post(
+            "/scan/capture",
+            data={"image": (image_file, filename), "minArea": "100"},
+            content_type="multipart/form-data",
+            headers=headers,
+        )
+
+    assert "profile" not in _capture({}).get_json()
+
+    profiled = _capture({"X-Bookshelf-Profile": "1"})
+    profile = profiled.get_json()["profile"]
+    assert profiled.headers["X-Profile-Id"] == profile["profileId"]
+    functions = [row["function"] for row in profile["functions"]["cumulative"]]
+    assert any(name.endswith("(_iter_capture_events)") for name in functions)
+
+    limited = _capture({"X-Bookshelf-Profile": "1"})
+    assert limited.headers["X-Profile-Skipped"] == "rate_limited"
+    assert "profile" not in limited.get_json()
+    metrics_text = client.get("/metrics").get_data(as_text=True)
+    assert 'bookshelf_profiles_total{outcome="profiled"} 1' in metrics_text
+    assert 'bookshelf_profiles_total{outcome="rate_limited"} 1' in metrics_text
+
+
+def test_scan_capture_ignores_profile_header_unless_enabled():
+    client, _ = _build_test_client()
+    image_file, filename = _build_image_payload()
+
+    response = client.post(
+        "/scan/capture?stream=ndjson",
+        data={"image": (image_file, filename), "minArea": "100"},
+        content_type="multipart/form-data",
+        headers={"X-Bookshelf-Profile": "1"},
+    )
+
+    assert [json.loads(line)["type"] for line in response.get_data(as_text=True).splitlines()][-1] == "done"
+    assert "X-Profile-Id" not in response.headers and "X-Profile-Skipped" not in response.headers
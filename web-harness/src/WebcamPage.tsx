@@ -83,7 +83,8 @@ type CaptureScanResponse = {
   spines: CaptureScanSpine[];
   timingsMs?: {
     detect: number;
-    extractLookup: number;
+    extract: number;
+    lookup: number;
     total: number;
   };
 };
@@ -309,7 +310,8 @@ export function WebcamPage() {
   const [captureResults, setCaptureResults] = useState<CaptureScanSpine[]>([]);
   const [captureTimings, setCaptureTimings] = useState<{
     detect: number;
-    extractLookup: number;
+    extract: number;
+    lookup: number;
     total: number;
   } | null>(null);
   const [verboseLogs, setVerboseLogs] = useState(false);
@@ -1164,8 +1166,9 @@ export function WebcamPage() {
           </div>
           {captureTimings ? (
             <p className="muted">
-              detect: {captureTimings.detect.toFixed(1)}ms | extract+lookup:{" "}
-              {captureTimings.extractLookup.toFixed(1)}ms | total:{" "}
+              detect: {captureTimings.detect.toFixed(1)}ms | extract:{" "}
+              {captureTimings.extract.toFixed(1)}ms | lookup:{" "}
+              {captureTimings.lookup.toFixed(1)}ms | total:{" "}
               {captureTimings.total.toFixed(1)}ms
             </p>
           ) : null}
@@ -1,3 +1,4 @@
+import { PACKED_BOXES_MIMETYPE, decodePackedBoxes } from "@scanner-core";
 import type { DetectionBox } from "@scanner-core";
 
 export type DetectorMode = "mock" | "endpoint";
@@ -290,6 +291,9 @@ const parseBoxes = (
   };
 };
 
+// Lets the API keep one preview in flight per tab and drop frames superseded by newer ones.
+const PREVIEW_CLIENT_ID = `harness-${Math.random().toString(36).slice(2, 10)}`;
+
 const detectViaEndpoint = async (
   options: DetectFrameOptions,
   frameWidth: number,
@@ -307,20 +311,25 @@ const detectViaEndpoint = async (
 
   try {
     const frameBlob = await frameToBlob(options.videoEl);
-    const formData = new FormData();
-    formData.append("image", frameBlob, "frame.jpg");
-    formData.append("frameWidth", String(frameWidth));
-    formData.append("frameHeight", String(frameHeight));
-    formData.append("timestampMs", String(options.frameTimestampMs));
-    formData.append("minArea", String(Math.max(0, Math.round(options.endpointMinArea ?? 250))));
-    formData.append(
+    // Send the JPEG as the raw body and ask for packed boxes; the API falls back to JSON.
+    const requestUrl = new URL(endpointUrl, window.location.href);
+    requestUrl.searchParams.set(
+      "minArea",
+      String(Math.max(0, Math.round(options.endpointMinArea ?? 250)))
+    );
+    requestUrl.searchParams.set(
       "maxDetections",
       String(Math.max(1, Math.round(options.endpointMaxDetections ?? 50)))
     );
 
-    const response = await fetch(endpointUrl, {
+    const response = await fetch(requestUrl.toString(), {
       method: "POST",
-      body: formData,
+      body: frameBlob,
+      headers: {
+        "Content-Type": "image/jpeg",
+        "X-Client-Id": PREVIEW_CLIENT_ID,
+        Accept: `${PACKED_BOXES_MIMETYPE}, application/json;q=0.5`
+      },
       signal: controller.signal
     });
 
@@ -328,7 +337,9 @@ const detectViaEndpoint = async (
       throw new Error(`endpoint_http_${response.status}`);
     }
 
-    const payload = (await response.json()) as unknown;
+    const payload = (response.headers.get("Content-Type") ?? "").startsWith(PACKED_BOXES_MIMETYPE)
+      ? (decodePackedBoxes(await response.arrayBuffer()) as unknown)
+      : ((await response.json()) as unknown);
     const payloadRecord = payload as Record<string, unknown>;
     const backendBoxCount =
       typeof payloadRecord?.count === "number"